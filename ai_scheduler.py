@@ -0,0 +1,149 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+import instrumentation
+
+# Every AI completion first takes a slot from its provider's scheduler: a
+# requests-per-minute and a tokens-per-minute token bucket with a priority
+# queue in front, so a burst of optimizations waits here instead of failing
+# with 429s, and interactive requests go ahead of queued background work
+# (highlight mining). Limits come from the environment or config.py:
+#
+#   OPENAI_REQUESTS_PER_MINUTE=500   OPENAI_TOKENS_PER_MINUTE=10000
+#   DEEPSEEK_REQUESTS_PER_MINUTE=0   (0 = no limit)
+#
+# The buckets are per process: with several gunicorn workers, divide the
+# provider's limits between them.
+
+DEFAULT_LIMITS = {
+    'openai': (500, 10000),   # gpt-4, usage tier 1
+    'deepseek': (0, 0),       # DeepSeek doesn't rate limit
+}
+
+PRIORITIES = {'interactive': 0, 'batch': 1}
+
+# Longest a request waits for a slot before giving up
+QUEUE_TIMEOUT = float(os.environ.get('AI_QUEUE_TIMEOUT', 120))
+
+instrumentation.describe('resume_ai_queue_depth', 'AI requests waiting for a rate limit slot')
+instrumentation.describe('resume_ai_queue_wait_seconds', 'Time AI requests waited for a rate limit slot')
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+class RateLimitTimeout(Exception):
+    pass
+
+def estimate_tokens(messages):
+    """Rough prompt size: 4 characters per token"""
+    return sum(len(message.get('content') or '') for message in messages) // 4
+
+class TokenBucket:
+    """per_minute units refilling continuously; not thread-safe on its own"""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.level = per_minute
+        self.rate = per_minute / 60
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount is available (a request larger than the
+        bucket waits for a full one)"""
+        if not self.capacity:
+            return 0
+        self._refill(now)
+        return max(0, min(amount, self.capacity) - self.level) / self.rate
+
+    def take(self, amount):
+        if self.capacity:
+            self.level -= min(amount, self.capacity)
+
+    def give(self, amount):
+        if self.capacity:
+            self.level = min(self.capacity, self.level + amount)
+
+class ProviderScheduler:
+    def __init__(self, model, requests_per_minute, tokens_per_minute):
+        self.model = model
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._cond = threading.Condition()
+        self._queue = []  # [(priority, seq, priority name)]
+        self._seq = itertools.count()
+
+    def acquire(self, tokens, priority='interactive', timeout=QUEUE_TIMEOUT):
+        """Wait for a request slot and tokens; returns the tokens reserved.
+
+        Waiters are served strictly by (priority, arrival), so a large
+        request at the head isn't starved by smaller ones behind it.
+        """
+        entry = (PRIORITIES[priority], next(self._seq), priority)
+        start = time.monotonic()
+        deadline = start + timeout
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            self._report_depth()
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if self._queue[0] is entry:
+                        wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+                        if not wait:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            break
+                    if now >= deadline:
+                        instrumentation.observe('resume_ai_queue_wait_seconds', now - start,
+                                                model=self.model, priority=priority, outcome='timeout')
+                        raise RateLimitTimeout(f'No {self.model} rate limit slot after {timeout:g}s')
+                    self._cond.wait(min(wait or deadline - now, deadline - now))
+            finally:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._report_depth()
+                # The next waiter may be able to go now
+                self._cond.notify_all()
+
+        instrumentation.observe('resume_ai_queue_wait_seconds', time.monotonic() - start,
+                                model=self.model, priority=priority, outcome='ok')
+        return tokens
+
+    def release(self, reserved, used):
+        """Return the part of a reservation the request didn't use"""
+        if used < reserved:
+            with self._cond:
+                self.tokens.give(reserved - used)
+                self._cond.notify_all()
+
+    def _report_depth(self):
+        for priority in PRIORITIES:
+            instrumentation.set_gauge('resume_ai_queue_depth',
+                                      sum(1 for entry in self._queue if entry[2] == priority),
+                                      model=self.model, priority=priority)
+
+def _limit(model, setting, default):
+    import config
+    name = f'{model.upper()}_{setting}'
+    value = os.environ.get(name, getattr(config, name, None))
+    return default if value in (None, '') else int(value)
+
+def scheduler_for(model):
+    """The process's scheduler for a provider ('openai' or 'deepseek')"""
+    scheduler = _schedulers.get(model)
+    if scheduler is None:
+        with _schedulers_lock:
+            scheduler = _schedulers.get(model)
+            if scheduler is None:
+                requests_per_minute, tokens_per_minute = DEFAULT_LIMITS[model]
+                scheduler = _schedulers[model] = ProviderScheduler(
+                    model, _limit(model, 'REQUESTS_PER_MINUTE', requests_per_minute),
+                    _limit(model, 'TOKENS_PER_MINUTE', tokens_per_minute))
+    return scheduler
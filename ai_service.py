@@ -1,48 +1,309 @@
-from openai import OpenAI
-from config import DEEPSEEK_API_KEY, OPENAI_API_KEY
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from enum import Enum
+import instrumentation
+import structured_logging
+from ai_scheduler import RateLimitTimeout, estimate_tokens, scheduler_for
+from json_repair import JSONRepairError, loads_lenient
+from structured_logging import get_logger, log_payload, truncate
+
+logger = get_logger('ai')
+
+# The openai SDK (with its pydantic/httpx tree) and config are imported when
+# an AIService is first created, so app startup and pages that never call
+# the AI don't pay for them
 
 class AIModel(Enum):
     OPENAI = "openai"
     DEEPSEEK = "deepseek"
 
+DEFAULT_BASE_URLS = {
+    AIModel.OPENAI: "https://api.openai.com/v1",
+    AIModel.DEEPSEEK: "https://api.deepseek.com"
+}
+
+def base_url(model_type: AIModel):
+    """<MODEL>_BASE_URL from the environment or config.py, else the provider's API"""
+    import config
+    setting = f"{model_type.name}_BASE_URL"
+    return os.environ.get(setting) or getattr(config, setting, None) or DEFAULT_BASE_URLS[model_type]
+
+# How optimize_resume uses the providers: 'single' asks the selected one,
+# 'hedged' also asks the other if the first is slower than its recent p95 (or
+# fails) and takes the first usable answer, 'ensemble' asks both and averages
+# their scores. Set per request or with AI_STRATEGY.
+STRATEGIES = ('single', 'hedged', 'ensemble')
+DEFAULT_STRATEGY = os.environ.get('AI_STRATEGY', 'single')
+
+# Hedge after AI_HEDGE_AFTER_MS if set, else after the primary's p95 over
+# its last HEDGE_WINDOW successful calls (HEDGE_FALLBACK_SECONDS until it
+# has HEDGE_MIN_SAMPLES of them)
+HEDGE_AFTER_MS = float(os.environ.get('AI_HEDGE_AFTER_MS', 0))
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+HEDGE_FALLBACK_SECONDS = 10.0
+
+_latencies = {model: deque(maxlen=HEDGE_WINDOW) for model in ('openai', 'deepseek')}
+_executor = None
+_executor_lock = threading.Lock()
+
+instrumentation.describe('resume_ai_strategy_seconds', 'optimize_resume latency by strategy, across providers')
+instrumentation.describe('resume_ai_strategy_answers_total', 'optimize_resume answers by strategy and answering model')
+instrumentation.describe('resume_ai_hedges_total', 'Hedged optimize_resume calls that also asked the second provider')
+
+# Providers that accept response_format={"type": "json_object"}. gpt-4
+# (unlike gpt-4-turbo and later) rejects it.
+JSON_MODE = {AIModel.OPENAI: False, AIModel.DEEPSEEK: True}
+
+# Completion length cap; reserved in full against the tokens-per-minute
+# budget until the response reports what was used
+MAX_TOKENS = 2000
+
+class AIError(str):
+    """An AI call's error message. transient marks failures a later retry
+    may fix: timeouts, dropped connections, rate limits and provider 5xx."""
+    
+    def __new__(cls, message, transient=False):
+        error = super().__new__(cls, message)
+        error.transient = transient
+        return error
+
+def is_transient(error):
+    """Whether a (False, error) result is worth retrying"""
+    return getattr(error, 'transient', False)
+
+def _transient_exception(e):
+    import openai
+    if isinstance(e, openai.APIConnectionError):  # includes timeouts
+        return True
+    status = getattr(e, 'status_code', None)
+    return status is not None and (status == 429 or status >= 500)
+
+def _to_id(value):
+    """3, "3", "job_3", "Job 3" -> 3; None if there's no number"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.search(r"\d+", str(value))
+    return int(match.group()) if match else None
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _items(value):
+    """(job id, points) pairs from {job_id: points} or [{"id": job_id, "points": ...}]"""
+    if isinstance(value, dict):
+        return list(value.items())
+    if isinstance(value, list):
+        return [(item.get("job_id", item.get("id")), item.get("points", item.get("point_orders")))
+                for item in value if isinstance(item, dict)]
+    return []
+
+def _ranked(entries):
+    """[(id, {"score": ...})] best first, from {id: order}, {id: {"order", "score"}},
+    [id, ...] or [{"id", "order", "score"}]; unknown ids and repeats are skipped"""
+    if isinstance(entries, dict):
+        entries = [(key, value) for key, value in entries.items()]
+    elif isinstance(entries, list):
+        entries = [(item.get("id", item.get("point_id", item.get("job_id"))), item)
+                   if isinstance(item, dict) else (item, None) for item in entries]
+    else:
+        return []
+    
+    ranked = []
+    for position, (key, value) in enumerate(entries):
+        item_id = _to_id(key)
+        if item_id is None:
+            continue
+        info = value if isinstance(value, dict) else {}
+        order = _number(info.get("order") if isinstance(value, dict) else value)
+        if order is None:
+            order = position + 1
+        ranked.append((order, position, item_id, {"score": _number(info.get("score"))}))
+    ranked.sort(key=lambda entry: entry[:2])
+    
+    seen = set()
+    result = []
+    for _, _, item_id, info in ranked:
+        if item_id not in seen:
+            seen.add(item_id)
+            result.append((item_id, info))
+    return result
+
+def rank_score(order, count):
+    """Score for a rank when the model gave none: 1.0 for the top, falling linearly"""
+    return round(1 - (order - 1) / max(count, 1), 4)
+
+def hedge_after(model_type: AIModel):
+    """Seconds to wait on model_type before also asking the other provider"""
+    if HEDGE_AFTER_MS:
+        return HEDGE_AFTER_MS / 1000
+    recent = sorted(_latencies[model_type.value])
+    if len(recent) < HEDGE_MIN_SAMPLES:
+        return HEDGE_FALLBACK_SECONDS
+    return recent[min(len(recent) - 1, int(len(recent) * 0.95))]
+
+def _run_in_pool(fn, *args):
+    """Run fn on the shared AI thread pool, logging under the caller's request id"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='ai')
+    request_id = structured_logging.current_request_id()
+    
+    def run():
+        structured_logging.start_request(request_id)
+        try:
+            return fn(*args)
+        finally:
+            structured_logging.finish_request()
+    return _executor.submit(run)
+
+def merge_orderings(results):
+    """One job_order/point_orders from several, ranked by mean score (a
+    rank-derived one where a model gave none)"""
+    job_scores, point_scores = {}, {}
+    for result in results:
+        count = len(result["job_order"])
+        for job_id, order in result["job_order"].items():
+            job_scores.setdefault(job_id, []).append(rank_score(order, count))
+        for job_id, points in result["point_orders"].items():
+            for point_id, order_data in points.items():
+                score = order_data["score"]
+                if score is None:
+                    score = rank_score(order_data["order"], len(points))
+                point_scores.setdefault(job_id, {}).setdefault(point_id, []).append(score)
+    
+    def ranked(scores):
+        # Python's sort is stable, so ties keep the first result's order
+        means = {item_id: sum(values) / len(values) for item_id, values in scores.items()}
+        return sorted(means.items(), key=lambda item: -item[1])
+    
+    return {
+        "job_order": {job_id: n for n, (job_id, _) in enumerate(ranked(job_scores), 1)},
+        "point_orders": {
+            job_id: {point_id: {"order": n, "score": round(score, 4)}
+                     for n, (point_id, score) in enumerate(ranked(points), 1)}
+            for job_id, points in point_scores.items()
+        }
+    }
+
+def other_provider(model_type: AIModel):
+    return AIModel.OPENAI if model_type == AIModel.DEEPSEEK else AIModel.DEEPSEEK
+
+def has_api_key(model_type: AIModel):
+    import config
+    return bool(getattr(config, f"{model_type.name}_API_KEY", None))
+
+def optimization_service(model_type: AIModel, strategy=None):
+    """An object with optimize_resume() for the strategy (default AI_STRATEGY).
+
+    The multi-provider strategies fall back to 'single' when the other
+    provider has no API key configured.
+    """
+    strategy = strategy or DEFAULT_STRATEGY
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown AI strategy: {strategy}")
+    if strategy != 'single' and not has_api_key(other_provider(model_type)):
+        logger.warning("No API key for the second provider, using the single strategy",
+                       extra={"strategy": strategy, "model": other_provider(model_type).value})
+        strategy = 'single'
+    if strategy == 'single':
+        return AIService(model_type)
+    return MultiProviderAIService(model_type, strategy)
+
 class AIService:
-    def __init__(self, model_type: AIModel):
+    def __init__(self, model_type: AIModel, strategy='single', priority='interactive'):
+        from openai import OpenAI
+        from config import DEEPSEEK_API_KEY, OPENAI_API_KEY
+        
         self.model_type = model_type
+        # Labels this service's calls in metrics, to compare strategies' cost
+        self.strategy = strategy
+        # 'batch' requests wait behind 'interactive' ones for rate limit slots
+        self.priority = priority
         if model_type == AIModel.DEEPSEEK:
             self.client = OpenAI(
                 api_key=DEEPSEEK_API_KEY,
-                base_url="https://api.deepseek.com"
+                base_url=base_url(model_type)
             )
         else:  # OpenAI
-            self.client = OpenAI(api_key=OPENAI_API_KEY)
+            self.client = OpenAI(api_key=OPENAI_API_KEY, base_url=base_url(model_type))
 
-    def create_completion(self, messages):
+    def create_completion(self, messages, json_mode=False):
+        """json_mode asks providers that support it for a JSON object reply"""
+        model = self.model_type.value
+        options = {}
+        if json_mode and JSON_MODE[self.model_type]:
+            options["response_format"] = {"type": "json_object"}
+        scheduler = scheduler_for(model)
+        try:
+            reserved = scheduler.acquire(estimate_tokens(messages) + MAX_TOKENS, self.priority)
+        except RateLimitTimeout as e:
+            logger.warning("AI request not sent", extra={"model": model, "error": str(e)})
+            return False, AIError(str(e), transient=True)
+        
+        used = 0
+        start = time.perf_counter()
         try:
             if self.model_type == AIModel.DEEPSEEK:
                 response = self.client.chat.completions.create(
                     model="deepseek-chat",
                     messages=messages,
                     temperature=0.7,  # Add some creativity but not too much
-                    max_tokens=2000,  # Ensure enough tokens for response
-                    stream=False
+                    max_tokens=MAX_TOKENS,  # Ensure enough tokens for response
+                    stream=False,
+                    **options
                 )
             else:  # OpenAI
                 response = self.client.chat.completions.create(
                     model="gpt-4",
                     messages=messages,
                     temperature=0.7,
-                    max_tokens=2000
+                    max_tokens=MAX_TOKENS,
+                    **options
                 )
             
-            print("Raw AI Response:", response)  # Debug print
+            log_payload(logger, "AI response", response, model=model)
+            self._record_call(model, 'success', start, response.usage)
+            used = response.usage.total_tokens if response.usage else reserved
             return True, response.choices[0].message.content
             
         except Exception as e:
-            print(f"API Error: {str(e)}")  # Debug print
-            return False, str(e)
+            logger.warning("AI request failed", extra={"model": model, "error": str(e)})
+            self._record_call(model, 'error', start)
+            return False, AIError(str(e), transient=_transient_exception(e))
+        
+        finally:
+            scheduler.release(reserved, used)
+
+    def _record_call(self, model, outcome, start, usage=None):
+        """Report latency and token usage to /metrics and the request's spans"""
+        elapsed = time.perf_counter() - start
+        strategy = self.strategy
+        instrumentation.observe('resume_ai_request_seconds', elapsed, model=model, outcome=outcome, strategy=strategy)
+        if outcome == 'success':
+            _latencies[model].append(elapsed)
+        tokens = {}
+        if usage is not None:
+            tokens = {'prompt_tokens': usage.prompt_tokens, 'completion_tokens': usage.completion_tokens}
+            instrumentation.inc('resume_ai_tokens_total', usage.prompt_tokens,
+                                model=model, type='prompt', strategy=strategy)
+            instrumentation.inc('resume_ai_tokens_total', usage.completion_tokens,
+                                model=model, type='completion', strategy=strategy)
+        instrumentation.record_span('ai', model, elapsed, outcome=outcome, **tokens)
 
-    def optimize_resume(self, jobs, job_description='', story=''):
+    def optimize_resume(self, jobs, job_description='', story='', point_ids=None):
+        """point_ids limits the bullets sent for scoring (ids as strings); every job is still ranked"""
         system_prompt = """You are a resume optimization expert. Your task is to analyze the jobs and their bullet points,
         and optimize them based on the provided job description and personal story. 
         
@@ -51,34 +312,43 @@ class AIService:
         2. Personal Story: Emphasize experiences that support this narrative
         3. Impact: Prioritize points showing quantifiable results
         
-        Return a JSON object with optimized ordering in this exact format:
+        Return only a JSON object with optimized ordering, without comments, in this exact format:
         {
             "job_order": {
-                "1": 1,  // job_id: order_number (1 is highest priority)
+                "1": 1,
                 "2": 2
             },
             "point_orders": {
-                "1": {  // job_id
-                    "1": {"order": 1, "score": 0.95},  // point_id: {order, relevance_score}
+                "1": {
+                    "1": {"order": 1, "score": 0.95},
                     "2": {"order": 2, "score": 0.85}
                 }
             }
-        }"""
+        }
+        job_order maps each job_id to its order number (1 is highest priority).
+        point_orders maps each job_id to its point_ids, each with an order and a
+        relevance score between 0 and 1."""
         
         jobs_data = {
             "jobs": [{
-                "id": job["id"],
-                "title": job["title"],
-                "company": job["company"],
+                "id": job.id,
+                "title": job.title,
+                "company": job.company,
                 "points": [{"id": point_id, "text": point} 
-                          for point_id, point in zip(job["point_ids"], job["points"])]
+                          for point_id, point in job.point_items
+                          if point_ids is None or point_id in point_ids]
             } for job in jobs],
             "job_description": job_description,
             "personal_story": story
         }
         
+        # Only new or edited bullets are sent when the rest are already scored
+        partial_note = "" if point_ids is None else (
+            "Some jobs list only their new bullets (or none). Rank every job, "
+            "and order and score only the bullets listed.")
+        
         try:
-            print("Sending to AI:", jobs_data)  # Debug print
+            log_payload(logger, "Sending to AI", jobs_data, model=self.model_type.value)
             
             success, response = self.create_completion([
                 {"role": "system", "content": system_prompt},
@@ -86,67 +356,217 @@ class AIService:
                     Job Description: {job_description}
                     
                     Personal Story Goal: {story}
-                    
+                    {partial_note}
                     Please optimize this resume data and return in the specified JSON format: {str(jobs_data)}
                 """}
-            ])
-            
-            print("AI Response:", response)  # Debug print
+            ], json_mode=True)
             
             if success:
-                parsed = self._parse_optimization_response(response)
-                print("Parsed Response:", parsed)  # Debug print
+                parsed = self._parse_optimization_response(response, jobs, point_ids)
+                log_payload(logger, "Parsed AI response", parsed)
                 
                 # Validate the parsed response
-                if not parsed["job_order"] or not parsed["point_orders"]:
+                if not parsed["job_order"]:
                     return False, "AI response missing required data"
                     
                 return True, parsed
                 
-            return False, "Failed to get AI response"
+            return False, AIError("Failed to get AI response", is_transient(response))
             
         except Exception as e:
-            print(f"Optimization error: {str(e)}")  # Debug print
+            logger.exception("Optimization error")
             return False, str(e)
     
-    def _parse_optimization_response(self, response):
+    def _parse_optimization_response(self, response, jobs=(), point_ids=None):
+        """job_order {job_id: order} and point_orders {job_id: {point_id (str): {order, score}}}
+
+        Accepts the shapes models drift into (lists instead of maps, "job_3"
+        style ids, bare order numbers, points filed under the wrong job) and,
+        when jobs are given, drops ids that aren't among them (or point_ids).
+        """
+        empty = {"job_order": {}, "point_orders": {}}
         try:
-            import json
-            import re
-            
-            # Extract JSON object from the response using regex
-            json_match = re.search(r'\{[\s\S]*\}', response)
-            if not json_match:
-                return {"job_order": {}, "point_orders": {}}
+            data, repaired = loads_lenient(response)
+            point_jobs = {int(point_id): job.id for job in jobs for point_id, _ in job.point_items
+                          if point_ids is None or point_id in point_ids}
+            job_ids = {job.id for job in jobs}
             
-            json_str = json_match.group(0)
-            print("Extracted JSON:", json_str)  # Debug print
+            job_order = {}
+            for job_id, _ in _ranked(data.get("job_order")):
+                if not job_ids or job_id in job_ids:
+                    job_order[job_id] = len(job_order) + 1
             
-            # Parse the JSON
-            parsed = json.loads(json_str)
+            # Collect points per job, trusting the database over the model about
+            # which job a point belongs to
+            collected = {}
+            for job_key, points in _items(data.get("point_orders")):
+                for point_id, info in _ranked(points):
+                    if jobs:
+                        if point_id not in point_jobs:
+                            continue
+                        job_id = point_jobs[point_id]
+                    else:
+                        job_id = _to_id(job_key)
+                    if job_id is not None:
+                        collected.setdefault(job_id, []).append((point_id, info))
             
-            # Convert string keys to integers
-            job_order = {int(k): int(v) for k, v in parsed["job_order"].items()}
-            
-            point_orders = {}
-            for job_id, points in parsed["point_orders"].items():
-                job_id = int(job_id)
-                point_orders[job_id] = {
-                    str(point_id): {  # Keep point_id as string since that's how we store it
-                        "order": int(data["order"]),
-                        "score": float(data["score"])
-                    }
-                    for point_id, data in points.items()
+            point_orders = {
+                job_id: {
+                    str(point_id): {"order": n, "score": info.get("score")}  # Keep point_id as string since that's how we store it
+                    for n, (point_id, info) in enumerate(points, 1)
                 }
+                for job_id, points in collected.items()
+            }
             
+            # A reply may leave out point_orders only when no bullets were sent
+            if not job_order or (not point_orders and (point_jobs or not jobs)):
+                raise JSONRepairError("No job or point orders in response")
+            self._record_parse("optimization", "repaired" if repaired else "ok")
             return {
                 "job_order": job_order,
                 "point_orders": point_orders
             }
             
         except Exception as e:
-            print(f"Error parsing AI response: {str(e)}")
-            return {"job_order": {}, "point_orders": {}}
+            self._record_parse("optimization", "failed")
+            logger.warning("Error parsing AI response", extra={"error": str(e), "response": truncate(response, 500)})
+            return empty
+
+    def _record_parse(self, kind, outcome):
+        instrumentation.inc('resume_ai_parse_total', model=self.model_type.value, kind=kind, outcome=outcome)
+
+    def summarize_highlights(self, job, entries):
+        system_prompt = """You are a resume writing expert. Your task is to turn journal entries
+        describing someone's work into concise, achievement-focused resume bullet points.
+        
+        Guidelines:
+        1. Start each bullet with a strong action verb
+        2. Keep quantifiable results (numbers, percentages, time saved)
+        3. Merge entries that describe the same piece of work into one bullet
+        4. Keep each bullet under 200 characters
+        
+        Return a JSON array in this exact format:
+        [
+            {"text": "Reduced build times by 40% by ...", "entry_ids": [12, 15]}
+        ]"""
+        
+        entries_data = [{
+            "id": entry["id"],
+            "date": entry["entry_date"],
+            "title": entry["title"] or "",
+            "content": entry["content"]
+        } for entry in entries]
+        
+        try:
+            success, response = self.create_completion([
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"""
+                    Role: {job["title"]} at {job["company"]}
+                    
+                    Please turn these journal entries into resume bullets and return them in the specified JSON format: {str(entries_data)}
+                """}
+            ])
+            
+            if success:
+                bullets = self._parse_highlight_response(response, {entry["id"] for entry in entries})
+                if not bullets:
+                    return False, "AI response missing required data"
+                return True, bullets
+            
+            return False, AIError("Failed to get AI response", is_transient(response))
+        
+        except Exception as e:
+            logger.exception("Highlight summary error")
+            return False, str(e)
+    
+    def _parse_highlight_response(self, response, entry_ids):
+        try:
+            data, repaired = loads_lenient(response, expect=(list, dict))
+            if isinstance(data, dict):
+                # JSON mode replies must be objects, e.g. {"bullets": [...]}
+                data = next((value for value in data.values() if isinstance(value, list)), [])
+            
+            bullets = []
+            for item in data:
+                text = str(item.get("text", "")).strip()
+                if text:
+                    bullets.append({
+                        "text": text,
+                        "entry_ids": [int(eid) for eid in item.get("entry_ids", []) if int(eid) in entry_ids]
+                    })
+            self._record_parse("highlights", "failed" if not bullets else "repaired" if repaired else "ok")
+            return bullets
+        
+        except Exception as e:
+            self._record_parse("highlights", "failed")
+            logger.warning("Error parsing AI highlight response",
+                           extra={"error": str(e), "response": truncate(response, 500)})
+            return []
+
+class MultiProviderAIService:
+    """optimize_resume over both providers, primary first (see STRATEGIES)"""
+    
+    def __init__(self, primary: AIModel, strategy='hedged'):
+        self.model_type = primary
+        self.strategy = strategy
+        self.primary = AIService(primary, strategy)
+        self._secondary = None
+    
+    @property
+    def secondary(self):
+        """Created on first use: most hedged calls never need it"""
+        if self._secondary is None:
+            self._secondary = AIService(other_provider(self.model_type), self.strategy)
+        return self._secondary
+    
+    def optimize_resume(self, jobs, job_description='', story='', point_ids=None):
+        call = (jobs, job_description, story, point_ids)
+        start = time.perf_counter()
+        if self.strategy == 'ensemble':
+            answered_by, success, result = self._ensemble(call)
+        else:
+            answered_by, success, result = self._hedged(call)
+        
+        elapsed = time.perf_counter() - start
+        outcome = 'success' if success else 'error'
+        instrumentation.observe('resume_ai_strategy_seconds', elapsed, strategy=self.strategy, outcome=outcome)
+        instrumentation.inc('resume_ai_strategy_answers_total', strategy=self.strategy, model=answered_by)
+        instrumentation.record_span('ai', self.strategy, elapsed, outcome=outcome, answered_by=answered_by)
+        return success, result
+    
+    def _submit(self, service, call):
+        return _run_in_pool(lambda: (service.model_type.value, service.optimize_resume(*call)))
+    
+    def _hedged(self, call):
+        primary = self.primary
+        pending = {self._submit(primary, call)}
+        delay = hedge_after(primary.model_type)
+        hedged = False
+        error = "Failed to get AI response"
+        while pending:
+            done, pending = wait(pending, timeout=None if hedged else delay, return_when=FIRST_COMPLETED)
+            for future in done:
+                model, (success, result) = future.result()
+                if success:
+                    # The other request, if any, finishes in the background
+                    return model, True, result
+                error = result
+            if not hedged:
+                hedged = True
+                instrumentation.inc('resume_ai_hedges_total', primary=primary.model_type.value)
+                logger.info("Hedging AI request", extra={"primary": primary.model_type.value,
+                                                         "after_seconds": round(delay, 3)})
+                pending.add(self._submit(self.secondary, call))
+        return 'none', False, error
+    
+    def _ensemble(self, call):
+        answers = [future.result() for future in [self._submit(service, call) for service in (self.primary, self.secondary)]]
+        results = [(model, result) for model, (success, result) in answers if success]
+        if not results:
+            return 'none', False, answers[0][1][1]
+        if len(results) == 1:
+            return results[0][0], True, results[0][1]
+        return 'both', True, merge_orderings([result for _, result in results])
 
 def test_ai_connection(model_type: AIModel):
     ai_service = AIService(model_type)
@@ -1,100 +1,190 @@
-from flask import Flask, render_template, send_file, request, redirect, url_for, jsonify
+from flask import Flask, render_template, send_file, request, redirect, url_for, jsonify, g
+from flask.json.provider import DefaultJSONProvider
+import hashlib
 import os
-import subprocess
-from jinja2 import Environment, FileSystemLoader
+import re
 from database import (
     get_all_jobs, add_job, add_job_points, get_next_order_num,
     delete_job_point, delete_job_and_points, update_job_order,
-    update_job_point_order, get_ai_ordered_jobs, store_ai_ordering,
+    update_job_point_order, get_ai_ordered_jobs, get_ai_point_scores, store_ai_ordering,
     update_point_order_db, get_settings, save_settings,
-    get_all_applications, get_application, create_application as db_create_application,
+    get_application, create_application as db_create_application,
+    get_application_summaries, get_application_status_counts,
     update_application, delete_application as db_delete_application,
-    get_jobs_for_application,
+    get_application_resume, get_resume_blob_by_path,
     # Journal functions
     create_journal_entry, get_journal_entries, get_journal_entry,
     update_journal_entry, delete_journal_entry, get_journal_stats,
-    get_entries_by_date_range, get_all_tags
+    get_entries_by_date_range, get_all_tags, get_journal_heatmap, get_data_version, get_data_versions,
+    check_database,
+    # Highlight miner functions
+    get_point_candidates, accept_point_candidate, dismiss_point_candidate,
+    # Task queue functions
+    get_task, cancel_task
+)
+from ai_service import test_ai_connection, AIModel, STRATEGIES, is_transient
+from highlight_miner import start_mining
+from blob_store import store_upload, collect_garbage
+import fragment_cache
+import instrumentation
+import resume_optimizer
+import structured_logging
+import task_runner
+from pdf_service import (
+    render_resume_tex, build_experience, compile_pdf_to, snapshot_application, get_application_pdf,
+    get_snapshot_pdf, collect_snapshot_garbage
 )
-from ai_service import test_ai_connection, AIModel, AIService
-import sqlite3
 from werkzeug.utils import secure_filename
-from datetime import datetime
+from datetime import datetime, timedelta
+import time
+
+class ModelJSONProvider(DefaultJSONProvider):
+    """Serialize row models (models.py) through their to_dict()"""
+    
+    @staticmethod
+    def default(o):
+        to_dict = getattr(o, 'to_dict', None)
+        if to_dict is not None:
+            return to_dict()
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        # Row lists (e.g. /api/jobs) are converted in one pass; calling
+        # default() from the encoder for every row costs about as much again
+        if isinstance(obj, list) and obj and hasattr(obj[0], 'to_dict'):
+            obj = [item.to_dict() for item in obj]
+        return super().dumps(obj, **kwargs)
 
 app = Flask(__name__)
+app.json = ModelJSONProvider(app)
+
+# Structured logs go through a queue to a writer thread (see structured_logging)
+structured_logging.configure()
+logger = structured_logging.get_logger('app')
+
+# Requests sent with an X-Profile: 1 header are run under cProfile and dumped
+# here (see instrumentation.RequestProfiler). Unset disables profiling.
+app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR')
+if app.config['PROFILE_DIR']:
+    app.wsgi_app = instrumentation.RequestProfiler(app.wsgi_app, app.config['PROFILE_DIR'])
 
-UPLOAD_FOLDER = 'static/resumes'
 ALLOWED_EXTENSIONS = {'pdf'}
 
-def generate_pdf(mode='handcrafted', model_type='openai'):
-    # Get jobs based on mode
+# Hand PDF downloads off to the front-end server instead of streaming them
+# from Python. USE_X_SENDFILE is Flask's X-Sendfile support (Apache/lighttpd);
+# PDF_ACCEL_REDIRECT_PREFIX (e.g. '/protected/') emits nginx X-Accel-Redirect
+# headers pointing at an internal location that maps to the app directory.
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
+app.config['PDF_ACCEL_REDIRECT_PREFIX'] = os.environ.get('PDF_ACCEL_REDIRECT_PREFIX')
+
+# Content-addressed URLs never change, so browsers may keep them for a year
+IMMUTABLE_MAX_AGE = 31536000
+
+# Generated resume PDFs: <sha256 of the LaTeX>.pdf for direct downloads,
+# resume_<task id>.pdf for background tasks. Ones unused for a week are
+# deleted when task workers start.
+GENERATED_FOLDER = 'static/generated'
+task_runner.prune_folder(GENERATED_FOLDER)
+
+def generate_pdf(mode='handcrafted', model_type='openai', pdf_path=None):
+    """Build the resume PDF for a view and return (path, content hash).
+    
+    Without pdf_path the PDF is stored under GENERATED_FOLDER by the hash of
+    its LaTeX, so unchanged resumes skip pdflatex and concurrent requests or
+    worker processes never write to the same file.
+    """
+    # Get jobs based on mode; AI relevance scores decide which bullets fit on the page
     if mode == 'handcrafted':
         all_jobs = get_all_jobs()
+        scores = {}
     else:
         all_jobs = get_ai_ordered_jobs(model_type)
+        scores = get_ai_point_scores(model_type)
     
-    # Take only first 4 jobs and their first 3 points
-    resume_jobs = all_jobs[:4]
-    
-    # Convert to template format
-    experience_data = {
-        f'job{i+1}': {
-            'dates': job['dates'],
-            'title': job['title'],
-            'company': job['company'],
-            'location': job['location'],
-            'points': job['resume_points']
-        } for i, job in enumerate(resume_jobs)
-    }
+    settings = get_settings()
+    resume_jobs = build_experience([{
+        'dates': job.dates,
+        'title': job.title,
+        'company': job.company,
+        'location': job.location,
+        'points': job.points,
+        'scores': [scores.get(point_id) for point_id in job.point_ids]
+    } for job in all_jobs], settings['jobs_on_resume'], settings['points_per_job'])
     
-    # Define paths
-    temp_tex_path = os.path.join('static', 'temp_resume.tex')
-    output_dir = 'static'
-    
-    # Ensure output directory exists
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Load and render the LaTeX template
-    env = Environment(
-        loader=FileSystemLoader('templates'),
-        block_start_string=r'\BLOCK{',
-        block_end_string='}',
-        variable_start_string=r'\VAR{',
-        variable_end_string='}',
-        comment_start_string=r'\#{',
-        comment_end_string='}',
-        line_statement_prefix='%%',
-        line_comment_prefix='%#',
-        trim_blocks=True,
-        autoescape=False,
-    )
-    template = env.get_template('resume_template.tex')
-    rendered_tex = template.render(**experience_data)
-    
-    # Write the rendered template to a temporary file
-    with open(temp_tex_path, 'w') as f:
-        f.write(rendered_tex)
-    
-    # Run pdflatex with error checking using full MacTeX path
-    result = subprocess.run([
-        '/Library/TeX/texbin/pdflatex',  # Use explicit MacTeX path
-        '-output-directory', output_dir,
-        temp_tex_path
-    ], capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        print("LaTeX Error:", result.stderr)
-        raise Exception("PDF generation failed")
-        
-    pdf_path = os.path.join(output_dir, 'temp_resume.pdf')
-    if not os.path.exists(pdf_path):
-        raise Exception(f"PDF not generated at {pdf_path}")
-        
-    return pdf_path
+    rendered_tex = render_resume_tex(resume_jobs)
+    content_hash = hashlib.sha256(rendered_tex.encode('utf-8')).hexdigest()
+    if pdf_path is None:
+        pdf_path = os.path.join(GENERATED_FOLDER, f'{content_hash}.pdf')
+        try:
+            # Already built; mark it used so pruning keeps it (atime isn't
+            # reliable with noatime mounts)
+            os.utime(pdf_path)
+            return pdf_path, content_hash
+        except FileNotFoundError:
+            pass
+    
+    return compile_pdf_to(rendered_tex, pdf_path), content_hash
+
+def send_pdf(pdf_path, download_name, etag=True, immutable=False):
+    """Send a PDF download with Range, ETag and If-None-Match support.
+    
+    Pass a content hash as etag to use it as a strong validator. immutable
+    marks the URL itself as content-addressed so it can be cached indefinitely;
+    everything else must be revalidated (cheap 304s).
+    """
+    accel_prefix = app.config['PDF_ACCEL_REDIRECT_PREFIX']
+    if accel_prefix:
+        # The front-end server streams the file (and handles Range) itself
+        response = app.response_class(mimetype='application/pdf')
+        response.headers['X-Accel-Redirect'] = (
+            accel_prefix.rstrip('/') + '/' + os.path.relpath(pdf_path).replace(os.sep, '/'))
+        response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+        if isinstance(etag, str):
+            response.set_etag(etag)
+            response.make_conditional(request)
+    else:
+        # send_file uses wsgi.file_wrapper, so servers like gunicorn stream via sendfile()
+        response = send_file(os.path.abspath(pdf_path), mimetype='application/pdf', as_attachment=True,
+                             download_name=download_name, conditional=True, etag=etag)
+    
+    if immutable:
+        response.headers['Cache-Control'] = f'private, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def conditional_json(version_names, build, *extra):
+    """Serve JSON with an ETag derived from data set versions.
+    
+    If the client's If-None-Match still matches, answer 304 without calling
+    build(). Otherwise build() returns data to jsonify or a response; non-200
+    responses are passed through without validators. extra covers anything
+    else the payload depends on, such as defaults derived from today's date.
+    """
+    versions = get_data_versions(['epoch', *version_names])
+    etag = '-'.join(str(part) for part in (*versions, *extra))
+    
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = build()
+        if not isinstance(response, app.response_class):
+            response = jsonify(response)
+        if response.status_code != 200:
+            return response
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 @app.route('/')
 def index():
-    jobs = get_all_jobs()
-    return render_template('index.html', jobs=jobs)
+    # The page only depends on job data, so it's re-rendered only after a write
+    return fragment_cache.get_or_render(
+        ('index',),
+        get_data_version('jobs'),
+        lambda: render_template('index.html', jobs=get_all_jobs())
+    )
 
 @app.route('/add-job', methods=['POST'])
 def create_job():
@@ -125,8 +215,8 @@ def download_resume():
     mode = request.args.get('mode', 'handcrafted')
     model_type = request.args.get('model_type', 'openai')
     
-    pdf_path = generate_pdf(mode, model_type)
-    return send_file(pdf_path, as_attachment=True)
+    pdf_path, content_hash = generate_pdf(mode, model_type)
+    return send_pdf(pdf_path, 'resume.pdf', etag=content_hash)
 
 @app.route('/add-point/<int:job_id>', methods=['POST'])
 def add_point(job_id):
@@ -168,70 +258,139 @@ def test_ai(model_type):
         'model': model_type
     })
 
+@task_runner.register('optimize_resume')
+def optimize_resume_task(task):
+    payload = task['payload']
+    model_type = payload.get('model_type', 'openai')
+    
+    # Only bullets without a cached score for this job description go to the model
+    success, result = resume_optimizer.optimize_resume(
+        model_type, payload.get('job_description', ''), payload.get('story', ''), payload.get('strategy'))
+    if not success:
+        # Only timeouts, rate limits and provider errors are worth another attempt
+        if is_transient(result):
+            raise Exception(result)
+        raise task_runner.PermanentTaskError(result)
+    
+    task_runner.check_cancelled(task)
+    
+    # Update job orders in database
+    update_job_order(result['job_order'])
+    
+    # Update point orders
+    for job_id, points in result['point_orders'].items():
+        for point_id, order_data in points.items():
+            update_point_order_db(point_id, order_data['order'])
+    
+    # Store the AI ordering
+    store_ai_ordering(result['job_order'], result['point_orders'], model_type)
+    return {
+        'model_type': model_type,
+        'strategy': result['strategy'],
+        'scored_points': result['scored_points'],
+        'cached_points': result['cached_points']
+    }
+
+@task_runner.register('generate_pdf')
+def generate_pdf_task(task):
+    payload = task['payload']
+    pdf_path, content_hash = generate_pdf(
+        payload.get('mode', 'handcrafted'), payload.get('model_type', 'openai'),
+        os.path.join(GENERATED_FOLDER, f"resume_{task['id']}.pdf"))
+    return {'pdf_path': pdf_path, 'content_hash': content_hash}
+
+def task_accepted(task_id):
+    """202 response pointing the client at a queued task's status"""
+    return jsonify({
+        'success': True,
+        'task_id': task_id,
+        'status_url': url_for('task_status', task_id=task_id)
+    }), 202
+
 @app.route('/optimize-resume', methods=['POST'])
 def optimize_resume():
-    try:
-        data = request.get_json()
-        model_type = data.get('model_type', 'openai')
-        job_description = data.get('job_description', '')
-        story = data.get('story', '')
-        
-        # Get all jobs from database
-        jobs = get_all_jobs()
-        
-        # Initialize AI service with the selected model
-        ai_service = AIService(AIModel.DEEPSEEK if model_type == 'deepseek' else AIModel.OPENAI)
-        
-        # Call optimize_resume method
-        success, result = ai_service.optimize_resume(jobs, job_description, story)
-        
-        if success:
-            # Update job orders in database
-            update_job_order(result['job_order'])
-            
-            # Update point orders
-            for job_id, points in result['point_orders'].items():
-                for point_id, order_data in points.items():
-                    update_point_order_db(point_id, order_data['order'])
-            
-            # Store the AI ordering
-            store_ai_ordering(result['job_order'], result['point_orders'], model_type)
-            
-            return jsonify({'success': True})
-        else:
-            return jsonify({'success': False, 'error': result})
-            
-    except Exception as e:
-        print(f"Error in optimize_resume: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)})
+    """Queue an AI reordering of jobs and points; poll status_url for the outcome"""
+    data = request.get_json(silent=True) or {}
+    if data.get('strategy') and data['strategy'] not in STRATEGIES:
+        return jsonify({'error': f"strategy must be one of {', '.join(STRATEGIES)}"}), 400
+    task_id = task_runner.submit('optimize_resume', {
+        'model_type': data.get('model_type', 'openai'),
+        'job_description': data.get('job_description', ''),
+        'story': data.get('story', ''),
+        'strategy': data.get('strategy')
+    })
+    return task_accepted(task_id)
 
 @app.route('/get-resume-view')
 def get_resume_view():
     mode = request.args.get('mode', 'handcrafted')
     model_type = request.args.get('model_type', 'openai')
     
-    try:
+    def render_jobs_list():
         if mode == 'handcrafted':
             jobs = get_all_jobs()
         else:
             jobs = get_ai_ordered_jobs(model_type)
-        
         return render_template('_jobs_list.html', jobs=jobs)
+    
+    try:
+        key = ('jobs_list', 'handcrafted') if mode == 'handcrafted' else ('jobs_list', 'ai', model_type)
+        return fragment_cache.get_or_render(key, get_data_version('jobs'), render_jobs_list)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+APPLICATIONS_PER_PAGE = 50
+APPLICATION_STATUSES = ('applied', 'interviewing', 'rejected', 'accepted')
+
 @app.route('/resumes')
 def resumes():
-    applications = get_all_applications()
+    status = request.args.get('status')
+    if status not in APPLICATION_STATUSES:
+        status = None
+    page = max(request.args.get('page', 1, type=int), 1)
+    
+    status_counts = get_application_status_counts()
+    applications = get_application_summaries(
+        status=status,
+        limit=APPLICATIONS_PER_PAGE,
+        offset=(page - 1) * APPLICATIONS_PER_PAGE
+    )
+    matching = status_counts[status] if status else status_counts['total']
+    total_pages = max((matching + APPLICATIONS_PER_PAGE - 1) // APPLICATIONS_PER_PAGE, 1)
+    
     jobs = get_all_jobs()  # For the job selection in new application form
-    return render_template('resumes.html', applications=applications, jobs=jobs)
+    return render_template('resumes.html',
+                         applications=applications,
+                         status_counts=status_counts,
+                         selected_status=status,
+                         page=page,
+                         total_pages=total_pages,
+                         jobs=jobs)
+
+@app.route('/api/applications')
+def api_applications():
+    """API endpoint to page through application summaries"""
+    status = request.args.get('status') or None
+    if status is not None and status not in APPLICATION_STATUSES:
+        return jsonify({'error': f"status must be one of {', '.join(APPLICATION_STATUSES)}"}), 400
+    limit = max(1, min(request.args.get('limit', APPLICATIONS_PER_PAGE, type=int), 500))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    return conditional_json(
+        ['applications'],
+        lambda: get_application_summaries(status=status, limit=limit, offset=offset)
+    )
 
 @app.route('/application/<int:app_id>')
 def view_application(app_id):
-    application = get_application(app_id)
-    if not application:
-        return jsonify({'error': 'Application not found'}), 404
-    return jsonify(application)
+    def build():
+        application = get_application(app_id)
+        if not application:
+            response = jsonify({'error': 'Application not found'})
+            response.status_code = 404
+            return response
+        return application
+    
+    return conditional_json(['applications', 'jobs'], build)
 
 @app.route('/update-status/<int:app_id>', methods=['POST'])
 def update_status(app_id):
@@ -242,76 +401,35 @@ def update_status(app_id):
 @app.route('/api/jobs')
 def api_jobs():
     """API endpoint to get all jobs with their points"""
-    jobs = get_all_jobs()
-    return jsonify(jobs)
+    return conditional_json(['jobs'], get_all_jobs)
 
 @app.route('/generate-application-resume/<int:app_id>')
 def generate_application_resume(app_id):
-    """Generate a resume PDF for a specific application using its linked jobs"""
+    """Serve the resume PDF frozen for a specific application"""
     try:
-        jobs = get_jobs_for_application(app_id)
-        settings = get_settings()
-        
-        if not jobs:
+        pdf_path, content_hash = get_application_pdf(app_id)
+        if not pdf_path:
             return "No jobs linked to this application", 400
         
-        # Convert to template format
-        experience_data = {
-            f'job{i+1}': {
-                'dates': job['dates'],
-                'title': job['title'],
-                'company': job['company'],
-                'location': job['location'],
-                'points': job['points'][:settings['points_per_job']]
-            } for i, job in enumerate(jobs[:settings['jobs_on_resume']])
-        }
-        
-        # Define paths
-        temp_tex_path = os.path.join('static', 'temp_resume.tex')
-        output_dir = 'static'
-        
-        # Ensure output directory exists
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Load and render the LaTeX template
-        env = Environment(
-            loader=FileSystemLoader('templates'),
-            block_start_string=r'\BLOCK{',
-            block_end_string='}',
-            variable_start_string=r'\VAR{',
-            variable_end_string='}',
-            comment_start_string=r'\#{',
-            comment_end_string='}',
-            line_statement_prefix='%%',
-            line_comment_prefix='%#',
-            trim_blocks=True,
-            autoescape=False,
-        )
-        template = env.get_template('resume_template.tex')
-        rendered_tex = template.render(**experience_data)
-        
-        # Write the rendered template
-        with open(temp_tex_path, 'w') as f:
-            f.write(rendered_tex)
-        
-        # Run pdflatex
-        result = subprocess.run([
-            '/Library/TeX/texbin/pdflatex',
-            '-output-directory', output_dir,
-            temp_tex_path
-        ], capture_output=True, text=True)
+        return send_pdf(pdf_path, 'resume.pdf', etag=content_hash)
+    except Exception as e:
+        logger.exception("Error generating resume")
+        return str(e), 500
+
+@app.route('/resume-snapshot/<content_hash>.pdf')
+def resume_snapshot(content_hash):
+    """Serve a frozen resume PDF by content hash (immutable, cacheable forever)"""
+    if not re.fullmatch(r'[0-9a-f]{64}', content_hash):
+        return "Resume not found", 404
+    
+    try:
+        pdf_path = get_snapshot_pdf(content_hash)
+        if not pdf_path:
+            return "Resume not found", 404
         
-        if result.returncode != 0:
-            print("LaTeX Error:", result.stderr)
-            return "PDF generation failed", 500
-            
-        pdf_path = os.path.join(output_dir, 'temp_resume.pdf')
-        if not os.path.exists(pdf_path):
-            return "PDF not generated", 500
-            
-        return send_file(pdf_path, as_attachment=True, download_name='resume.pdf')
+        return send_pdf(pdf_path, 'resume.pdf', etag=content_hash, immutable=True)
     except Exception as e:
-        print(f"Error generating resume: {str(e)}")
+        logger.exception("Error generating resume")
         return str(e), 500
 
 def allowed_file(filename):
@@ -320,20 +438,13 @@ def allowed_file(filename):
 @app.route('/create-application', methods=['POST'])
 def create_application_route():
     try:
-        # Ensure upload directory exists
-        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        
-        # Handle file upload
-        resume_path = None
+        # Handle file upload (stored once per distinct content)
+        resume_path = resume_filename = None
         if 'resume' in request.files:
             file = request.files['resume']
             if file and file.filename and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"{timestamp}_{filename}"
-                filepath = os.path.join(UPLOAD_FOLDER, filename)
-                file.save(filepath)
-                resume_path = filepath
+                resume_filename = secure_filename(file.filename)
+                resume_path = store_upload(file.stream, resume_filename)
 
         # Get form data
         data = request.form
@@ -363,29 +474,36 @@ def create_application_route():
             story=data.get('story', ''),
             job_ids=job_ids,
             point_selections=point_selections,
-            resume_path=resume_path
+            resume_path=resume_path,
+            resume_filename=resume_filename
         )
         
+        # Freeze the resume content now so later bullet edits don't change it;
+        # the PDF is compiled on its first download (get_application_pdf)
+        try:
+            snapshot_application(app_id, compile=False)
+        except Exception as e:
+            logger.exception("Error snapshotting application resume", extra={'app_id': app_id})
+        
         return jsonify({'success': True, 'id': app_id})
     except Exception as e:
-        print(f"Error creating application: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error creating application")
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/download-application-resume/<int:app_id>')
 def download_application_resume(app_id):
-    conn = sqlite3.connect('resume.db')
-    c = conn.cursor()
+    resume_path, resume_filename = get_application_resume(app_id)
     
-    c.execute('SELECT resume_path FROM job_applications WHERE id = ?', (app_id,))
-    result = c.fetchone()
-    conn.close()
-    
-    if not result or not result[0]:
+    if not resume_path or not os.path.exists(resume_path):
         return "No resume found", 404
-        
-    return send_file(result[0], as_attachment=True)
+    
+    # The blob may be shared with other applications; download it under the
+    # name this application uploaded it as
+    blob = get_resume_blob_by_path(resume_path)
+    if blob:
+        return send_pdf(resume_path, resume_filename or blob['filename'] or 'resume.pdf',
+                        etag=blob['content_hash'])
+    return send_pdf(resume_path, resume_filename or os.path.basename(resume_path))
 
 @app.route('/delete-application/<int:app_id>', methods=['POST'])
 def delete_application_route(app_id):
@@ -393,21 +511,73 @@ def delete_application_route(app_id):
         # Delete from database and get resume path
         resume_path = db_delete_application(app_id)
         
-        # Delete resume file if it exists
-        if resume_path and os.path.exists(resume_path):
+        if resume_path and get_resume_blob_by_path(resume_path):
+            # Shared blob: only removed once no application references it
+            collect_garbage()
+        elif resume_path and os.path.exists(resume_path):
             os.remove(resume_path)
         
+        # Likewise its resume snapshot, once no other application shares it
+        collect_snapshot_garbage()
+        
         return jsonify({'success': True})
     except Exception as e:
-        print(f"Error deleting application: {str(e)}")
+        logger.exception("Error deleting application", extra={'app_id': app_id})
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/generate-pdf')
 def generate_pdf_route():
     mode = request.args.get('mode', 'handcrafted')
     model_type = request.args.get('model_type', 'openai')
-    pdf_path = generate_pdf(mode, model_type)
-    return send_file(pdf_path, as_attachment=True, download_name='resume.pdf')
+    pdf_path, content_hash = generate_pdf(mode, model_type)
+    return send_pdf(pdf_path, 'resume.pdf', etag=content_hash)
+
+@app.route('/generate-pdf', methods=['POST'])
+def queue_generate_pdf():
+    """Build the resume PDF in the background; download it from /tasks/<id>/pdf"""
+    data = request.get_json(silent=True) or {}
+    task_id = task_runner.submit('generate_pdf', {
+        'mode': data.get('mode', 'handcrafted'),
+        'model_type': data.get('model_type', 'openai')
+    })
+    return task_accepted(task_id)
+
+# ============================================
+# Task Routes
+# ============================================
+
+@app.before_request
+def ensure_task_workers():
+    # Resumes tasks queued before a restart without waiting for a new submit
+    task_runner.start_workers()
+
+@app.route('/tasks/<int:task_id>')
+def task_status(task_id):
+    task = get_task(task_id)
+    if not task:
+        return jsonify({'error': 'Task not found'}), 404
+    return jsonify(task)
+
+@app.route('/tasks/<int:task_id>/cancel', methods=['POST'])
+def cancel_task_route(task_id):
+    status = cancel_task(task_id)
+    if status is None:
+        return jsonify({'success': False, 'error': 'Task not found'}), 404
+    return jsonify({'success': True, 'status': status})
+
+@app.route('/tasks/<int:task_id>/pdf')
+def task_pdf(task_id):
+    """Download the PDF produced by a finished generate_pdf task"""
+    task = get_task(task_id)
+    if not task or task['kind'] != 'generate_pdf':
+        return "Task not found", 404
+    if task['status'] != 'succeeded':
+        return f"Task is {task['status']}", 409
+    
+    pdf_path = task['result']['pdf_path']
+    if not os.path.exists(pdf_path):
+        return "Resume not found", 404
+    return send_pdf(pdf_path, 'resume.pdf', etag=task['result']['content_hash'])
 
 # ============================================
 # Settings Routes
@@ -456,11 +626,14 @@ def journal():
         entries = get_journal_entries(job_id=job_id, limit=20)
         stats = get_journal_stats(job_id=job_id)
     
+    candidates = get_point_candidates(job_id=job_id)
+    
     return render_template('journal.html', 
                          jobs=jobs, 
                          entries=entries, 
                          stats=stats,
                          tags=tags,
+                         candidates=candidates,
                          selected_job_id=job_id)
 
 @app.route('/journal/entry', methods=['POST'])
@@ -489,18 +662,21 @@ def create_entry():
         
         return jsonify({'success': True, 'id': entry_id})
     except Exception as e:
-        print(f"Error creating journal entry: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error creating journal entry")
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/journal/entry/<int:entry_id>')
 def get_entry(entry_id):
     """Get a single journal entry"""
-    entry = get_journal_entry(entry_id)
-    if not entry:
-        return jsonify({'error': 'Entry not found'}), 404
-    return jsonify(entry)
+    def build():
+        entry = get_journal_entry(entry_id)
+        if not entry:
+            response = jsonify({'error': 'Entry not found'})
+            response.status_code = 404
+            return response
+        return entry
+    
+    return conditional_json(['journal', 'jobs'], build)
 
 @app.route('/journal/entry/<int:entry_id>', methods=['PUT'])
 def update_entry(entry_id):
@@ -535,22 +711,21 @@ def get_entries():
     limit = request.args.get('limit', 50, type=int)
     offset = request.args.get('offset', 0, type=int)
     
-    entries = get_journal_entries(
+    return conditional_json(['journal', 'jobs'], lambda: get_journal_entries(
         job_id=job_id,
         start_date=start_date,
         end_date=end_date,
         limit=limit,
         offset=offset
-    )
-    
-    return jsonify(entries)
+    ))
 
 @app.route('/journal/stats')
 def journal_stats():
     """Get journal statistics"""
     job_id = request.args.get('job_id', type=int)
-    stats = get_journal_stats(job_id=job_id)
-    return jsonify(stats)
+    # The streak is counted back from today, so the date is part of the version
+    return conditional_json(['journal'], lambda: get_journal_stats(job_id=job_id),
+                            datetime.now().strftime('%Y%m%d'))
 
 @app.route('/journal/calendar')
 def journal_calendar():
@@ -568,8 +743,128 @@ def journal_calendar():
         else:
             end_date = today.replace(month=today.month+1, day=1).strftime('%Y-%m-%d')
     
-    entries = get_entries_by_date_range(start_date, end_date, job_id)
-    return jsonify(entries)
+    return conditional_json(['journal'],
+                            lambda: get_entries_by_date_range(start_date, end_date, job_id),
+                            start_date, end_date)
+
+# Longest range the heatmap endpoint will return in one response
+MAX_HEATMAP_DAYS = 366 * 10
+
+@app.route('/journal/heatmap')
+def journal_heatmap():
+    """Get compact per-day activity arrays for a year-at-a-glance heatmap"""
+    job_id = request.args.get('job_id', type=int)
+    end_date = request.args.get('end_date') or datetime.now().strftime('%Y-%m-%d')
+    
+    try:
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        start_date = request.args.get('start_date') or (end - timedelta(days=364)).strftime('%Y-%m-%d')
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+    
+    if start > end or (end - start).days >= MAX_HEATMAP_DAYS:
+        return jsonify({'error': 'Invalid date range'}), 400
+    
+    # The aggregates only change when journal data is written, so the version
+    # counter (plus the resolved range) decides whether the client's copy is current
+    return conditional_json(['journal'],
+                            lambda: get_journal_heatmap(start_date, end_date, job_id),
+                            start_date, end_date)
+
+# ============================================
+# Highlight Miner Routes
+# ============================================
+
+@app.route('/journal/mine-highlights', methods=['POST'])
+def mine_highlights_route():
+    """Start a background pass turning new highlight entries into candidate bullets"""
+    data = request.get_json(silent=True) or {}
+    model_type = data.get('model_type') or None
+    if model_type == 'local':
+        model_type = None
+    
+    task_id = start_mining(model_type=model_type, job_id=data.get('job_id'))
+    if task_id is None:
+        # A pass is already queued or running and will pick these entries up
+        return jsonify({'success': True, 'started': False}), 202
+    
+    return jsonify({
+        'success': True,
+        'started': True,
+        'task_id': task_id,
+        'status_url': url_for('task_status', task_id=task_id)
+    }), 202
+
+@app.route('/point-candidates')
+def point_candidates():
+    """Get candidate bullets awaiting review"""
+    job_id = request.args.get('job_id', type=int)
+    return conditional_json(['candidates', 'jobs'], lambda: get_point_candidates(job_id=job_id))
+
+@app.route('/point-candidates/<int:candidate_id>/accept', methods=['POST'])
+def accept_candidate(candidate_id):
+    """Add a candidate bullet to its job"""
+    point_id = accept_point_candidate(candidate_id)
+    if point_id is None:
+        return jsonify({'success': False, 'error': 'Candidate not found'}), 404
+    return jsonify({'success': True, 'point_id': point_id})
+
+@app.route('/point-candidates/<int:candidate_id>/dismiss', methods=['POST'])
+def dismiss_candidate(candidate_id):
+    """Dismiss a candidate bullet"""
+    dismiss_point_candidate(candidate_id)
+    return jsonify({'success': True})
+
+# ============================================
+# Instrumentation Routes
+# ============================================
+
+@app.before_request
+def start_request_spans():
+    g.request_started = time.perf_counter()
+    g.request_id = structured_logging.start_request(request.headers.get('X-Request-ID'))
+    instrumentation.start_request()
+
+@app.after_request
+def finish_request_spans(response):
+    spans = instrumentation.finish_request()
+    started = g.pop('request_started', None)
+    if started is not None:
+        instrumentation.observe('resume_http_request_seconds', time.perf_counter() - started,
+                                endpoint=request.endpoint or 'unmatched', method=request.method,
+                                status=response.status_code)
+    if spans:
+        response.headers['Server-Timing'] = instrumentation.server_timing(spans)
+        request.environ['resume.spans'] = spans
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    structured_logging.finish_request()
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint (per process; scrape each worker or run one)"""
+    return app.response_class(instrumentation.render_metrics(),
+                              mimetype='text/plain; version=0.0.4')
+
+# ============================================
+# Health Routes
+# ============================================
+
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: the database is reachable and initialized"""
+    try:
+        check_database()
+    except Exception as e:
+        return jsonify({'status': 'unavailable', 'error': str(e)}), 503
+    return jsonify({'status': 'ready'})
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,321 @@
+"""Time AIService against the local stub AI server, without the network.
+
+Each scenario starts stub_ai_server.py with its own settings, points both
+models at it through OPENAI_BASE_URL/DEEPSEEK_BASE_URL and calls
+AIService.optimize_resume on jobs from a seeded database (generate_data.py):
+
+    sequential   one call at a time; p50 minus --latency-ms is client overhead
+    concurrent   --concurrency threads sharing the stub
+    errors       --error-rate of responses are 429/500; shows the SDK's retries
+    malformed    --malformed-rate of replies are garbled JSON; failures are wasted calls
+    streaming    stream=True completions; time to first chunk vs. the whole reply
+    replay       record the stub's answers once, then serve them with --strict
+    strategies   single vs. hedged vs. ensemble optimize_resume against two stubs,
+                 the primary with a --slow-rate tail of --slow-ms; tokens per call
+    rate_limit   a queue of batch calls under --rpm, with interactive calls
+                 arriving behind it: FIFO vs. priority scheduling
+    incremental  resume_optimizer with a cold score cache, after adding one
+                 bullet, and with nothing changed (no AI call at all)
+
+    python benchmarks/bench_ai.py --calls 50 --latency-ms 200 --output before.json
+    python benchmarks/bench_ai.py --calls 50 --latency-ms 200 --compare before.json
+    python benchmarks/bench_ai.py --replay recorded.jsonl --only sequential
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generate_data
+import stub_ai_server
+from bench_suite import REGRESSION_THRESHOLD, git_commit
+from load_test import STUB_CONFIG, percentile
+
+SCENARIOS = ('sequential', 'concurrent', 'errors', 'malformed', 'streaming', 'replay', 'strategies', 'rate_limit', 'incremental')
+
+def use_stub(server):
+    url = f'http://127.0.0.1:{server.server_port}/v1'
+    os.environ['OPENAI_BASE_URL'] = url
+    os.environ['DEEPSEEK_BASE_URL'] = url
+
+def run_calls(call, calls, concurrency=1):
+    """Run call() calls times over concurrency threads; returns (latencies, failures, wall seconds)"""
+    from ai_service import AIModel, AIService
+
+    latencies, failures = [], []
+    remaining = iter(range(calls))
+    lock = threading.Lock()
+
+    def worker():
+        service = AIService(AIModel.OPENAI)
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            start = time.perf_counter()
+            ok = call(service)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                if not ok:
+                    failures.append(1)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, len(failures), time.perf_counter() - start
+
+def summarize(latencies, failures, wall, **extra):
+    latencies = sorted(latencies)
+    return {
+        'calls': len(latencies),
+        'failures': failures,
+        'calls_per_s': round(len(latencies) / wall, 2),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        **extra,
+    }
+
+def optimize(jobs):
+    return lambda service: service.optimize_resume(jobs, 'Reliability engineer', 'Scaling systems')[0]
+
+def scenario_sequential(args, jobs):
+    use_stub(stub_ai_server.start(latency_ms=args.latency_ms, replay=args.replay, ms_per_token=args.ms_per_token))
+    return summarize(*run_calls(optimize(jobs), args.calls))
+
+def scenario_concurrent(args, jobs):
+    use_stub(stub_ai_server.start(latency_ms=args.latency_ms, replay=args.replay))
+    return summarize(*run_calls(optimize(jobs), args.calls, args.concurrency))
+
+def scenario_errors(args, jobs):
+    use_stub(stub_ai_server.start(latency_ms=args.latency_ms, error_rate=args.error_rate, replay=args.replay))
+    return summarize(*run_calls(optimize(jobs), args.calls, args.concurrency))
+
+def scenario_malformed(args, jobs):
+    use_stub(stub_ai_server.start(latency_ms=args.latency_ms, malformed_rate=args.malformed_rate))
+    return summarize(*run_calls(optimize(jobs), args.calls, args.concurrency))
+
+def scenario_streaming(args, jobs):
+    use_stub(stub_ai_server.start(latency_ms=args.latency_ms, chunk_chars=args.chunk_chars,
+                                  chunk_delay_ms=args.chunk_delay_ms))
+    first_chunk = []
+
+    def stream(service):
+        start = time.perf_counter()
+        response = service.client.chat.completions.create(
+            model='gpt-4', stream=True,
+            messages=[{'role': 'user', 'content': f'Optimize: return in the specified JSON format: '
+                                                  f'{{"jobs": {[{"id": job.id, "points": []} for job in jobs]}}}'}])
+        for n, chunk in enumerate(response):
+            if n == 1:
+                first_chunk.append(time.perf_counter() - start)
+        return True
+
+    latencies, failures, wall = run_calls(stream, args.calls)
+    first_chunk.sort()
+    return summarize(latencies, failures, wall,
+                     first_chunk_p50_ms=round(percentile(first_chunk, 0.50) * 1000, 2) if first_chunk else None)
+
+def scenario_replay(args, jobs):
+    # Record from one stub through another, then replay strictly with no upstream
+    recordings = os.path.join(tempfile.mkdtemp(), 'recorded.jsonl')
+    origin = stub_ai_server.start()
+    recorder = stub_ai_server.start(record=recordings, upstream=f'http://127.0.0.1:{origin.server_port}/v1')
+    use_stub(recorder)
+    run_calls(optimize(jobs), 1)
+
+    use_stub(stub_ai_server.start(latency_ms=args.latency_ms, replay=recordings, strict=True))
+    return summarize(*run_calls(optimize(jobs), args.calls, args.concurrency))
+
+def scenario_strategies(args, jobs):
+    import instrumentation
+    from ai_service import AIModel, optimization_service
+
+    primary = stub_ai_server.start(latency_ms=args.latency_ms, ms_per_token=args.ms_per_token,
+                                   slow_rate=args.slow_rate, slow_ms=args.slow_ms)
+    secondary = stub_ai_server.start(latency_ms=args.latency_ms * 1.5, ms_per_token=args.ms_per_token, seed=1)
+    os.environ['OPENAI_BASE_URL'] = f'http://127.0.0.1:{primary.server_port}/v1'
+    os.environ['DEEPSEEK_BASE_URL'] = f'http://127.0.0.1:{secondary.server_port}/v1'
+
+    def tokens(strategy):
+        return sum(value for (metric, labels), value in instrumentation._counters.items()
+                   if metric == 'resume_ai_tokens_total' and dict(labels)['strategy'] == strategy)
+
+    # single runs first, so hedging has the primary's p95 to go on
+    extra = {}
+    for strategy in ('single', 'hedged', 'ensemble'):
+        service = optimization_service(AIModel.OPENAI, strategy)
+        latencies, failures, wall = run_calls(
+            lambda _: service.optimize_resume(jobs, 'Reliability engineer', 'Scaling systems')[0], args.calls)
+        latencies.sort()
+        extra[f'{strategy}_p50_ms'] = round(percentile(latencies, 0.50) * 1000, 2)
+        extra[f'{strategy}_p95_ms'] = round(percentile(latencies, 0.95) * 1000, 2)
+        # Let hedged losers finish so their tokens land in this strategy's count
+        time.sleep(args.slow_ms / 1000)
+        extra[f'{strategy}_tokens_per_call'] = round(tokens(strategy) / len(latencies))
+    return summarize(latencies, failures, wall, **extra)
+
+def scenario_rate_limit(args, jobs):
+    import ai_scheduler
+    from ai_service import AIModel, AIService
+
+    use_stub(stub_ai_server.start(latency_ms=args.latency_ms))
+    extra = {}
+    for mode in ('fifo', 'priority'):
+        # Start from an empty bucket, as after a burst has used the minute's budget
+        scheduler = ai_scheduler.ProviderScheduler('openai', args.rpm, 0)
+        scheduler.requests.level = 0
+        ai_scheduler._schedulers['openai'] = scheduler
+        waits = {'batch': [], 'interactive': []}
+
+        def client(kind, delay):
+            time.sleep(delay)
+            service = AIService(AIModel.OPENAI, priority='interactive' if mode == 'fifo' else kind)
+            start = time.perf_counter()
+            service.optimize_resume(jobs, 'Reliability engineer', 'Scaling systems')
+            waits[kind].append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=client, args=('batch', 0)) for _ in range(args.calls)]
+        threads += [threading.Thread(target=client, args=('interactive', 1 + n)) for n in range(5)]
+        wall = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - wall
+        for kind, values in waits.items():
+            extra[f'{mode}_{kind}_p50_ms'] = round(percentile(sorted(values), 0.50) * 1000, 2)
+            extra[f'{mode}_{kind}_max_ms'] = round(max(values) * 1000, 2)
+
+    del ai_scheduler._schedulers['openai']
+    return summarize(waits['batch'] + waits['interactive'], 0, wall, **extra)
+
+def scenario_incremental(args, jobs):
+    import database
+    import resume_optimizer
+
+    use_stub(stub_ai_server.start(latency_ms=args.latency_ms, ms_per_token=args.ms_per_token))
+    runs = iter(range(args.calls))
+    timings = {'cold': [], 'one_new_point': [], 'unchanged': []}
+    points_sent = {'cold': [], 'one_new_point': []}
+
+    def timed(name, job_description):
+        start = time.perf_counter()
+        success, result = resume_optimizer.optimize_resume('openai', job_description, 'Scaling systems')
+        timings[name].append(time.perf_counter() - start)
+        if name in points_sent:
+            points_sent[name].append(result['scored_points'] if success else 0)
+        return success
+
+    def call(service):
+        # A job description the cache hasn't seen, then one more bullet, then no change
+        job_description = f'Reliability engineer #{next(runs)}'
+        ok = timed('cold', job_description)
+        database.add_job_points(jobs[0].id, f'Added bullet for {job_description}', 999)
+        ok = timed('one_new_point', job_description) and ok
+        return timed('unchanged', job_description) and ok
+
+    latencies, failures, wall = run_calls(call, args.calls)
+    extra = {}
+    for name, values in timings.items():
+        extra[f'{name}_p50_ms'] = round(percentile(sorted(values), 0.50) * 1000, 2)
+    for name, values in points_sent.items():
+        extra[f'{name}_points_sent'] = round(sum(values) / len(values), 1)
+    return summarize(latencies, failures, wall, **extra)
+
+def compare(results, baseline):
+    print(f"\n{'scenario':<12} {'before p50':>11} {'after p50':>10} {'ratio':>7}")
+    for name, result in results['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if not before:
+            continue
+        ratio = result['p50_ms'] / before['p50_ms'] if before['p50_ms'] else float('inf')
+        flag = '  REGRESSION' if ratio > REGRESSION_THRESHOLD else ''
+        print(f"{name:<12} {before['p50_ms']:>11.2f} {result['p50_ms']:>10.2f} {ratio:>6.2f}x{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1, help='generate_data scale (jobs in the prompt)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--calls', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=100)
+    parser.add_argument('--error-rate', type=float, default=0.2)
+    parser.add_argument('--rpm', type=float, default=120, help='requests per minute for rate_limit')
+    parser.add_argument('--slow-rate', type=float, default=0.04, help='share of primary-stub calls in the tail')
+    parser.add_argument('--slow-ms', type=float, default=2000)
+    parser.add_argument('--ms-per-token', type=float, default=0, help='stub generation delay per completion token')
+    parser.add_argument('--malformed-rate', type=float, default=0.5)
+    parser.add_argument('--chunk-chars', type=int, default=16)
+    parser.add_argument('--chunk-delay-ms', type=float, default=2)
+    parser.add_argument('--replay', help='recorded completions for the optimize scenarios')
+    parser.add_argument('--only', nargs='+', choices=SCENARIOS)
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--compare', help='baseline results JSON to compare against')
+    args = parser.parse_args()
+
+    output_path = args.output and os.path.abspath(args.output)
+    compare_path = args.compare and os.path.abspath(args.compare)
+    args.replay = args.replay and os.path.abspath(args.replay)
+
+    workdir = tempfile.mkdtemp()
+    # Dummy keys: every request goes to the stub
+    with open(os.path.join(workdir, 'config.py'), 'w') as f:
+        f.write(STUB_CONFIG)
+    sys.path.insert(0, workdir)
+    os.chdir(workdir)
+    counts = generate_data.generate(args.scale, args.seed, os.path.join(workdir, 'resume.db'))
+
+    import database
+    jobs = database.get_all_jobs()
+    print(f"{counts['jobs']} jobs, {counts['job_points']} points; stub latency {args.latency_ms:g} ms")
+
+    results = {
+        'commit': git_commit(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'scenarios': {},
+    }
+    for name in SCENARIOS:
+        if args.only and name not in args.only:
+            continue
+        result = globals()[f'scenario_{name}'](args, jobs)
+        results['scenarios'][name] = result
+        extra = f"  first chunk p50 {result['first_chunk_p50_ms']:.1f} ms" if 'first_chunk_p50_ms' in result else ''
+        if 'single_p50_ms' in result:
+            extra = ''.join(f"\n{'':<12} {strategy:<9} p50 {result[f'{strategy}_p50_ms']:>8.1f}  "
+                            f"p95 {result[f'{strategy}_p95_ms']:>8.1f} ms  "
+                            f"{result[f'{strategy}_tokens_per_call']:>6} tokens/call"
+                            for strategy in ('single', 'hedged', 'ensemble'))
+        if 'fifo_batch_p50_ms' in result:
+            extra = ''.join(f"\n{'':<12} {mode:<9} interactive p50 {result[f'{mode}_interactive_p50_ms']:>8.1f} "
+                            f"max {result[f'{mode}_interactive_max_ms']:>8.1f} ms, "
+                            f"batch p50 {result[f'{mode}_batch_p50_ms']:>8.1f} max {result[f'{mode}_batch_max_ms']:>8.1f} ms"
+                            for mode in ('fifo', 'priority'))
+        if 'cold_p50_ms' in result:
+            extra = (f"\n{'':<12} cold {result['cold_p50_ms']:.1f} ms ({result['cold_points_sent']:g} points), "
+                     f"one new point {result['one_new_point_p50_ms']:.1f} ms ({result['one_new_point_points_sent']:g}), "
+                     f"unchanged {result['unchanged_p50_ms']:.1f} ms")
+        print(f"{name:<12} {result['calls']:>4} calls {result['failures']:>3} failed {result['calls_per_s']:>7.1f}/s  "
+              f"p50 {result['p50_ms']:>8.1f}  p95 {result['p95_ms']:>8.1f}  p99 {result['p99_ms']:>8.1f} ms{extra}")
+
+    if output_path:
+        with open(output_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if compare_path:
+        with open(compare_path) as f:
+            compare(results, json.load(f))
+
+if __name__ == '__main__':
+    main()
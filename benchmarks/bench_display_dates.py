@@ -0,0 +1,95 @@
+"""Measure what stored and memoized display dates save on large job lists.
+
+Builds a throwaway database with 10,000 jobs spread over a few hundred
+distinct month ranges, then times get_all_jobs + JSON serialization with
+dates formatted per row (the old behaviour), through the memoized
+formatter, and read from the stored jobs.display_dates column.
+
+    python benchmarks/bench_display_dates.py
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import models
+
+JOBS = 10000
+POINTS_PER_JOB = 3
+REPEATS = 5
+
+def populate():
+    conn = sqlite3.connect('resume.db')
+    c = conn.cursor()
+    # Written without display_dates so init_db's backfill fills them in
+    c.executemany('''
+        INSERT INTO jobs (id, title, company, location, start_date, end_date, current, display_order)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(i, f'Engineer {i}', f'Company {i % 500}', 'Fargo, ND',
+           f'{2000 + i % 20}-{1 + i % 12:02d}', None if i % 7 == 0 else f'{2021 + i % 3}-{1 + i % 5:02d}',
+           i % 7 == 0, i)
+          for i in range(2, JOBS + 2)])
+    c.executemany('INSERT INTO job_points (job_id, point, order_num) VALUES (?, ?, ?)',
+                  [(job_id, f'Shipped feature {n} for team {job_id}', n)
+                   for job_id in range(2, JOBS + 2) for n in range(POINTS_PER_JOB)])
+    conn.commit()
+    conn.close()
+
+def clear_stored_dates(jobs):
+    for job in jobs:
+        job.display_dates = None
+    return jobs
+
+def unmemoized(jobs):
+    """Format every row with the raw strptime/strftime path"""
+    for job in jobs:
+        job.display_dates = models.format_dates.__wrapped__(job.start_date, job.end_date, job.current)
+    return jobs
+
+def timed(fn):
+    best = float('inf')
+    for _ in range(REPEATS):
+        models.format_dates.cache_clear()
+        start = time.perf_counter()
+        json.dumps(fn(), default=lambda o: o.to_dict())
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    workdir = tempfile.mkdtemp()
+    os.chdir(workdir)
+    database.init_db()
+    populate()
+    database.init_db()
+
+    cases = [
+        ('strptime per row', lambda: unmemoized(database.get_all_jobs())),
+        ('memoized', lambda: clear_stored_dates(database.get_all_jobs())),
+        ('stored column', database.get_all_jobs),
+    ]
+
+    print(f'{JOBS} jobs, best of {REPEATS} (get_all_jobs + JSON)')
+    baseline = None
+    for name, fn in cases:
+        elapsed = timed(fn)
+        baseline = baseline or elapsed
+        print(f'{name:<18} {elapsed * 1000:>8.1f} ms  {baseline / elapsed:>5.2f}x')
+
+    models.format_dates.cache_clear()
+    start = time.perf_counter()
+    for _ in range(JOBS):
+        models.format_dates.__wrapped__('2019-03', '2021-11', False)
+    raw = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(JOBS):
+        models.format_dates('2019-03', '2021-11', False)
+    cached = time.perf_counter() - start
+    print(f'format_dates x{JOBS}: {raw * 1000:.1f} ms raw, {cached * 1000:.1f} ms memoized')
+
+if __name__ == '__main__':
+    main()
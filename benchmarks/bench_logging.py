@@ -0,0 +1,98 @@
+"""Per-call cost of logging an AI payload: print() versus structured_logging.
+
+Builds the jobs payload AIService.optimize_resume sends (from a seeded
+database, generate_data.py) and times, per call on the calling thread:
+
+    print                 the old print("Sending to AI:", jobs_data)
+    payload_info_level    log_payload() with the production level (INFO)
+    payload_debug_level   log_payload() with DEBUG on (truncated, queued)
+    info_record           a small logger.info() with extra fields
+    exception_record      logger.exception() inside an except block
+
+Output goes to /dev/null, so print's numbers are a lower bound; a terminal
+or a pipe to a log collector is slower still.
+
+    python benchmarks/bench_logging.py --scale 10
+"""
+import argparse
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generate_data
+
+def jobs_payload(jobs):
+    return {
+        "jobs": [{
+            "id": job.id,
+            "title": job.title,
+            "company": job.company,
+            "points": [{"id": point_id, "text": point} for point_id, point in job.point_items]
+        } for job in jobs],
+        "job_description": 'Looking for an engineer to own reliability. ' * 10,
+        "personal_story": 'Scaling systems'
+    }
+
+def time_per_call(fn, calls, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        runs.append((time.perf_counter() - start) / calls)
+    return statistics.median(runs)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.chdir(workdir)
+    generate_data.generate(args.scale, 0, os.path.join(workdir, 'resume.db'))
+    import database
+    payload = jobs_payload(database.get_all_jobs())
+
+    devnull = open(os.devnull, 'w')
+    sys.stderr = devnull  # the log writer thread's output
+    import structured_logging
+    structured_logging.configure()
+    logger = structured_logging.get_logger('ai')
+
+    def print_payload():
+        with contextlib.redirect_stdout(devnull):
+            print("Sending to AI:", payload)
+
+    def exception_record():
+        try:
+            raise ValueError('AI response missing required data')
+        except ValueError:
+            logger.exception("Optimization error")
+
+    cases = [
+        ('print', print_payload),
+        ('payload_info_level', lambda: structured_logging.log_payload(logger, "Sending to AI", payload, model='openai')),
+        ('payload_debug_level', lambda: structured_logging.log_payload(logger, "Sending to AI", payload, model='openai')),
+        ('info_record', lambda: logger.info("AI request finished", extra={'model': 'openai', 'ms': 812.5})),
+        ('exception_record', exception_record),
+    ]
+
+    print(f"payload: {len(str(payload))} chars ({args.scale * generate_data.JOBS} jobs)", file=sys.__stderr__)
+    for name, fn in cases:
+        logger.setLevel(logging.DEBUG if name == 'payload_debug_level' else logging.INFO)
+        per_call = time_per_call(fn, args.calls, args.repeat)
+        structured_logging.flush()
+        print(f"  {name:<22} {per_call * 1e6:>10.1f} us/call", file=sys.__stderr__)
+
+if __name__ == '__main__':
+    main()
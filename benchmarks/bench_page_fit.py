@@ -0,0 +1,94 @@
+"""Time page_fit's bullet selection, and check its one-page prediction.
+
+Builds jobs from a seeded database (generate_data.py) at each --scale and
+times, per call:
+
+    fit_all_jobs      fit_page over every job and bullet (no template limit)
+    build_experience  what a PDF build runs: at most the first --jobs jobs
+
+With --compile (needs pdflatex, PDFLATEX_PATH) each scale's resume is also
+compiled once and its page count reported: anything but 1 means the font
+metrics or spacing in page_fit.py need adjusting.
+
+    python benchmarks/bench_page_fit.py --scale 1 5 20
+    PDFLATEX_PATH=$(which pdflatex) python benchmarks/bench_page_fit.py --compile
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generate_data
+from load_test import STUB_CONFIG
+
+def time_per_call(fn, calls, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        runs.append((time.perf_counter() - start) / calls)
+    return statistics.median(runs)
+
+def page_count(pdf_path):
+    with open(pdf_path, 'rb') as f:
+        return len(re.findall(rb'/Type\s*/Page\b', f.read()))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--calls', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=4, help='jobs_on_resume for build_experience')
+    parser.add_argument('--compile', action='store_true', help='compile each resume and count its pages')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    with open(os.path.join(workdir, 'config.py'), 'w') as f:
+        f.write(STUB_CONFIG)
+    sys.path.insert(0, workdir)
+    os.chdir(workdir)
+    os.symlink(os.path.join(ROOT, 'templates'), 'templates')
+
+    import database
+    import page_fit
+    import pdf_service
+
+    print(f"experience budget {page_fit.experience_budget():.1f} pt of {page_fit.TEXT_HEIGHT:.1f} pt")
+    for scale in args.scale:
+        database.DB_PATH = os.path.join(workdir, f'resume_{scale}.db')
+        counts = generate_data.generate(scale, 0, database.DB_PATH)
+        jobs = [{
+            'dates': job.dates,
+            'title': job.title,
+            'company': job.company,
+            'location': job.location,
+            'points': job.points
+        } for job in database.get_all_jobs()]
+        fit_input = [(job['title'], job['company'], job['location'], [(point, None) for point in job['points']])
+                     for job in jobs]
+
+        fit_all = time_per_call(lambda: page_fit.fit_page(fit_input), args.calls, args.repeat)
+        build = time_per_call(lambda: pdf_service.build_experience(jobs, args.jobs), args.calls, args.repeat)
+        experience = pdf_service.build_experience(jobs, args.jobs)
+        chosen = sum(len(job.points) for job in experience)
+        line = (f"scale {scale:>3}: {counts['jobs']:>4} jobs {counts['job_points']:>5} bullets  "
+                f"fit_all_jobs {fit_all * 1000:>7.2f} ms  build_experience {build * 1000:>6.2f} ms  "
+                f"({chosen} bullets chosen)")
+
+        if args.compile:
+            start = time.perf_counter()
+            pdf_path = pdf_service.compile_pdf_to(pdf_service.render_resume_tex(experience),
+                                                  os.path.join(workdir, f'resume_{scale}.pdf'))
+            line += f"  pdflatex {(time.perf_counter() - start) * 1000:.0f} ms, {page_count(pdf_path)} page(s)"
+        print(line)
+
+if __name__ == '__main__':
+    main()
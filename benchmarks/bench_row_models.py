@@ -0,0 +1,156 @@
+"""Compare per-row dict construction with the slotted row models.
+
+Builds a throwaway database with 10,000 jobs x 10 bullets (100k point rows)
+and 100,000 journal entries, then times and measures the memory held by
+the legacy dict-building code against the current database.py functions.
+
+    python benchmarks/bench_row_models.py
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from models import format_dates
+
+JOBS = 10000
+POINTS_PER_JOB = 10
+JOURNAL_ENTRIES = 100000
+
+def legacy_get_all_jobs():
+    """get_all_jobs as it was before the row models (three parallel lists per job)"""
+    conn = sqlite3.connect('resume.db')
+    c = conn.cursor()
+    c.execute('''
+        SELECT j.id, j.title, j.company, j.location, j.start_date,
+               j.end_date, j.current, j.display_order,
+               GROUP_CONCAT(jp.id || ':' || jp.point, '||' ORDER BY jp.order_num) as points
+        FROM jobs j
+        LEFT JOIN job_points jp ON j.id = jp.job_id
+        GROUP BY j.id
+        ORDER BY j.display_order
+    ''')
+    jobs = []
+    for row in c.fetchall():
+        points_data = []
+        if row[8]:
+            for point_str in row[8].split('||'):
+                if ':' in point_str:
+                    point_id, point_text = point_str.split(':', 1)
+                    points_data.append({'id': point_id, 'text': point_text})
+        jobs.append({
+            'id': row[0],
+            'title': row[1],
+            'company': row[2],
+            'location': row[3],
+            'dates': format_dates(row[4], row[5], row[6]),
+            'points': [p['text'] for p in points_data],
+            'point_ids': [p['id'] for p in points_data],
+            'display_order': row[7],
+            'resume_points': [p['text'] for p in points_data[:3]] if points_data else []
+        })
+    conn.close()
+    return jobs
+
+def legacy_get_journal_entries(limit):
+    """get_journal_entries as it was before the row models"""
+    conn = sqlite3.connect('resume.db')
+    c = conn.cursor()
+    c.execute(f'''
+        SELECT je.id, je.job_id, je.entry_date, je.title, je.content,
+               je.hours_worked, je.category, je.mood, je.is_highlight,
+               je.created_at, j.title as job_title, j.company,
+               GROUP_CONCAT(jt.name) as tags
+        FROM journal_entries je
+        JOIN jobs j ON je.job_id = j.id
+        LEFT JOIN journal_entry_tags jet ON je.id = jet.entry_id
+        LEFT JOIN journal_tags jt ON jet.tag_id = jt.id
+        GROUP BY je.id ORDER BY je.entry_date DESC, je.created_at DESC
+        LIMIT {limit} OFFSET 0
+    ''')
+    entries = [{
+        'id': row[0],
+        'job_id': row[1],
+        'entry_date': row[2],
+        'title': row[3],
+        'content': row[4],
+        'hours_worked': row[5],
+        'category': row[6],
+        'mood': row[7],
+        'is_highlight': bool(row[8]),
+        'created_at': row[9],
+        'job_title': row[10],
+        'company': row[11],
+        'tags': row[12].split(',') if row[12] else []
+    } for row in c.fetchall()]
+    conn.close()
+    return entries
+
+def populate():
+    conn = sqlite3.connect('resume.db')
+    c = conn.cursor()
+    c.executemany('''
+        INSERT INTO jobs (id, title, company, location, start_date, end_date, current, display_order)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(i, f'Engineer {i}', f'Company {i % 500}', 'Fargo, ND', '2019-03', '2021-11', 0, i)
+          for i in range(2, JOBS + 2)])
+    c.executemany('INSERT INTO job_points (job_id, point, order_num) VALUES (?, ?, ?)',
+                  [(job_id, f'Improved throughput of service {job_id} by {n}% by rewriting the batch scheduler', n)
+                   for job_id in range(2, JOBS + 2) for n in range(POINTS_PER_JOB)])
+    c.executemany('''
+        INSERT INTO journal_entries (job_id, entry_date, title, content, hours_worked, category, mood, is_highlight)
+        VALUES (?, ?, ?, ?, ?, 'task', 'neutral', ?)
+    ''', [(2 + i % JOBS, f'2024-{1 + i % 12:02d}-{1 + i % 28:02d}', f'Entry {i}',
+           'Worked on the ingestion pipeline and reviewed two pull requests.', 7.5, i % 10 == 0)
+          for i in range(JOURNAL_ENTRIES)])
+    conn.commit()
+    conn.close()
+
+def measure(fn, serialize):
+    """Return (rows, build seconds, MB held by the result, peak MB, JSON seconds)"""
+    start = time.perf_counter()
+    rows = fn()
+    elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    serialize(rows)
+    serialize_time = time.perf_counter() - start
+    del rows
+    
+    # Memory is measured on a separate run; tracing would distort the timings
+    tracemalloc.start()
+    rows = fn()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(rows), elapsed, held, peak, serialize_time
+
+def main():
+    workdir = tempfile.mkdtemp()
+    os.chdir(workdir)
+    database.init_db()
+    populate()
+    
+    # Models are serialized the way app.ModelJSONProvider does it for lists
+    dump_dicts = json.dumps
+    dump_models = lambda rows: json.dumps([row.to_dict() for row in rows])
+    cases = [
+        ('jobs (dicts)', legacy_get_all_jobs, dump_dicts),
+        ('jobs (models)', database.get_all_jobs, dump_models),
+        ('journal (dicts)', lambda: legacy_get_journal_entries(JOURNAL_ENTRIES), dump_dicts),
+        ('journal (models)', lambda: database.get_journal_entries(limit=JOURNAL_ENTRIES), dump_models),
+    ]
+    
+    print(f"{'case':<18} {'rows':>7} {'build ms':>9} {'held MB':>8} {'peak MB':>8} {'json ms':>8} {'total ms':>9}")
+    for name, fn, serialize in cases:
+        rows, elapsed, held, peak, serialize_time = measure(fn, serialize)
+        print(f'{name:<18} {rows:>7} {elapsed * 1000:>9.1f} {held / 1e6:>8.1f} '
+              f'{peak / 1e6:>8.1f} {serialize_time * 1000:>8.1f} {(elapsed + serialize_time) * 1000:>9.1f}')
+
+if __name__ == '__main__':
+    main()
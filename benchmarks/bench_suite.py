@@ -0,0 +1,144 @@
+"""Time the database.py hot paths behind /, /journal and /resumes.
+
+For each scale, generates a seeded database (generate_data.py) in a
+throwaway directory and times every benchmark, reporting the best and
+median of --repeat runs. Results can be saved as JSON and compared with a
+previous run, e.g. across commits:
+
+    python benchmarks/bench_suite.py --scale 1 100 --output before.json
+    git checkout my-branch
+    python benchmarks/bench_suite.py --scale 1 100 --output after.json --compare before.json
+
+Scale 10000 (50k jobs, 3M journal entries) takes several minutes to generate.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import generate_data
+
+# Ratio of median times above which --compare flags a regression
+REGRESSION_THRESHOLD = 1.2
+
+def benchmarks(counts):
+    """(name, callable) pairs; arguments are picked from the generated data"""
+    middle_app = counts['applications'] // 2 or 1
+    last = generate_data.LAST_DATE
+    month_start = last.replace(day=1).isoformat()
+    year_start = last.replace(year=last.year - 1).isoformat()
+    return [
+        # /
+        ('get_all_jobs', database.get_all_jobs),
+        ('get_ai_ordered_jobs', lambda: database.get_ai_ordered_jobs('openai')),
+        # /resumes
+        ('get_application_summaries', lambda: database.get_application_summaries(limit=50)),
+        ('get_application_status_counts', database.get_application_status_counts),
+        ('get_application', lambda: database.get_application(middle_app)),
+        ('get_jobs_for_application', lambda: database.get_jobs_for_application(middle_app)),
+        # /journal
+        ('get_journal_entries', lambda: database.get_journal_entries(limit=50)),
+        ('get_journal_entries_for_job', lambda: database.get_journal_entries(job_id=1, limit=50)),
+        ('get_journal_stats', database.get_journal_stats),
+        ('get_entries_by_date_range', lambda: database.get_entries_by_date_range(month_start, last.isoformat())),
+        ('get_journal_heatmap', lambda: database.get_journal_heatmap(year_start, last.isoformat())),
+        ('get_all_tags', database.get_all_tags),
+    ]
+
+def run_benchmark(fn, repeat):
+    fn()  # warm the page cache and statement cache
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    rows = len(result) if hasattr(result, '__len__') else None
+    return {
+        'best_ms': round(min(times) * 1000, 3),
+        'median_ms': round(statistics.median(times) * 1000, 3),
+        'rows': rows,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline):
+    print(f"\n{'scale':>6} {'benchmark':<32} {'before ms':>10} {'after ms':>10} {'ratio':>7}")
+    for scale, benches in results['scales'].items():
+        for name, result in benches['benchmarks'].items():
+            before = baseline['scales'].get(scale, {}).get('benchmarks', {}).get(name)
+            if not before:
+                continue
+            ratio = result['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+            flag = '  REGRESSION' if ratio > REGRESSION_THRESHOLD else ''
+            print(f"{scale:>6} {name:<32} {before['median_ms']:>10.2f} {result['median_ms']:>10.2f} "
+                  f'{ratio:>6.2f}x{flag}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 100])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--only', nargs='+', help='run only these benchmarks')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--compare', help='baseline results JSON to compare against')
+    args = parser.parse_args()
+
+    results = {
+        'commit': git_commit(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'scales': {},
+    }
+
+    # Resolve paths before moving into the scratch directory
+    output_path = args.output and os.path.abspath(args.output)
+    compare_path = args.compare and os.path.abspath(args.compare)
+    workdir = tempfile.mkdtemp()
+    os.chdir(workdir)
+    for scale in args.scale:
+        db_path = os.path.join(workdir, f'bench_{scale}.db')
+        start = time.perf_counter()
+        counts = generate_data.generate(scale, args.seed, db_path)
+        print(f'scale {scale}: generated in {time.perf_counter() - start:.1f}s '
+              f"({counts['jobs']} jobs, {counts['applications']} applications, "
+              f"{counts['journal_entries']} journal entries)")
+
+        scale_results = {}
+        for name, fn in benchmarks(counts):
+            if args.only and name not in args.only:
+                continue
+            scale_results[name] = run_benchmark(fn, args.repeat)
+            result = scale_results[name]
+            print(f"  {name:<32} best {result['best_ms']:>9.2f} ms  median {result['median_ms']:>9.2f} ms  "
+                  f"rows {result['rows']}")
+        results['scales'][str(scale)] = {'counts': counts, 'benchmarks': scale_results}
+
+    if args.output:
+        with open(output_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(compare_path) as f:
+            compare(results, json.load(f))
+
+if __name__ == '__main__':
+    main()
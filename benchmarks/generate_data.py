@@ -0,0 +1,168 @@
+"""Seeded synthetic data for benchmarks.
+
+Fills a database with jobs, bullets, AI orderings, applications (with their
+linked jobs and points) and journal entries with tags. Sizes are multiples
+of a small single-user baseline; the same seed and scale always produce the
+same rows.
+
+    python benchmarks/generate_data.py --scale 100 --db /tmp/bench.db
+
+scale 1 is about what one person enters by hand (5 jobs, 20 applications,
+300 journal entries); 100 and 10000 stress the queries well past that.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from models import format_dates
+
+# Rows per unit of scale
+JOBS = 5
+POINTS_PER_JOB = 8
+APPLICATIONS = 20
+JOBS_PER_APPLICATION = 3
+POINTS_PER_APPLICATION_JOB = 3
+JOURNAL_ENTRIES = 300
+TAGS = 12
+
+AI_MODELS = ('openai', 'deepseek')
+APPLICATION_STATUSES = ('applied', 'interviewing', 'rejected', 'accepted')
+CATEGORIES = ('task', 'accomplishment', 'meeting', 'learning', 'other')
+MOODS = ('great', 'good', 'neutral', 'challenging', 'difficult')
+
+# Journal entries and applications end here (not today) so runs are comparable
+LAST_DATE = date(2025, 12, 31)
+JOURNAL_DAYS = 730
+
+VERBS = ('Reduced', 'Improved', 'Designed', 'Migrated', 'Automated', 'Led', 'Shipped', 'Rewrote')
+SUBJECTS = ('checkout latency', 'the billing pipeline', 'search relevance', 'onboarding flow',
+            'CI build times', 'the reporting service', 'on-call load', 'cache hit rate')
+
+def _bullet(rng):
+    return (f'{rng.choice(VERBS)} {rng.choice(SUBJECTS)} by {rng.randint(5, 90)}% '
+            f'across {rng.randint(2, 40)} services using {rng.choice(SUBJECTS)}')
+
+def generate(scale=1, seed=0, db_path='resume.db'):
+    """Create db_path (if needed) and fill it; returns row counts per table"""
+    rng = random.Random(seed)
+    database.DB_PATH = db_path
+    database.init_db()
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    c = conn.cursor()
+    # Start from empty tables (init_db adds a sample job)
+    for table in ('journal_entry_tags', 'journal_tags', 'journal_entries', 'journal_daily_stats',
+                  'application_points', 'application_jobs', 'job_applications',
+                  'ai_point_orders', 'ai_job_orders', 'job_points', 'jobs'):
+        c.execute(f'DELETE FROM {table}')
+
+    job_count = JOBS * scale
+    jobs = []
+    for job_id in range(1, job_count + 1):
+        start_year = rng.randint(2005, 2023)
+        start_date = f'{start_year}-{rng.randint(1, 12):02d}'
+        current = rng.random() < 0.1
+        end_date = None if current else f'{min(start_year + rng.randint(1, 4), 2025)}-{rng.randint(1, 12):02d}'
+        jobs.append((job_id, f'Engineer {job_id}', f'Company {rng.randint(1, job_count)}',
+                     rng.choice(('Fargo, ND', 'Remote', 'Seattle, WA', 'Austin, TX')),
+                     start_date, end_date, current, job_id, format_dates(start_date, end_date, current)))
+    c.executemany('''
+        INSERT INTO jobs (id, title, company, location, start_date, end_date, current, display_order, display_dates)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', jobs)
+
+    points = [(job_id, _bullet(rng), n)
+              for job_id in range(1, job_count + 1) for n in range(1, POINTS_PER_JOB + 1)]
+    c.executemany('INSERT INTO job_points (job_id, point, order_num) VALUES (?, ?, ?)', points)
+    # Point ids are assigned sequentially from 1, POINTS_PER_JOB per job
+    job_point_ids = lambda job_id: range((job_id - 1) * POINTS_PER_JOB + 1, job_id * POINTS_PER_JOB + 1)
+
+    for model_type in AI_MODELS:
+        order = list(range(1, job_count + 1))
+        rng.shuffle(order)
+        c.executemany('INSERT INTO ai_job_orders (job_id, ai_display_order, model_type) VALUES (?, ?, ?)',
+                      [(job_id, n, model_type) for n, job_id in enumerate(order, 1)])
+        point_orders = []
+        for job_id in range(1, job_count + 1):
+            point_ids = list(job_point_ids(job_id))
+            rng.shuffle(point_ids)
+            point_orders.extend((job_id, point_id, n, round(rng.random(), 2), model_type)
+                                for n, point_id in enumerate(point_ids, 1))
+        c.executemany('''
+            INSERT INTO ai_point_orders (job_id, point_id, ai_order_num, relevance_score, model_type)
+            VALUES (?, ?, ?, ?, ?)
+        ''', point_orders)
+
+    application_count = APPLICATIONS * scale
+    applications, application_jobs, application_points = [], [], []
+    for app_id in range(1, application_count + 1):
+        applied_on = LAST_DATE - timedelta(days=rng.randrange(JOURNAL_DAYS))
+        applications.append((app_id, f'Company {rng.randint(1, application_count)}', f'Role {app_id}',
+                             applied_on.isoformat(), rng.choice(APPLICATION_STATUSES),
+                             'Looking for an engineer to own reliability. ' * 10, rng.choice(AI_MODELS)))
+        for n, job_id in enumerate(rng.sample(range(1, job_count + 1), min(JOBS_PER_APPLICATION, job_count)), 1):
+            application_jobs.append((app_id, job_id, n))
+            for m, point_id in enumerate(rng.sample(job_point_ids(job_id), POINTS_PER_APPLICATION_JOB), 1):
+                application_points.append((app_id, point_id, m))
+    c.executemany('''
+        INSERT INTO job_applications (id, company, title, application_date, status, job_description, model_type)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', applications)
+    c.executemany('INSERT INTO application_jobs (application_id, job_id, display_order) VALUES (?, ?, ?)',
+                  application_jobs)
+    c.executemany('INSERT INTO application_points (application_id, point_id, display_order) VALUES (?, ?, ?)',
+                  application_points)
+
+    tag_count = max(TAGS, int(TAGS * scale ** 0.5))
+    c.executemany('INSERT INTO journal_tags (id, name) VALUES (?, ?)',
+                  [(tag_id, f'tag-{tag_id}') for tag_id in range(1, tag_count + 1)])
+
+    entry_count = JOURNAL_ENTRIES * scale
+    entries, entry_tags = [], []
+    for entry_id in range(1, entry_count + 1):
+        entry_date = LAST_DATE - timedelta(days=rng.randrange(JOURNAL_DAYS))
+        entries.append((entry_id, rng.randint(1, job_count), entry_date.isoformat(), f'Entry {entry_id}',
+                        f'{_bullet(rng)}. Paired with the team on follow-ups.', rng.choice((None, 2, 4, 7.5, 8)),
+                        rng.choice(CATEGORIES), rng.choice(MOODS), rng.random() < 0.1))
+        for tag_id in rng.sample(range(1, tag_count + 1), rng.randint(0, 3)):
+            entry_tags.append((entry_id, tag_id))
+    c.executemany('''
+        INSERT INTO journal_entries (id, job_id, entry_date, title, content, hours_worked, category, mood, is_highlight)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', entries)
+    c.executemany('INSERT INTO journal_entry_tags (entry_id, tag_id) VALUES (?, ?)', entry_tags)
+
+    conn.commit()
+    conn.close()
+    database.invalidate_tag_cache()
+
+    return {
+        'jobs': job_count,
+        'job_points': len(points),
+        'applications': application_count,
+        'application_points': len(application_points),
+        'journal_entries': entry_count,
+        'journal_tags': tag_count,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--db', default='resume.db')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate(args.scale, args.seed, args.db)
+    print(f'{args.db}: ' + ', '.join(f'{count} {table}' for table, count in counts.items()) +
+          f' in {time.perf_counter() - start:.1f}s')
+
+if __name__ == '__main__':
+    main()
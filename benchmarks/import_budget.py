@@ -0,0 +1,76 @@
+"""Break down app startup with python -X importtime and enforce a budget.
+
+Imports the app module (or --module) in a fresh interpreter, prints the
+slowest direct imports by cumulative import time, and exits non-zero if the
+total is over budget or a module that should only load on first use (the
+openai SDK and its dependency tree, config) was imported.
+Run by tests/test_import_budget.py, and suitable for CI:
+
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --budget-ms 250 --module highlight_miner
+
+Timings are the best of several runs to smooth out disk cache noise.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous enough for Flask itself (~150 ms on a laptop); the openai SDK
+# alone adds ~800 ms
+DEFAULT_BUDGET_MS = 400
+
+# Heavy or secret-bearing modules that must not load at startup
+LAZY_MODULES = ('openai', 'pydantic', 'httpx', 'config')
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+def import_profile(module):
+    """Return [(cumulative us, depth, module name)] for one fresh import"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append((int(match.group(2)), len(match.group(3)) // 2, match.group(4)))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    profiles = [import_profile(args.module) for _ in range(args.runs)]
+    profile = min(profiles, key=lambda rows: rows[-1][0])
+    total_ms = profile[-1][0] / 1000
+
+    # Depth 0/1 entries are imports made directly by the module (or by site)
+    direct = sorted((row for row in profile if row[1] <= 1), reverse=True)
+    print(f'import {args.module}: {total_ms:.1f} ms (best of {args.runs}, budget {args.budget_ms:g} ms)')
+    for cumulative, depth, name in direct[:args.top]:
+        print(f'  {cumulative / 1000:>8.1f} ms  {"  " * depth}{name}')
+
+    loaded = {name.split('.')[0] for _, _, name in profile}
+    eager = [name for name in LAZY_MODULES if name in loaded]
+
+    failed = False
+    if eager:
+        print(f'FAIL: imported at startup, should load on first use: {", ".join(eager)}')
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f'FAIL: {total_ms:.1f} ms is over the {args.budget_ms:g} ms budget')
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,554 @@
+"""End-to-end HTTP load test reporting throughput and p50/p95/p99 per route.
+
+Seeds a database with generate_data.py, starts a local stub AI server
+(stub_ai_server.py) and a stub pdflatex, runs the app under gunicorn
+pointed at both, then drives a weighted mix covering every route in app.py
+from concurrent keep-alive clients.
+
+    python benchmarks/load_test.py --duration 30 --clients 16 --output run.json
+    python benchmarks/load_test.py --baseline run.json           # flag regressions
+    python benchmarks/load_test.py --weight optimize_resume=20 --weight index=0
+    python benchmarks/load_test.py --real-tex --ai-latency-ms 1500
+    python benchmarks/load_test.py --url http://127.0.0.1:5000     # existing server
+
+Both AI models are pointed at the stub through OPENAI_BASE_URL and
+DEEPSEEK_BASE_URL. Delete routes only touch rows the run itself created.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generate_data
+import stub_ai_server
+
+# A p95 or throughput this much worse than the baseline is a regression
+P95_REGRESSION = 1.25
+THROUGHPUT_REGRESSION = 0.8
+
+# Routes with fewer samples than this are not compared against the baseline
+MIN_SAMPLES = 20
+
+STUB_PDFLATEX = '''#!/bin/sh
+# Stand-in for pdflatex: pdflatex -output-directory DIR FILE.tex
+dir=$2; tex=$3; name=$(basename "$tex" .tex)
+{ echo "%PDF-1.4"; cat "$tex"; echo "%%EOF"; } > "$dir/$name.pdf"
+'''
+
+# Dummy keys, and no client-side rate limits: the stub has none
+STUB_CONFIG = ('OPENAI_API_KEY = "load-test"\nDEEPSEEK_API_KEY = "load-test"\n'
+               'OPENAI_REQUESTS_PER_MINUTE = 0\nOPENAI_TOKENS_PER_MINUTE = 0\n')
+
+# ============================================
+# Shared state between clients
+# ============================================
+
+class Pools:
+    """Ids created during the run, so follow-up routes have something to act on"""
+
+    def __init__(self, counts):
+        self.counts = counts
+        self._lock = threading.Lock()
+        self._ids = defaultdict(list)
+
+    def add(self, kind, value):
+        with self._lock:
+            self._ids[kind].append(value)
+
+    def pick(self, kind, rng):
+        with self._lock:
+            values = self._ids[kind]
+            return rng.choice(values) if values else None
+
+    def take(self, kind):
+        with self._lock:
+            values = self._ids[kind]
+            return values.pop() if values else None
+
+# ============================================
+# Route mix
+# ============================================
+# Each builder returns (method, path, body, content_type, on_response) or None
+# when there is nothing to act on yet (another route is chosen instead).
+
+LAST_DATE = generate_data.LAST_DATE.isoformat()
+
+def _form(data):
+    return urlencode(data, doseq=True), 'application/x-www-form-urlencoded'
+
+def _json(data):
+    return json.dumps(data), 'application/json'
+
+def _multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/pdf\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+def _job(ctx):
+    return ctx.rng.randint(1, ctx.pools.counts['jobs'])
+
+def _application(ctx):
+    return ctx.rng.randint(1, ctx.pools.counts['applications'])
+
+def _remember(kind, key):
+    def on_response(ctx, data):
+        if isinstance(data, dict) and data.get(key) is not None:
+            ctx.pools.add(kind, data[key])
+    return on_response
+
+def _get(path):
+    return lambda ctx: ('GET', path, None, None, None)
+
+def add_job(ctx):
+    body, content_type = _form({'title': 'Load Test Engineer', 'company': 'Load Co', 'location': 'Remote',
+                                'start_date': '2020-01', 'current': 'on',
+                                'points[]': ['Kept the lights on', 'Wrote the load test']})
+    return 'POST', '/add-job', body, content_type, None
+
+def add_point(ctx):
+    body, content_type = _form({'point': f'Added bullet {ctx.rng.randint(1, 10**6)}'})
+    return 'POST', f'/add-point/{_job(ctx)}', body, content_type, None
+
+def delete_point(ctx):
+    # Generated points are numbered per job; only remove ones from jobs the run disposes of
+    job_id = ctx.pools.take('disposable_job')
+    if job_id is None:
+        return None
+    ctx.pools.add('deleted_job', job_id)
+    return 'POST', f'/delete-point/{(job_id - 1) * generate_data.POINTS_PER_JOB + 1}', '', None, None
+
+def delete_job(ctx):
+    job_id = ctx.pools.take('deleted_job')
+    if job_id is None:
+        return None
+    return 'POST', f'/delete-job/{job_id}', '', None, None
+
+def update_order(ctx):
+    job_ids = list(range(1, ctx.pools.counts['jobs'] + 1))
+    ctx.rng.shuffle(job_ids)
+    body, content_type = _json({'jobs': [{'id': job_id, 'order': n} for n, job_id in enumerate(job_ids, 1)]})
+    return 'POST', '/update-order', body, content_type, None
+
+def update_point_order(ctx):
+    job_id = _job(ctx)
+    first = (job_id - 1) * generate_data.POINTS_PER_JOB + 1
+    point_ids = list(range(first, first + generate_data.POINTS_PER_JOB))
+    ctx.rng.shuffle(point_ids)
+    body, content_type = _json({'points': [{'id': point_id, 'order': n} for n, point_id in enumerate(point_ids, 1)]})
+    return 'POST', f'/update-point-order/{job_id}', body, content_type, None
+
+def optimize_resume(ctx):
+    body, content_type = _json({'model_type': ctx.rng.choice(('openai', 'deepseek')), 'job_description': 'Reliability engineer',
+                                'story': 'Scaling systems'})
+    return 'POST', '/optimize-resume', body, content_type, _remember('task', 'task_id')
+
+def queue_generate_pdf(ctx):
+    body, content_type = _json({'mode': ctx.rng.choice(('handcrafted', 'ai'))})
+    return 'POST', '/generate-pdf', body, content_type, _remember('pdf_task', 'task_id')
+
+def task_status(ctx):
+    task_id = ctx.pools.pick('task', ctx.rng) or ctx.pools.pick('pdf_task', ctx.rng)
+    return task_id and ('GET', f'/tasks/{task_id}', None, None, None)
+
+def task_pdf(ctx):
+    task_id = ctx.pools.pick('pdf_task', ctx.rng)
+    return task_id and ('GET', f'/tasks/{task_id}/pdf', None, None, None)
+
+def cancel_task(ctx):
+    task_id = ctx.pools.take('task')
+    return task_id and ('POST', f'/tasks/{task_id}/cancel', '', None, None)
+
+def create_application(ctx):
+    job_ids = ctx.rng.sample(range(1, ctx.pools.counts['jobs'] + 1), min(4, ctx.pools.counts['jobs']))
+    points = {}
+    for job_id in job_ids:
+        first = (job_id - 1) * generate_data.POINTS_PER_JOB + 1
+        for n, point_id in enumerate(range(first, first + 3), 1):
+            points[str(point_id)] = n
+    body, content_type = _multipart(
+        {'company': 'Load Co', 'title': 'Engineer', 'application_date': LAST_DATE,
+         'job_description': 'Reliability engineer', 'job_ids': ','.join(map(str, job_ids)),
+         'point_selections': json.dumps(points)},
+        {'resume': ('resume.pdf', b'%PDF-1.4\n' + os.urandom(2048) + b'\n%%EOF\n')})
+
+    def on_response(ctx, data):
+        # Half are kept for the read routes, half are left for delete_application
+        if isinstance(data, dict) and data.get('id'):
+            ctx.pools.add(ctx.rng.choice(('application', 'disposable_application')), data['id'])
+    return 'POST', '/create-application', body, content_type, on_response
+
+def view_application(ctx):
+    app_id = ctx.pools.pick('application', ctx.rng) or _application(ctx)
+    return 'GET', f'/application/{app_id}', None, None, _remember('snapshot', 'snapshot_hash')
+
+def resume_snapshot(ctx):
+    content_hash = ctx.pools.pick('snapshot', ctx.rng)
+    return content_hash and ('GET', f'/resume-snapshot/{content_hash}.pdf', None, None, None)
+
+def generate_application_resume(ctx):
+    app_id = ctx.pools.pick('application', ctx.rng)
+    return app_id and ('GET', f'/generate-application-resume/{app_id}', None, None, None)
+
+def download_application_resume(ctx):
+    app_id = ctx.pools.pick('application', ctx.rng)
+    return app_id and ('GET', f'/download-application-resume/{app_id}', None, None, None)
+
+def update_status(ctx):
+    body, content_type = _json({'status': ctx.rng.choice(('applied', 'interviewing', 'rejected', 'accepted'))})
+    return 'POST', f'/update-status/{_application(ctx)}', body, content_type, None
+
+def delete_application(ctx):
+    app_id = ctx.pools.take('disposable_application')
+    return app_id and ('POST', f'/delete-application/{app_id}', '', None, None)
+
+def save_settings(ctx):
+    body, content_type = _form({'full_name': 'Load Tester', 'email': 'load@example.com',
+                                'jobs_on_resume': 4, 'points_per_job': 3})
+    return 'POST', '/settings/save', body, content_type, None
+
+def create_entry(ctx):
+    body, content_type = _form({'job_id': _job(ctx), 'entry_date': LAST_DATE, 'title': 'Load test',
+                                'content': 'Ran the load test and fixed the slowest route.',
+                                'hours_worked': 2, 'category': 'accomplishment', 'tags': 'perf, load',
+                                'is_highlight': ctx.rng.choice(('true', 'false'))})
+    return 'POST', '/journal/entry', body, content_type, _remember('entry', 'id')
+
+def get_entry(ctx):
+    entry_id = ctx.pools.pick('entry', ctx.rng) or ctx.rng.randint(1, ctx.pools.counts['journal_entries'])
+    return 'GET', f'/journal/entry/{entry_id}', None, None, None
+
+def update_entry(ctx):
+    entry_id = ctx.pools.pick('entry', ctx.rng)
+    if entry_id is None:
+        return None
+    body, content_type = _json({'content': f'Updated at {time.time():.0f}', 'tags': 'perf'})
+    return 'PUT', f'/journal/entry/{entry_id}', body, content_type, None
+
+def delete_entry(ctx):
+    entry_id = ctx.pools.take('entry')
+    return entry_id and ('DELETE', f'/journal/entry/{entry_id}', None, None, None)
+
+def journal_calendar(ctx):
+    return 'GET', '/journal/calendar?start_date=2025-12-01&end_date=2026-01-01', None, None, None
+
+def journal_heatmap(ctx):
+    return 'GET', f'/journal/heatmap?start_date=2025-01-01&end_date={LAST_DATE}', None, None, None
+
+def mine_highlights(ctx):
+    body, content_type = _json({'model_type': ctx.rng.choice(('local', 'openai', 'deepseek'))})
+    return 'POST', '/journal/mine-highlights', body, content_type, None
+
+def point_candidates(ctx):
+    def on_response(ctx, data):
+        for candidate in (data if isinstance(data, list) else [])[:5]:
+            ctx.pools.add('candidate', candidate['id'])
+    return 'GET', '/point-candidates', None, None, on_response
+
+def accept_candidate(ctx):
+    candidate_id = ctx.pools.take('candidate')
+    return candidate_id and ('POST', f'/point-candidates/{candidate_id}/accept', '', None, None)
+
+def dismiss_candidate(ctx):
+    candidate_id = ctx.pools.take('candidate')
+    return candidate_id and ('POST', f'/point-candidates/{candidate_id}/dismiss', '', None, None)
+
+# name -> (default weight, builder, statuses that count as success besides 2xx/3xx)
+ROUTES = {
+    'index': (20, _get('/'), ()),
+    'resume_view_handcrafted': (10, _get('/get-resume-view?mode=handcrafted'), ()),
+    'resume_view_ai': (5, _get('/get-resume-view?mode=ai&model_type=openai'), ()),
+    'api_jobs': (10, _get('/api/jobs'), ()),
+    'add_job': (1, add_job, ()),
+    'add_point': (2, add_point, ()),
+    'delete_point': (1, delete_point, ()),
+    'delete_job': (1, delete_job, ()),
+    'update_order': (1, update_order, ()),
+    'update_point_order': (2, update_point_order, ()),
+    'download_resume': (2, _get('/download-resume'), ()),
+    'generate_pdf': (2, _get('/generate-pdf?mode=ai&model_type=openai'), ()),
+    'queue_generate_pdf': (1, queue_generate_pdf, ()),
+    'test_ai': (1, lambda ctx: ('GET', f"/test-ai/{ctx.rng.choice(('openai', 'deepseek'))}", None, None, None), ()),
+    'optimize_resume': (1, optimize_resume, ()),
+    'task_status': (4, task_status, ()),
+    'task_pdf': (1, task_pdf, (409,)),
+    'cancel_task': (1, cancel_task, ()),
+    'resumes': (10, _get('/resumes'), ()),
+    'resumes_filtered': (3, _get('/resumes?status=interviewing&page=2'), ()),
+    'api_applications': (5, _get('/api/applications?page=1'), ()),
+    'view_application': (5, view_application, ()),
+    'update_status': (2, update_status, ()),
+    'create_application': (1, create_application, ()),
+    'generate_application_resume': (2, generate_application_resume, ()),
+    'resume_snapshot': (2, resume_snapshot, ()),
+    'download_application_resume': (1, download_application_resume, ()),
+    'delete_application': (1, delete_application, ()),
+    'settings': (2, _get('/settings'), ()),
+    'save_settings': (1, save_settings, ()),
+    'journal': (15, _get('/journal'), ()),
+    'journal_for_job': (3, lambda ctx: ('GET', f'/journal?job_id={_job(ctx)}', None, None, None), ()),
+    'create_entry': (4, create_entry, ()),
+    'get_entry': (4, get_entry, (404,)),
+    'update_entry': (2, update_entry, ()),
+    'delete_entry': (1, delete_entry, ()),
+    'journal_entries': (5, _get('/journal/entries?limit=50'), ()),
+    'journal_stats': (3, _get('/journal/stats'), ()),
+    'journal_calendar': (3, journal_calendar, ()),
+    'journal_heatmap': (2, journal_heatmap, ()),
+    'mine_highlights': (1, mine_highlights, ()),
+    'point_candidates': (2, point_candidates, ()),
+    'accept_candidate': (1, accept_candidate, (404,)),
+    'dismiss_candidate': (1, dismiss_candidate, ()),
+    'healthz': (1, _get('/healthz'), ()),
+    'readyz': (1, _get('/readyz'), ()),
+    'metrics': (1, _get('/metrics'), ()),
+}
+
+# ============================================
+# Clients
+# ============================================
+
+class Client:
+    def __init__(self, host, port, pools, weights, seed, stop_at, samples):
+        self.host, self.port = host, port
+        self.pools = pools
+        self.rng = random.Random(seed)
+        self.names = [name for name, weight in weights.items() if weight > 0]
+        self.weights = [weights[name] for name in self.names]
+        self.stop_at = stop_at
+        self.samples = samples
+        self.conn = http.client.HTTPConnection(host, port, timeout=120)
+
+    def run(self):
+        while time.perf_counter() < self.stop_at:
+            name = self.rng.choices(self.names, self.weights)[0]
+            request = ROUTES[name][1](self)
+            if request:
+                self.send(name, *request)
+        self.conn.close()
+
+    def send(self, name, method, path, body, content_type, on_response):
+        headers = {'Content-Type': content_type} if content_type else {}
+        if isinstance(body, str):
+            body = body.encode()
+        start = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=120)
+            status, data = None, b''
+        self.samples.append((name, time.perf_counter() - start, status))
+
+        if on_response and status in (200, 202) and data[:1] in (b'{', b'['):
+            on_response(self, json.loads(data))
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def summarize(samples, duration):
+    by_route = defaultdict(list)
+    errors = defaultdict(int)
+    for name, seconds, status in samples:
+        by_route[name].append(seconds)
+        ok_statuses = ROUTES[name][2]
+        if status is None or (status >= 400 and status not in ok_statuses):
+            errors[name] += 1
+
+    def stats(latencies, error_count):
+        latencies = sorted(latencies)
+        return {
+            'count': len(latencies),
+            'errors': error_count,
+            'rps': round(len(latencies) / duration, 2),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        }
+
+    routes = {name: stats(latencies, errors[name]) for name, latencies in sorted(by_route.items())}
+    total = stats([seconds for _, seconds, _ in samples], sum(errors.values())) if samples else {}
+    return routes, total
+
+def print_table(routes, total):
+    print(f"{'route':<30} {'count':>6} {'err':>4} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, result in [*routes.items(), ('TOTAL', total)]:
+        print(f"{name:<30} {result['count']:>6} {result['errors']:>4} {result['rps']:>7.1f} "
+              f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+
+def compare(routes, baseline):
+    """Print routes whose p95 or throughput regressed; returns the count"""
+    regressions = 0
+    for name, result in routes.items():
+        before = baseline['routes'].get(name)
+        if not before or min(result['count'], before['count']) < MIN_SAMPLES:
+            continue
+        p95_ratio = result['p95_ms'] / before['p95_ms'] if before['p95_ms'] else 1
+        rps_ratio = result['rps'] / before['rps'] if before['rps'] else 1
+        if p95_ratio > P95_REGRESSION or rps_ratio < THROUGHPUT_REGRESSION:
+            regressions += 1
+            print(f"REGRESSION {name}: p95 {before['p95_ms']:.1f} -> {result['p95_ms']:.1f} ms "
+                  f"({p95_ratio:.2f}x), {before['rps']:.1f} -> {result['rps']:.1f} req/s")
+    if not regressions:
+        print('No regressions against baseline')
+    return regressions
+
+# ============================================
+# Server under test
+# ============================================
+
+def start_server(workdir, port, args):
+    stub_dir = os.path.join(workdir, 'stubs')
+    os.makedirs(stub_dir)
+    # pdf_service loads the LaTeX template relative to the working directory
+    os.symlink(os.path.join(ROOT, 'templates'), os.path.join(workdir, 'templates'))
+    with open(os.path.join(stub_dir, 'config.py'), 'w') as f:
+        f.write(STUB_CONFIG)
+
+    env = dict(os.environ,
+               PYTHONPATH=os.pathsep.join(filter(None, [stub_dir, os.environ.get('PYTHONPATH')])),
+               OPENAI_BASE_URL=f'http://127.0.0.1:{args.ai_port}/v1',
+               DEEPSEEK_BASE_URL=f'http://127.0.0.1:{args.ai_port}/v1',
+               BIND=f'127.0.0.1:{port}', WEB_CONCURRENCY=str(args.workers),
+               WEB_THREADS=str(args.threads), ACCESS_LOG='')
+    if not args.real_tex:
+        pdflatex = os.path.join(stub_dir, 'pdflatex')
+        with open(pdflatex, 'w') as f:
+            f.write(STUB_PDFLATEX)
+        os.chmod(pdflatex, os.stat(pdflatex).st_mode | stat.S_IEXEC)
+        env['PDFLATEX_PATH'] = pdflatex
+
+    # gunicorn's --pythonpath would put the repo (and a real config.py) ahead of the stubs
+    env['PYTHONPATH'] += os.pathsep + ROOT
+    server = subprocess.Popen([
+        sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+        '--chdir', workdir, '--log-level', 'warning', 'wsgi:app'
+    ], env=env, stdout=subprocess.DEVNULL)
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/readyz')
+            if conn.getresponse().status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError('server did not become ready')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='test an already running server instead of starting one')
+    parser.add_argument('--scale', type=int, default=1, help='generate_data scale')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8780)
+    parser.add_argument('--ai-port', type=int, default=8781)
+    parser.add_argument('--ai-latency-ms', type=float, default=300)
+    parser.add_argument('--ai-error-rate', type=float, default=0, help='share of stub AI responses that fail')
+    parser.add_argument('--ai-replay', help='recorded completions for the stub AI server to replay')
+    parser.add_argument('--real-tex', action='store_true', help='use PDFLATEX_PATH instead of a stub')
+    parser.add_argument('--weight', action='append', default=[], metavar='ROUTE=WEIGHT',
+                        help='override a route weight (0 disables it)')
+    parser.add_argument('--only', nargs='+', help='run only these routes')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', help='results JSON to compare against; exits 1 on regressions')
+    args = parser.parse_args()
+
+    weights = {name: weight for name, (weight, _, _) in ROUTES.items()}
+    for override in args.weight:
+        name, _, weight = override.partition('=')
+        if name not in ROUTES:
+            parser.error(f'unknown route {name}; choose from {", ".join(ROUTES)}')
+        weights[name] = float(weight)
+    if args.only:
+        weights = {name: weight if name in args.only else 0 for name, weight in weights.items()}
+
+    output_path = args.output and os.path.abspath(args.output)
+    baseline_path = args.baseline and os.path.abspath(args.baseline)
+
+    server = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+        # Without a generated database, assume the scale-1 layout exists
+        counts = {'jobs': generate_data.JOBS * args.scale, 'applications': generate_data.APPLICATIONS * args.scale,
+                  'journal_entries': generate_data.JOURNAL_ENTRIES * args.scale}
+    else:
+        workdir = tempfile.mkdtemp()
+        counts = generate_data.generate(args.scale, args.seed, os.path.join(workdir, 'resume.db'))
+        ai_server = stub_ai_server.start(args.ai_port, args.ai_latency_ms, error_rate=args.ai_error_rate,
+                                         replay=args.ai_replay and os.path.abspath(args.ai_replay))
+        server = start_server(workdir, args.port, args)
+        host, port = '127.0.0.1', args.port
+
+    pools = Pools(counts)
+    # Jobs the run is allowed to delete (the last tenth of the generated ones)
+    for job_id in range(counts['jobs'] - max(1, counts['jobs'] // 10) + 1, counts['jobs'] + 1):
+        pools.add('disposable_job', job_id)
+
+    samples = []
+    stop_at = time.perf_counter() + args.duration
+    clients = [Client(host, port, pools, weights, args.seed + n, stop_at, samples) for n in range(args.clients)]
+    threads = [threading.Thread(target=client.run) for client in clients]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if server:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+            ai_server.shutdown()
+
+    routes, total = summarize(samples, args.duration)
+    print(f'{args.clients} clients for {args.duration:g}s, scale {args.scale}, '
+          f'{args.workers} workers x {args.threads} threads')
+    print_table(routes, total)
+
+    results = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'routes': routes,
+        'total': total,
+    }
+    if output_path:
+        with open(output_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            if compare(routes, json.load(f)):
+                sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Show how throughput scales with gunicorn worker processes.
+
+Seeds a throwaway database with 200 jobs x 10 bullets, then for each worker
+count starts gunicorn (gunicorn.conf.py, wsgi:app) against it, waits for
+/readyz and drives it with concurrent keep-alive clients.
+
+    python benchmarks/load_test_workers.py
+    python benchmarks/load_test_workers.py --workers 1 2 4 8 --path /api/jobs --clients 32
+
+Scaling flattens out at the number of CPU cores on the machine.
+"""
+import argparse
+import http.client
+import os
+import signal
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PORT = 8765
+JOBS = 200
+POINTS_PER_JOB = 10
+
+def prepare_workdir():
+    workdir = tempfile.mkdtemp()
+    os.chdir(workdir)
+    import database
+    database.init_db()
+    conn = sqlite3.connect('resume.db')
+    conn.executemany('''
+        INSERT INTO jobs (id, title, company, location, start_date, end_date, current, display_order, display_dates)
+        VALUES (?, ?, ?, ?, '2019-03', '2021-11', 0, ?, 'Mar 2019 – Nov 2021')
+    ''', [(i, f'Engineer {i}', f'Company {i}', 'Fargo, ND', i) for i in range(2, JOBS + 2)])
+    conn.executemany('INSERT INTO job_points (job_id, point, order_num) VALUES (?, ?, ?)',
+                     [(job_id, f'Cut p95 latency of service {job_id} by {n}0% with request coalescing', n)
+                      for job_id in range(2, JOBS + 2) for n in range(POINTS_PER_JOB)])
+    conn.commit()
+    conn.close()
+    return workdir
+
+def wait_ready(timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=1)
+            conn.request('GET', '/readyz')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('server did not become ready')
+
+def client(path, stop_at, latencies, errors):
+    conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=30)
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+def run(workers, threads, path, clients, duration):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), WEB_THREADS=str(threads),
+               BIND=f'127.0.0.1:{PORT}', ACCESS_LOG='', TASK_WORKERS='0')
+    server = subprocess.Popen([
+        sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+        '--pythonpath', ROOT, '--chdir', os.getcwd(), '--log-level', 'warning', 'wsgi:app'
+    ], env=env, stdout=subprocess.DEVNULL)
+    try:
+        wait_ready()
+        latencies, errors = [], []
+        stop_at = time.perf_counter() + duration
+        pool = [threading.Thread(target=client, args=(path, stop_at, latencies, errors))
+                for _ in range(clients)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000 if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+    return len(latencies) / duration, p50, p99, len(errors)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--path', default='/api/jobs')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+
+    prepare_workdir()
+    print(f'GET {args.path}, {args.clients} clients, {args.duration:g}s per run, '
+          f'{args.threads} threads/worker, {os.cpu_count()} CPUs')
+    print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers in args.workers:
+        rps, p50, p99, errors = run(workers, args.threads, args.path, args.clients, args.duration)
+        print(f'{workers:>7} {rps:>9.1f} {p50:>8.1f} {p99:>8.1f} {errors:>7}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,332 @@
+"""Local stand-in for the OpenAI-compatible chat completions API.
+
+Answers POST /v1/chat/completions (and /chat/completions) after a
+configurable delay. Requests seen in a --replay file get their recorded
+completion back; anything else gets a synthesized one AIService can parse:
+resume optimization requests get a valid job/point ordering built from the
+jobs in the prompt, highlight summaries get one bullet per entry, anything
+else a short reply. "stream": true requests are answered as server-sent
+event chunks, and --error-rate fails a share of requests like a loaded API.
+--ms-per-token adds generation time per completion token, so shorter
+replies come back sooner the way they do from a real model, and
+--slow-rate/--slow-ms add a long tail.
+--malformed-rate garbles a share of JSON replies the way models do (prose
+and code fences, // comments, trailing commas, cut off at max_tokens);
+requests in JSON mode (response_format) only ever get cut off.
+
+    python benchmarks/stub_ai_server.py --port 8901 --latency-ms 800 --jitter-ms 400
+    OPENAI_BASE_URL=http://127.0.0.1:8901/v1 DEEPSEEK_BASE_URL=http://127.0.0.1:8901/v1 python app.py
+
+Record real completions once, then replay them offline (keyed on model and
+messages, so use the same seeded data both times):
+
+    python benchmarks/stub_ai_server.py --upstream https://api.openai.com/v1 --record ai.jsonl
+    python benchmarks/stub_ai_server.py --replay ai.jsonl --strict
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def _literal_after(text, marker):
+    """Parse the Python literal AIService appends to its prompt after marker"""
+    start = text.find(marker)
+    if start == -1:
+        return None
+    try:
+        return ast.literal_eval(text[start + len(marker):].strip())
+    except (ValueError, SyntaxError):
+        return None
+
+def optimization_reply(jobs_data, rng):
+    jobs = jobs_data['jobs']
+    order = list(range(1, len(jobs) + 1))
+    rng.shuffle(order)
+    return json.dumps({
+        'job_order': {str(job['id']): n for job, n in zip(jobs, order)},
+        'point_orders': {
+            str(job['id']): {
+                str(point['id']): {'order': n, 'score': round(1 - n / (len(job['points']) + 1), 2)}
+                for n, point in enumerate(job['points'], 1)
+            } for job in jobs
+        }
+    })
+
+def highlight_reply(entries):
+    return json.dumps([
+        {'text': f"Delivered {entry['title'] or 'project work'} ahead of schedule", 'entry_ids': [entry['id']]}
+        for entry in entries
+    ])
+
+def reply_for(messages, rng):
+    prompt = messages[-1]['content'] if messages else ''
+    jobs_data = _literal_after(prompt, 'return in the specified JSON format:')
+    if isinstance(jobs_data, dict) and 'jobs' in jobs_data:
+        return optimization_reply(jobs_data, rng)
+    entries = _literal_after(prompt, 'return them in the specified JSON format:')
+    if isinstance(entries, list):
+        return highlight_reply(entries)
+    return 'Connection OK'
+
+def mangle(content, rng, json_mode=False):
+    """A JSON reply damaged the way model output commonly is"""
+    if json_mode:
+        return content[:int(len(content) * rng.uniform(0.5, 0.95))]
+    damage = rng.choice(('fenced', 'comments', 'trailing_comma', 'truncated'))
+    if damage == 'fenced':
+        return f'Here is the optimized ordering:\n```json\n{content}\n```\nLet me know if you need changes.'
+    if damage == 'comments':
+        return content.replace(', ', ',  // next\n', 3)
+    if damage == 'trailing_comma':
+        return content[:-1] + ',' + content[-1]
+    return content[:int(len(content) * rng.uniform(0.5, 0.95))]
+
+def estimate_usage(messages, content):
+    # Roughly 4 characters per token
+    prompt_tokens = sum(len(m.get('content') or '') for m in messages) // 4
+    completion_tokens = len(content) // 4
+    return {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens}
+
+def completion(model, content, usage):
+    return {
+        'id': f'chatcmpl-stub-{time.time_ns()}',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': model,
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content},
+            'finish_reason': 'stop'
+        }],
+        'usage': usage
+    }
+
+def completion_chunk(model, delta, finish_reason=None):
+    return {
+        'id': f'chatcmpl-stub-{time.time_ns()}',
+        'object': 'chat.completion.chunk',
+        'created': int(time.time()),
+        'model': model,
+        'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+    }
+
+def request_key(model, messages):
+    """Identifies a request across runs: the model and the exact messages"""
+    payload = json.dumps({'model': model, 'messages': messages}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class Recordings:
+    """Completions keyed by request_key, stored one JSON object per line"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._replies = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._replies[record['key']] = record
+
+    def __len__(self):
+        return len(self._replies)
+
+    def get(self, key):
+        return self._replies.get(key)
+
+    def add(self, key, model, content, usage):
+        record = {'key': key, 'model': model, 'content': content, 'usage': usage}
+        with self._lock:
+            if key in self._replies:
+                return
+            self._replies[key] = record
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, Nagle's
+    # algorithm and delayed ACKs add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+    # Set per server by start()
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    error_statuses = (429, 500)
+    malformed_rate = 0.0
+    chunk_chars = 16
+    chunk_delay = 0.0
+    token_delay = 0.0
+    slow_rate = 0.0
+    slow_delay = 0.0
+    recordings = None
+    upstream = None
+    strict = False
+    rng = random.Random(0)
+
+    def do_POST(self):
+        if self.path.rstrip('/') not in ('/v1/chat/completions', '/chat/completions'):
+            self.send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+            return
+
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        model = request.get('model', 'stub')
+        messages = request.get('messages', [])
+        time.sleep(self.latency + self.rng.uniform(0, self.jitter)
+                   + (self.slow_delay if self.rng.random() < self.slow_rate else 0))
+
+        if self.rng.random() < self.error_rate:
+            status = self.rng.choice(self.error_statuses)
+            self.send_json(status, {'error': {'message': f'Injected {status}', 'type': 'stub_error'}})
+            return
+
+        key = request_key(model, messages)
+        recorded = self.recordings.get(key) if self.recordings is not None else None
+        if recorded:
+            content, usage = recorded['content'], recorded['usage']
+        elif self.upstream:
+            status, reply = self.forward(request)
+            if status != 200:
+                self.send_json(status, reply)
+                return
+            content, usage = reply['choices'][0]['message']['content'], reply.get('usage')
+            if self.recordings is not None:
+                self.recordings.add(key, model, content, usage)
+        elif self.strict:
+            self.send_json(404, {'error': {'message': f'No recording for request {key}',
+                                           'type': 'invalid_request_error'}})
+            return
+        else:
+            content = reply_for(messages, self.rng)
+            usage = estimate_usage(messages, content)
+
+        if content and content[0] in '{[' and self.rng.random() < self.malformed_rate:
+            json_mode = (request.get('response_format') or {}).get('type') == 'json_object'
+            content = mangle(content, self.rng, json_mode)
+
+        if self.token_delay:
+            time.sleep(self.token_delay * (usage or estimate_usage(messages, content))['completion_tokens'])
+
+        if request.get('stream'):
+            self.send_stream(model, content)
+        else:
+            self.send_json(200, completion(model, content, usage))
+
+    def forward(self, request):
+        """Send the request (unstreamed) to the upstream API; returns (status, body)"""
+        body = json.dumps(dict(request, stream=False)).encode()
+        upstream_request = urllib.request.Request(
+            self.upstream.rstrip('/') + '/chat/completions', data=body, method='POST',
+            headers={'Content-Type': 'application/json', 'Authorization': self.headers.get('Authorization', '')})
+        try:
+            with urllib.request.urlopen(upstream_request, timeout=600) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read() or b'{}')
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self, model, content):
+        # No Content-Length, so the client reads until the connection closes
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+
+        def event(data):
+            self.wfile.write(f'data: {data}\n\n'.encode())
+            self.wfile.flush()
+
+        event(json.dumps(completion_chunk(model, {'role': 'assistant', 'content': ''})))
+        for start in range(0, len(content), self.chunk_chars):
+            time.sleep(self.chunk_delay)
+            event(json.dumps(completion_chunk(model, {'content': content[start:start + self.chunk_chars]})))
+        event(json.dumps(completion_chunk(model, {}, 'stop')))
+        event('[DONE]')
+
+    def log_message(self, format, *args):
+        pass
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # Clients dropping keep-alive connections is expected
+
+def start(port=0, latency_ms=0, jitter_ms=0, error_rate=0.0, error_statuses=(429, 500), chunk_chars=16,
+          chunk_delay_ms=0, replay=None, record=None, upstream=None, strict=False, seed=0, malformed_rate=0.0,
+          ms_per_token=0, slow_rate=0.0, slow_ms=0):
+    """Serve on a background thread; returns the server (server.server_port)
+
+    replay and record are recordings files; recording needs an upstream API.
+    """
+    recordings = Recordings(record or replay) if (record or replay) else None
+    handler = type('ConfiguredStubHandler', (StubHandler,), {
+        'latency': latency_ms / 1000,
+        'jitter': jitter_ms / 1000,
+        'error_rate': error_rate,
+        'error_statuses': tuple(error_statuses),
+        'malformed_rate': malformed_rate,
+        'chunk_chars': chunk_chars,
+        'chunk_delay': chunk_delay_ms / 1000,
+        'token_delay': ms_per_token / 1000,
+        'slow_rate': slow_rate,
+        'slow_delay': slow_ms / 1000,
+        'recordings': recordings,
+        'upstream': upstream,
+        'strict': strict,
+        'rng': random.Random(seed),
+    })
+    server = StubServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8901)
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay before every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='extra random delay up to this much')
+    parser.add_argument('--slow-rate', type=float, default=0, help='share of requests delayed by --slow-ms')
+    parser.add_argument('--slow-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0, help='share of requests to fail (0-1)')
+    parser.add_argument('--error-status', type=int, nargs='+', default=[429, 500])
+    parser.add_argument('--malformed-rate', type=float, default=0, help='share of JSON replies to garble (0-1)')
+    parser.add_argument('--chunk-chars', type=int, default=16, help='characters per streamed chunk')
+    parser.add_argument('--chunk-delay-ms', type=float, default=0, help='delay between streamed chunks')
+    parser.add_argument('--ms-per-token', type=float, default=0, help='generation delay per completion token')
+    parser.add_argument('--replay', help='answer from these recorded completions')
+    parser.add_argument('--record', help='append completions fetched from --upstream here')
+    parser.add_argument('--upstream', help='real API base URL to forward unrecorded requests to')
+    parser.add_argument('--strict', action='store_true', help='404 unrecorded requests instead of synthesizing')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.record and not args.upstream:
+        parser.error('--record needs --upstream')
+
+    server = start(args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.error_status,
+                   args.chunk_chars, args.chunk_delay_ms, args.replay, args.record, args.upstream,
+                   args.strict, args.seed, args.malformed_rate, args.ms_per_token,
+                   args.slow_rate, args.slow_ms)
+    recordings = server.RequestHandlerClass.recordings
+    print(f'Stub AI server on http://127.0.0.1:{server.server_port}/v1'
+          + (f' ({len(recordings)} recorded completions)' if recordings is not None else ''))
+    threading.Event().wait()
+
+if __name__ == '__main__':
+    main()
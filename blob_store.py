@@ -0,0 +1,80 @@
+import hashlib
+import os
+import tempfile
+from database import (
+    register_resume_blob, delete_unreferenced_blobs, get_legacy_resume_paths,
+    replace_resume_path
+)
+
+# Uploaded resumes are stored once per distinct content as <sha256>.pdf
+BLOB_FOLDER = 'static/resumes'
+
+CHUNK_SIZE = 64 * 1024
+
+# Unreferenced blobs seen more recently than this are not collected, so an
+# upload isn't removed between being stored and its application being saved
+GC_GRACE_SECONDS = 3600
+
+def _write_blob(chunks, filename):
+    """Write chunks to the store while hashing them. Returns the blob path"""
+    os.makedirs(BLOB_FOLDER, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    
+    fd, temp_path = tempfile.mkstemp(dir=BLOB_FOLDER, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in chunks:
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        
+        content_hash = digest.hexdigest()
+        blob_path = os.path.join(BLOB_FOLDER, f'{content_hash}.pdf')
+        
+        # Register before moving into place so the collector sees a fresh blob
+        register_resume_blob(content_hash, blob_path, size, filename)
+        os.replace(temp_path, blob_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    
+    return blob_path
+
+def store_upload(file, filename):
+    """Stream an uploaded file into the store, reading it exactly once.
+    
+    Identical content always maps to the same path, so re-uploading a resume
+    for another application costs no extra disk.
+    """
+    return _write_blob(iter(lambda: file.read(CHUNK_SIZE), b''), filename)
+
+def collect_garbage(grace_seconds=GC_GRACE_SECONDS):
+    """Delete blobs no application references. Returns the number of files removed"""
+    removed = 0
+    for path in delete_unreferenced_blobs(grace_seconds):
+        if os.path.exists(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
+def import_legacy_uploads():
+    """Move timestamp-named uploads into the store, merging duplicates"""
+    imported = 0
+    for legacy_path in get_legacy_resume_paths():
+        if not os.path.exists(legacy_path):
+            continue
+        
+        with open(legacy_path, 'rb') as f:
+            blob_path = _write_blob(iter(lambda: f.read(CHUNK_SIZE), b''),
+                                    os.path.basename(legacy_path))
+        replace_resume_path(legacy_path, blob_path)
+        if os.path.abspath(legacy_path) != os.path.abspath(blob_path):
+            os.remove(legacy_path)
+        imported += 1
+    return imported
+
+if __name__ == "__main__":
+    print(f"Imported {import_legacy_uploads()} legacy uploads")
+    print(f"Removed {collect_garbage()} unreferenced blobs")
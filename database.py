@@ -1,10 +1,33 @@
+import inspect
+import json
+import os
 import sqlite3
 from datetime import datetime
+from instrumentation import TracedConnection, traced
+from models import Job, JournalEntry, ApplicationSummary, format_dates
+
+# Tables whose writes bump each data set's version in data_versions
+VERSIONED_TABLES = {
+    'jobs': ('jobs', 'job_points', 'ai_job_orders', 'ai_point_orders'),
+    'journal': ('journal_entries', 'journal_entry_tags', 'journal_tags'),
+    'applications': ('job_applications', 'application_jobs', 'application_points'),
+    'candidates': ('point_candidates',),
+}
+
+DB_PATH = 'resume.db'
+
+def _connect(timeout=5.0):
+    """Open a connection whose queries are timed into request spans and metrics"""
+    return sqlite3.connect(DB_PATH, timeout=timeout, factory=TracedConnection)
 
 def init_db():
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
+    # WAL lets readers in other worker processes run while one process writes.
+    # The mode is stored in the database file, so it only needs setting once.
+    c.execute('PRAGMA journal_mode=WAL')
+    
     # Create tables
     c.execute('''
         CREATE TABLE IF NOT EXISTS jobs (
@@ -15,7 +38,8 @@ def init_db():
             start_date TEXT NOT NULL,
             end_date TEXT,
             current BOOLEAN DEFAULT 0,
-            display_order INTEGER
+            display_order INTEGER,
+            display_dates TEXT
         )
     ''')
     
@@ -158,6 +182,123 @@ def init_db():
         )
     ''')
     
+    # Per-day journal aggregates backing the calendar and heatmap views
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS journal_daily_stats (
+            job_id INTEGER NOT NULL,
+            entry_date DATE NOT NULL,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            hours REAL NOT NULL DEFAULT 0,
+            highlights INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (entry_date, job_id)
+        ) WITHOUT ROWID
+    ''')
+    
+    # Monotonic counters bumped on every write to a data set (used for
+    # fragment caching and ETags)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
+    # Frozen resume content for applications, deduplicated by content hash and
+    # reference counted by job_applications.snapshot_hash
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS resume_snapshots (
+            content_hash TEXT PRIMARY KEY,
+            content TEXT NOT NULL,
+            rendered_tex TEXT NOT NULL,
+            pdf_path TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Content-addressed uploaded resumes, reference counted by job_applications
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS resume_blobs (
+            content_hash TEXT PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            size INTEGER,
+            filename TEXT,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Candidate resume bullets mined from journal highlights, awaiting review
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS point_candidates (
+            id INTEGER PRIMARY KEY,
+            job_id INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            source_entry_ids TEXT,
+            source TEXT,
+            status TEXT CHECK(status IN ('pending', 'accepted', 'dismissed')) NOT NULL DEFAULT 'pending',
+            point_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (job_id) REFERENCES jobs (id) ON DELETE CASCADE,
+            FOREIGN KEY (point_id) REFERENCES job_points (id)
+        )
+    ''')
+    
+    c.execute('CREATE INDEX IF NOT EXISTS idx_point_candidates_status ON point_candidates (status, job_id)')
+    
+    # One candidate per bullet text and job, however many mining passes
+    # produce it (rows from before the constraint are deduplicated first)
+    c.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_point_candidates_text'")
+    if not c.fetchone():
+        c.execute('''
+            DELETE FROM point_candidates
+            WHERE id NOT IN (SELECT MIN(id) FROM point_candidates GROUP BY job_id, text)
+        ''')
+        c.execute('CREATE UNIQUE INDEX idx_point_candidates_text ON point_candidates (job_id, text)')
+    
+    # Background tasks (AI optimization, PDF builds) run by task_runner.py.
+    # locked_until is the running worker's lease; a task whose lease has
+    # expired belonged to a worker that died and is picked up again.
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL DEFAULT '{}',
+            status TEXT CHECK(status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')) NOT NULL DEFAULT 'queued',
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            cancel_requested BOOLEAN NOT NULL DEFAULT 0,
+            run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            locked_until TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    ''')
+    
+    c.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, run_after)')
+    
+    # Relevance scores from past AI optimizations, so a re-run only sends
+    # bullets (and jobs) it hasn't scored for this job description before.
+    # item_hash covers a bullet's text or a job's title and company;
+    # context_hash the job description and story.
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS ai_score_cache (
+            model_type TEXT NOT NULL,
+            context_hash TEXT NOT NULL,
+            item_hash TEXT NOT NULL,
+            score REAL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (model_type, context_hash, item_hash)
+        ) WITHOUT ROWID
+    ''')
+    
+    c.execute('CREATE INDEX IF NOT EXISTS idx_ai_job_orders_model ON ai_job_orders (model_type, job_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_ai_point_orders_model ON ai_point_orders (model_type, point_id)')
+    
     # Future: Manager/peer sign-offs on entries
     c.execute('''
         CREATE TABLE IF NOT EXISTS journal_signoffs (
@@ -172,12 +313,262 @@ def init_db():
         )
     ''')
     
+    # Formatted date range stored at write time so reads skip strptime
+    c.execute("PRAGMA table_info(jobs)")
+    columns = [column[1] for column in c.fetchall()]
+    if 'display_dates' not in columns:
+        c.execute('ALTER TABLE jobs ADD COLUMN display_dates TEXT')
+    
     # Check if resume_path column exists, if not add it
     c.execute("PRAGMA table_info(job_applications)")
     columns = [column[1] for column in c.fetchall()]
     if 'resume_path' not in columns:
         c.execute('ALTER TABLE job_applications ADD COLUMN resume_path TEXT')
     
+    # Name the resume was uploaded under. Blobs are shared between applications
+    # with identical uploads, so the name is kept per application
+    if 'resume_filename' not in columns:
+        c.execute('ALTER TABLE job_applications ADD COLUMN resume_filename TEXT')
+        c.execute('''
+            UPDATE job_applications
+            SET resume_filename = (SELECT rb.filename FROM resume_blobs rb WHERE rb.path = job_applications.resume_path)
+            WHERE resume_path IS NOT NULL
+        ''')
+    
+    # Maintained linked-job count so the applications listing doesn't need a JOIN
+    c.execute("PRAGMA table_info(job_applications)")
+    columns = [column[1] for column in c.fetchall()]
+    if 'job_count' not in columns:
+        c.execute('ALTER TABLE job_applications ADD COLUMN job_count INTEGER NOT NULL DEFAULT 0')
+        c.execute('''
+            UPDATE job_applications
+            SET job_count = (
+                SELECT COUNT(*)
+                FROM application_jobs aj
+                WHERE aj.application_id = job_applications.id
+            )
+        ''')
+    
+    # Frozen resume snapshot each application was created with
+    if 'snapshot_hash' not in columns:
+        c.execute('ALTER TABLE job_applications ADD COLUMN snapshot_hash TEXT')
+    
+    c.execute('CREATE INDEX IF NOT EXISTS idx_job_applications_date ON job_applications (application_date DESC)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_job_applications_status_date ON job_applications (status, application_date DESC)')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_application_jobs_insert
+        AFTER INSERT ON application_jobs
+        BEGIN
+            UPDATE job_applications SET job_count = job_count + 1 WHERE id = NEW.application_id;
+        END
+    ''')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_application_jobs_delete
+        AFTER DELETE ON application_jobs
+        BEGIN
+            UPDATE job_applications SET job_count = job_count - 1 WHERE id = OLD.application_id;
+        END
+    ''')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_job_applications_blob_insert
+        AFTER INSERT ON job_applications
+        WHEN NEW.resume_path IS NOT NULL
+        BEGIN
+            UPDATE resume_blobs SET ref_count = ref_count + 1 WHERE path = NEW.resume_path;
+        END
+    ''')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_job_applications_blob_delete
+        AFTER DELETE ON job_applications
+        WHEN OLD.resume_path IS NOT NULL
+        BEGIN
+            UPDATE resume_blobs SET ref_count = ref_count - 1 WHERE path = OLD.resume_path;
+        END
+    ''')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_job_applications_blob_update
+        AFTER UPDATE OF resume_path ON job_applications
+        WHEN OLD.resume_path IS NOT NEW.resume_path
+        BEGIN
+            UPDATE resume_blobs SET ref_count = ref_count - 1 WHERE path = OLD.resume_path;
+            UPDATE resume_blobs SET ref_count = ref_count + 1 WHERE path = NEW.resume_path;
+        END
+    ''')
+    
+    c.execute("PRAGMA table_info(resume_snapshots)")
+    columns = [column[1] for column in c.fetchall()]
+    if 'ref_count' not in columns:
+        c.execute('ALTER TABLE resume_snapshots ADD COLUMN ref_count INTEGER NOT NULL DEFAULT 0')
+        c.execute('''
+            UPDATE resume_snapshots
+            SET ref_count = (
+                SELECT COUNT(*)
+                FROM job_applications ja
+                WHERE ja.snapshot_hash = resume_snapshots.content_hash
+            )
+        ''')
+    if 'last_seen_at' not in columns:
+        # ALTER TABLE can't add a CURRENT_TIMESTAMP default; inserts set it explicitly
+        c.execute('ALTER TABLE resume_snapshots ADD COLUMN last_seen_at TIMESTAMP')
+        c.execute('UPDATE resume_snapshots SET last_seen_at = created_at')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_job_applications_snapshot_insert
+        AFTER INSERT ON job_applications
+        WHEN NEW.snapshot_hash IS NOT NULL
+        BEGIN
+            UPDATE resume_snapshots SET ref_count = ref_count + 1 WHERE content_hash = NEW.snapshot_hash;
+        END
+    ''')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_job_applications_snapshot_delete
+        AFTER DELETE ON job_applications
+        WHEN OLD.snapshot_hash IS NOT NULL
+        BEGIN
+            UPDATE resume_snapshots SET ref_count = ref_count - 1 WHERE content_hash = OLD.snapshot_hash;
+        END
+    ''')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_job_applications_snapshot_update
+        AFTER UPDATE OF snapshot_hash ON job_applications
+        WHEN OLD.snapshot_hash IS NOT NEW.snapshot_hash
+        BEGIN
+            UPDATE resume_snapshots SET ref_count = ref_count - 1 WHERE content_hash = OLD.snapshot_hash;
+            UPDATE resume_snapshots SET ref_count = ref_count + 1 WHERE content_hash = NEW.snapshot_hash;
+        END
+    ''')
+    
+    # Maintained tag usage count so the tag cloud doesn't need a JOIN + GROUP BY
+    c.execute("PRAGMA table_info(journal_tags)")
+    columns = [column[1] for column in c.fetchall()]
+    if 'usage_count' not in columns:
+        c.execute('ALTER TABLE journal_tags ADD COLUMN usage_count INTEGER NOT NULL DEFAULT 0')
+        c.execute('''
+            UPDATE journal_tags
+            SET usage_count = (
+                SELECT COUNT(*)
+                FROM journal_entry_tags jet
+                WHERE jet.tag_id = journal_tags.id
+            )
+        ''')
+    
+    c.execute('CREATE INDEX IF NOT EXISTS idx_journal_tags_usage ON journal_tags (usage_count DESC)')
+    
+    # Track which journal entries the highlight miner has already processed
+    c.execute("PRAGMA table_info(journal_entries)")
+    columns = [column[1] for column in c.fetchall()]
+    if 'mined_at' not in columns:
+        c.execute('ALTER TABLE journal_entries ADD COLUMN mined_at TIMESTAMP')
+    
+    # Backfill daily aggregates the first time they are created
+    c.execute('SELECT COUNT(*) FROM journal_daily_stats')
+    if c.fetchone()[0] == 0:
+        c.execute('''
+            INSERT INTO journal_daily_stats (job_id, entry_date, entry_count, hours, highlights)
+            SELECT job_id, entry_date, COUNT(*), TOTAL(hours_worked),
+                   SUM(CASE WHEN is_highlight = 1 THEN 1 ELSE 0 END)
+            FROM journal_entries
+            GROUP BY job_id, entry_date
+        ''')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_journal_entries_insert
+        AFTER INSERT ON journal_entries
+        BEGIN
+            INSERT INTO journal_daily_stats (job_id, entry_date, entry_count, hours, highlights)
+            VALUES (NEW.job_id, NEW.entry_date, 1, COALESCE(NEW.hours_worked, 0),
+                    CASE WHEN NEW.is_highlight = 1 THEN 1 ELSE 0 END)
+            ON CONFLICT (entry_date, job_id) DO UPDATE SET
+                entry_count = entry_count + 1,
+                hours = hours + excluded.hours,
+                highlights = highlights + excluded.highlights;
+        END
+    ''')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_journal_entries_delete
+        AFTER DELETE ON journal_entries
+        BEGIN
+            UPDATE journal_daily_stats SET
+                entry_count = entry_count - 1,
+                hours = hours - COALESCE(OLD.hours_worked, 0),
+                highlights = highlights - CASE WHEN OLD.is_highlight = 1 THEN 1 ELSE 0 END
+            WHERE job_id = OLD.job_id AND entry_date = OLD.entry_date;
+            DELETE FROM journal_daily_stats
+            WHERE job_id = OLD.job_id AND entry_date = OLD.entry_date AND entry_count <= 0;
+        END
+    ''')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_journal_entries_update
+        AFTER UPDATE OF job_id, entry_date, hours_worked, is_highlight ON journal_entries
+        BEGIN
+            UPDATE journal_daily_stats SET
+                entry_count = entry_count - 1,
+                hours = hours - COALESCE(OLD.hours_worked, 0),
+                highlights = highlights - CASE WHEN OLD.is_highlight = 1 THEN 1 ELSE 0 END
+            WHERE job_id = OLD.job_id AND entry_date = OLD.entry_date;
+            DELETE FROM journal_daily_stats
+            WHERE job_id = OLD.job_id AND entry_date = OLD.entry_date AND entry_count <= 0;
+            INSERT INTO journal_daily_stats (job_id, entry_date, entry_count, hours, highlights)
+            VALUES (NEW.job_id, NEW.entry_date, 1, COALESCE(NEW.hours_worked, 0),
+                    CASE WHEN NEW.is_highlight = 1 THEN 1 ELSE 0 END)
+            ON CONFLICT (entry_date, job_id) DO UPDATE SET
+                entry_count = entry_count + 1,
+                hours = hours + excluded.hours,
+                highlights = highlights + excluded.highlights;
+        END
+    ''')
+    
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_journal_entries_unmined
+        ON journal_entries (job_id)
+        WHERE mined_at IS NULL
+    ''')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_journal_entry_tags_insert
+        AFTER INSERT ON journal_entry_tags
+        BEGIN
+            UPDATE journal_tags SET usage_count = usage_count + 1 WHERE id = NEW.tag_id;
+        END
+    ''')
+    
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_journal_entry_tags_delete
+        AFTER DELETE ON journal_entry_tags
+        BEGIN
+            UPDATE journal_tags SET usage_count = usage_count - 1 WHERE id = OLD.tag_id;
+        END
+    ''')
+    
+    # A random epoch, so version numbers from a recreated database never
+    # match ETags issued for an older one
+    c.execute('''
+        INSERT OR IGNORE INTO data_versions (name, version)
+        VALUES ('epoch', ABS(RANDOM()) % 1000000000)
+    ''')
+    
+    # Bump a data set's version on any write to one of its tables
+    for name, tables in VERSIONED_TABLES.items():
+        for table in tables:
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                c.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                    AFTER {event} ON {table}
+                    BEGIN
+                        INSERT INTO data_versions (name, version) VALUES ('{name}', 1)
+                        ON CONFLICT (name) DO UPDATE SET version = version + 1;
+                    END
+                ''')
+    
     # Sample data
     c.execute('''INSERT OR IGNORE INTO jobs 
                 (id, title, company, location, start_date, end_date, current)
@@ -201,59 +592,36 @@ def init_db():
         WHERE display_order IS NULL
     ''')
     
+    # Backfill display dates for jobs written before the column existed
+    c.execute('SELECT id, start_date, end_date, current FROM jobs WHERE display_dates IS NULL')
+    c.executemany('UPDATE jobs SET display_dates = ? WHERE id = ?',
+                  [(format_dates(start_date, end_date, current), job_id)
+                   for job_id, start_date, end_date, current in c.fetchall()])
+    
     conn.commit()
     conn.close()
 
 def get_all_jobs():
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
+    conn.row_factory = Job.from_row
     c = conn.cursor()
     
     c.execute('''
         SELECT j.id, j.title, j.company, j.location, j.start_date, 
-               j.end_date, j.current, j.display_order,
-               GROUP_CONCAT(jp.id || ':' || jp.point, '||' ORDER BY jp.order_num) as points
+               j.end_date, j.current, j.display_order, j.display_dates,
+               GROUP_CONCAT(jp.id || char(31) || jp.point, char(31) ORDER BY jp.order_num) as points
         FROM jobs j
         LEFT JOIN job_points jp ON j.id = jp.job_id
         GROUP BY j.id
         ORDER BY j.display_order
     ''')
     
-    jobs = []
-    for row in c.fetchall():
-        points_data = []
-        if row[8]:  # If there are points
-            for point_str in row[8].split('||'):
-                if ':' in point_str:
-                    point_id, point_text = point_str.split(':', 1)
-                    points_data.append({'id': point_id, 'text': point_text})
-        
-        job = {
-            'id': row[0],
-            'title': row[1],
-            'company': row[2],
-            'location': row[3],
-            'dates': format_dates(row[4], row[5], row[6]),
-            'points': [p['text'] for p in points_data],
-            'point_ids': [p['id'] for p in points_data],
-            'display_order': row[7],
-            'resume_points': [p['text'] for p in points_data[:3]] if points_data else []
-        }
-        jobs.append(job)
-    
+    jobs = c.fetchall()
     conn.close()
     return jobs
 
-def format_dates(start_date, end_date, current):
-    start = datetime.strptime(start_date, '%Y-%m').strftime('%b %Y')
-    if current:
-        return f'{start} – Present'
-    elif end_date:
-        end = datetime.strptime(end_date, '%Y-%m').strftime('%b %Y')
-        return f'{start} – {end}'
-    return start
-
 def add_job_points(job_id, point, order_num):
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     c.execute('''
         INSERT INTO job_points (job_id, point, order_num)
@@ -263,7 +631,7 @@ def add_job_points(job_id, point, order_num):
     conn.close()
 
 def add_job(title, company, location, start_date, end_date=None, current=False):
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     # Get the next display order
@@ -271,16 +639,18 @@ def add_job(title, company, location, start_date, end_date=None, current=False):
     next_order = c.fetchone()[0]
     
     c.execute('''
-        INSERT INTO jobs (title, company, location, start_date, end_date, current, display_order)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (title, company, location, start_date, end_date, current, next_order))
+        INSERT INTO jobs (title, company, location, start_date, end_date, current, display_order,
+                          display_dates)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (title, company, location, start_date, end_date, current, next_order,
+          format_dates(start_date, end_date, current)))
     job_id = c.lastrowid
     conn.commit()
     conn.close()
     return job_id
 
 def get_next_order_num(job_id):
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     c.execute('SELECT MAX(order_num) FROM job_points WHERE job_id = ?', (job_id,))
     max_order = c.fetchone()[0]
@@ -288,14 +658,14 @@ def get_next_order_num(job_id):
     return (max_order or 0) + 1
 
 def delete_job_point(point_id):
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     c.execute('DELETE FROM job_points WHERE id = ?', (point_id,))
     conn.commit()
     conn.close()
 
 def delete_job_and_points(job_id):
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     # Delete points first (due to foreign key constraint)
     c.execute('DELETE FROM job_points WHERE job_id = ?', (job_id,))
@@ -305,7 +675,7 @@ def delete_job_and_points(job_id):
     conn.close()
 
 def update_job_order(job_orders):
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     # If job_orders is a dictionary, convert it to the expected format
@@ -323,7 +693,7 @@ def update_job_order(job_orders):
     conn.close()
 
 def update_job_point_order(job_id, point_orders):
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     for point in point_orders:
@@ -337,44 +707,87 @@ def update_job_point_order(job_id, point_orders):
     conn.close()
 
 def store_ai_ordering(job_orders, point_orders, model_type):
-    conn = sqlite3.connect('resume.db')
+    """Replace a model's stored ordering, writing only the rows that changed
+    (unchanged rows don't bump the jobs data version)"""
+    conn = _connect()
     c = conn.cursor()
     
-    # Clear old orderings for this model type
-    c.execute('DELETE FROM ai_job_orders WHERE model_type = ?', (model_type,))
-    c.execute('DELETE FROM ai_point_orders WHERE model_type = ?', (model_type,))
-    
     # Store job orders
-    for job_id, order in job_orders.items():
-        c.execute('''
-            INSERT INTO ai_job_orders (job_id, ai_display_order, model_type)
-            VALUES (?, ?, ?)
-        ''', (job_id, order, model_type))
+    c.execute('SELECT job_id, ai_display_order FROM ai_job_orders WHERE model_type = ?', (model_type,))
+    old_jobs = dict(c.fetchall())
+    new_jobs = {int(job_id): order for job_id, order in job_orders.items()}
+    c.executemany('DELETE FROM ai_job_orders WHERE model_type = ? AND job_id = ?',
+                  [(model_type, job_id) for job_id in old_jobs.keys() - new_jobs.keys()])
+    c.executemany('UPDATE ai_job_orders SET ai_display_order = ? WHERE model_type = ? AND job_id = ?',
+                  [(order, model_type, job_id) for job_id, order in new_jobs.items()
+                   if job_id in old_jobs and old_jobs[job_id] != order])
+    c.executemany('INSERT INTO ai_job_orders (job_id, ai_display_order, model_type) VALUES (?, ?, ?)',
+                  [(job_id, order, model_type) for job_id, order in new_jobs.items() if job_id not in old_jobs])
     
     # Store point orders
-    for job_id, points in point_orders.items():
-        for point_id, order_data in points.items():
-            c.execute('''
-                INSERT INTO ai_point_orders 
-                (job_id, point_id, ai_order_num, relevance_score, model_type)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (job_id, point_id, order_data['order'], 
-                  order_data['score'], model_type))
+    c.execute('''
+        SELECT point_id, job_id, ai_order_num, relevance_score FROM ai_point_orders WHERE model_type = ?
+    ''', (model_type,))
+    old_points = {row[0]: row[1:] for row in c.fetchall()}
+    new_points = {
+        int(point_id): (int(job_id), order_data['order'], order_data['score'])
+        for job_id, points in point_orders.items()
+        for point_id, order_data in points.items()
+    }
+    c.executemany('DELETE FROM ai_point_orders WHERE model_type = ? AND point_id = ?',
+                  [(model_type, point_id) for point_id in old_points.keys() - new_points.keys()])
+    c.executemany('''
+        UPDATE ai_point_orders SET job_id = ?, ai_order_num = ?, relevance_score = ?
+        WHERE model_type = ? AND point_id = ?
+    ''', [(*values, model_type, point_id) for point_id, values in new_points.items()
+          if point_id in old_points and old_points[point_id] != values])
+    c.executemany('''
+        INSERT INTO ai_point_orders 
+        (point_id, job_id, ai_order_num, relevance_score, model_type)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(point_id, *values, model_type) for point_id, values in new_points.items()
+          if point_id not in old_points])
     
     conn.commit()
     conn.close()
 
+def get_ai_scores(model_type, context_hash):
+    """Cached AI relevance scores for one job description: {item_hash: score}"""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        SELECT item_hash, score FROM ai_score_cache
+        WHERE model_type = ? AND context_hash = ?
+    ''', (model_type, context_hash))
+    scores = dict(c.fetchall())
+    conn.close()
+    return scores
+
+def save_ai_scores(model_type, context_hash, scores):
+    """Cache AI relevance scores ({item_hash: score}) for one job description"""
+    conn = _connect()
+    c = conn.cursor()
+    c.executemany('''
+        INSERT OR REPLACE INTO ai_score_cache (model_type, context_hash, item_hash, score)
+        VALUES (?, ?, ?, ?)
+    ''', [(model_type, context_hash, item_hash, score) for item_hash, score in scores.items()])
+    conn.commit()
+    conn.close()
+
 def get_ai_ordered_jobs(model_type):
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
+    # Job.from_row drops points repeated by the ai_point_orders join
+    conn.row_factory = Job.from_row
     c = conn.cursor()
     
     # Get jobs with AI ordering
     c.execute('''
         SELECT j.id, j.title, j.company, j.location, j.start_date, 
                j.end_date, j.current, COALESCE(ao.ai_display_order, j.display_order) as display_order,
+               j.display_dates,
                GROUP_CONCAT(
-                   jp.id || ':' || jp.point, 
-                   '||' 
+                   jp.id || char(31) || jp.point, 
+                   char(31) 
                    ORDER BY COALESCE(apo.ai_order_num, jp.order_num), jp.id
                ) as points
         FROM jobs j
@@ -385,36 +798,21 @@ def get_ai_ordered_jobs(model_type):
         ORDER BY COALESCE(ao.ai_display_order, j.display_order), j.id
     ''', (model_type, model_type))
     
-    jobs = []
-    for row in c.fetchall():
-        points_data = []
-        if row[8]:  # If there are points
-            seen_points = set()  # Track unique points
-            for point_str in row[8].split('||'):
-                if ':' in point_str:
-                    point_id, point_text = point_str.split(':', 1)
-                    if point_id not in seen_points:  # Only add if not seen
-                        points_data.append({'id': point_id, 'text': point_text})
-                        seen_points.add(point_id)
-        
-        job = {
-            'id': row[0],
-            'title': row[1],
-            'company': row[2],
-            'location': row[3],
-            'dates': format_dates(row[4], row[5], row[6]),
-            'points': [p['text'] for p in points_data],
-            'point_ids': [p['id'] for p in points_data],
-            'display_order': row[7],
-            'resume_points': [p['text'] for p in points_data[:3]] if points_data else []
-        }
-        jobs.append(job)
-    
+    jobs = c.fetchall()
     conn.close()
     return jobs
 
+def get_ai_point_scores(model_type):
+    """AI relevance scores by point id (str) for one model"""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('SELECT point_id, relevance_score FROM ai_point_orders WHERE model_type = ?', (model_type,))
+    scores = {str(point_id): score for point_id, score in c.fetchall()}
+    conn.close()
+    return scores
+
 def update_point_order_db(point_id, new_order):
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     c.execute('UPDATE job_points SET order_num = ? WHERE id = ?', (new_order, point_id))
     conn.commit()
@@ -426,7 +824,7 @@ def update_point_order_db(point_id, new_order):
 
 def get_settings():
     """Get user settings"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     c.execute('SELECT * FROM user_settings WHERE id = 1')
@@ -461,7 +859,7 @@ def get_settings():
 
 def save_settings(settings):
     """Save user settings"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     c.execute('''
@@ -498,53 +896,53 @@ def save_settings(settings):
 # Application Functions
 # ============================================
 
-def get_all_applications():
-    """Get all applications with their linked jobs"""
-    conn = sqlite3.connect('resume.db')
+def get_application_summaries(status=None, limit=50, offset=0):
+    """Get one page of applications with only the fields the listing displays"""
+    conn = _connect()
+    conn.row_factory = ApplicationSummary.from_row
     c = conn.cursor()
     
-    c.execute('''
-        SELECT ja.id, ja.company, ja.title, ja.application_date, ja.status,
-               ja.job_description, ja.story, ja.resume_path, ja.created_at,
-               GROUP_CONCAT(aj.job_id) as job_ids
-        FROM job_applications ja
-        LEFT JOIN application_jobs aj ON ja.id = aj.application_id
-        GROUP BY ja.id
-        ORDER BY ja.application_date DESC
-    ''')
+    query = '''
+        SELECT id, company, title, application_date, status, job_count
+        FROM job_applications
+    '''
+    params = []
     
-    applications = []
-    for row in c.fetchall():
-        job_ids = []
-        if row[9]:
-            job_ids = [int(jid) for jid in row[9].split(',')]
-        
-        applications.append({
-            'id': row[0],
-            'company': row[1],
-            'title': row[2],
-            'date': row[3],
-            'status': row[4],
-            'job_description': row[5] or '',
-            'story': row[6] or '',
-            'resume_path': row[7],
-            'created_at': row[8],
-            'job_ids': job_ids,
-            'job_count': len(job_ids)
-        })
+    if status:
+        query += ' WHERE status = ?'
+        params.append(status)
+    
+    query += ' ORDER BY application_date DESC, id DESC LIMIT ? OFFSET ?'
+    params.extend([limit, offset])
+    
+    c.execute(query, params)
+    applications = c.fetchall()
     
     conn.close()
     return applications
 
+def get_application_status_counts():
+    """Get the number of applications per status, plus a 'total'"""
+    conn = _connect()
+    c = conn.cursor()
+    
+    c.execute('SELECT status, COUNT(*) FROM job_applications GROUP BY status')
+    counts = {'applied': 0, 'interviewing': 0, 'rejected': 0, 'accepted': 0}
+    counts.update(c.fetchall())
+    counts['total'] = sum(counts.values())
+    
+    conn.close()
+    return counts
+
 def get_application(app_id):
-    """Get a single application with full details"""
-    conn = sqlite3.connect('resume.db')
+    """Get a single application with full details, as a dict (see models.py)"""
+    conn = _connect()
     c = conn.cursor()
     
     # Get application details
     c.execute('''
         SELECT id, company, title, application_date, status,
-               job_description, story, resume_path, created_at
+               job_description, story, resume_path, created_at, snapshot_hash
         FROM job_applications
         WHERE id = ?
     ''', (app_id,))
@@ -564,13 +962,14 @@ def get_application(app_id):
         'story': row[6] or '',
         'resume_path': row[7],
         'created_at': row[8],
+        'snapshot_hash': row[9],
         'jobs': []
     }
     
     # Get linked jobs with their points
     c.execute('''
         SELECT j.id, j.title, j.company, j.location, j.start_date, j.end_date, j.current,
-               aj.display_order
+               aj.display_order, j.display_dates
         FROM application_jobs aj
         JOIN jobs j ON aj.job_id = j.id
         WHERE aj.application_id = ?
@@ -583,7 +982,7 @@ def get_application(app_id):
             'title': job_row[1],
             'company': job_row[2],
             'location': job_row[3],
-            'dates': format_dates(job_row[4], job_row[5], job_row[6]),
+            'dates': job_row[8] or format_dates(job_row[4], job_row[5], job_row[6]),
             'display_order': job_row[7],
             'points': []
         }
@@ -610,17 +1009,17 @@ def get_application(app_id):
     return application
 
 def create_application(company, title, application_date, job_description='', story='', 
-                       job_ids=None, point_selections=None, resume_path=None):
+                       job_ids=None, point_selections=None, resume_path=None, resume_filename=None):
     """Create a new application with linked jobs and points"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     # Insert application
     c.execute('''
         INSERT INTO job_applications 
-        (company, title, application_date, job_description, story, resume_path, status)
-        VALUES (?, ?, ?, ?, ?, ?, 'applied')
-    ''', (company, title, application_date, job_description, story, resume_path))
+        (company, title, application_date, job_description, story, resume_path, resume_filename, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, 'applied')
+    ''', (company, title, application_date, job_description, story, resume_path, resume_filename))
     
     app_id = c.lastrowid
     
@@ -646,7 +1045,7 @@ def create_application(company, title, application_date, job_description='', sto
 
 def update_application(app_id, **kwargs):
     """Update application details"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     # Build update query dynamically
@@ -661,6 +1060,10 @@ def update_application(app_id, **kwargs):
             updates.append(f'{field} = ?')
             values.append(kwargs[field])
     
+    # New job/point selections mean new resume content; drop the frozen snapshot
+    if 'job_ids' in kwargs or 'point_selections' in kwargs:
+        updates.append('snapshot_hash = NULL')
+    
     if updates:
         values.append(app_id)
         c.execute(f'''
@@ -694,9 +1097,18 @@ def update_application(app_id, **kwargs):
     conn.commit()
     conn.close()
 
+def get_application_resume(app_id):
+    """Get (resume_path, resume_filename) of an application's upload; (None, None) if none"""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('SELECT resume_path, resume_filename FROM job_applications WHERE id = ?', (app_id,))
+    result = c.fetchone()
+    conn.close()
+    return tuple(result) if result else (None, None)
+
 def delete_application(app_id):
     """Delete an application and its links"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     # Get resume path before deleting
@@ -717,13 +1129,14 @@ def delete_application(app_id):
     return resume_path
 
 def get_jobs_for_application(app_id):
-    """Get jobs linked to an application with their selected points"""
-    conn = sqlite3.connect('resume.db')
+    """Get jobs linked to an application with their selected points, as dicts
+    (see models.py)"""
+    conn = _connect()
     c = conn.cursor()
     
     c.execute('''
         SELECT j.id, j.title, j.company, j.location, j.start_date, j.end_date, j.current,
-               aj.display_order
+               aj.display_order, j.display_dates
         FROM application_jobs aj
         JOIN jobs j ON aj.job_id = j.id
         WHERE aj.application_id = ?
@@ -737,7 +1150,7 @@ def get_jobs_for_application(app_id):
             'title': row[1],
             'company': row[2],
             'location': row[3],
-            'dates': format_dates(row[4], row[5], row[6]),
+            'dates': row[8] or format_dates(row[4], row[5], row[6]),
             'display_order': row[7],
             'points': []
         }
@@ -757,14 +1170,236 @@ def get_jobs_for_application(app_id):
     conn.close()
     return jobs
 
+# ============================================
+# Resume Snapshot Functions
+# ============================================
+
+def get_resume_snapshot(content_hash):
+    """Get a stored resume snapshot by content hash"""
+    conn = _connect()
+    c = conn.cursor()
+    
+    c.execute('''
+        SELECT content_hash, content, rendered_tex, pdf_path, created_at
+        FROM resume_snapshots
+        WHERE content_hash = ?
+    ''', (content_hash,))
+    row = c.fetchone()
+    conn.close()
+    
+    if not row:
+        return None
+    
+    return {
+        'content_hash': row[0],
+        'content': row[1],
+        'rendered_tex': row[2],
+        'pdf_path': row[3],
+        'created_at': row[4]
+    }
+
+def save_resume_snapshot(content_hash, content, rendered_tex, pdf_path=None):
+    """Store a resume snapshot, or refresh last_seen_at if identical content is already stored"""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO resume_snapshots (content_hash, content, rendered_tex, pdf_path, last_seen_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (content_hash) DO UPDATE SET last_seen_at = CURRENT_TIMESTAMP
+    ''', (content_hash, content, rendered_tex, pdf_path))
+    conn.commit()
+    conn.close()
+
+def set_snapshot_pdf_path(content_hash, pdf_path):
+    """Record where a snapshot's compiled PDF is stored"""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('UPDATE resume_snapshots SET pdf_path = ? WHERE content_hash = ?',
+              (pdf_path, content_hash))
+    conn.commit()
+    conn.close()
+
+def set_application_snapshot(app_id, content_hash):
+    """Point an application at a resume snapshot"""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('UPDATE job_applications SET snapshot_hash = ? WHERE id = ?',
+              (content_hash, app_id))
+    conn.commit()
+    conn.close()
+
+def get_application_snapshot(app_id):
+    """Get the resume snapshot an application was frozen with, if any"""
+    conn = _connect()
+    c = conn.cursor()
+    
+    c.execute('''
+        SELECT rs.content_hash, rs.content, rs.rendered_tex, rs.pdf_path, rs.created_at
+        FROM job_applications ja
+        JOIN resume_snapshots rs ON ja.snapshot_hash = rs.content_hash
+        WHERE ja.id = ?
+    ''', (app_id,))
+    row = c.fetchone()
+    conn.close()
+    
+    if not row:
+        return None
+    
+    return {
+        'content_hash': row[0],
+        'content': row[1],
+        'rendered_tex': row[2],
+        'pdf_path': row[3],
+        'created_at': row[4]
+    }
+
+def delete_unreferenced_snapshots(grace_seconds):
+    """Delete snapshot rows no application references, returning their PDF paths.
+    
+    Snapshots saved within the last grace_seconds are kept so one isn't
+    collected before its application is pointed at it.
+    """
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        DELETE FROM resume_snapshots
+        WHERE ref_count <= 0 AND last_seen_at <= datetime('now', ?)
+        RETURNING pdf_path
+    ''', (f'-{int(grace_seconds)} seconds',))
+    paths = [row[0] for row in c.fetchall() if row[0]]
+    conn.commit()
+    conn.close()
+    return paths
+
+# ============================================
+# Resume Blob Functions
+# ============================================
+
+def register_resume_blob(content_hash, path, size, filename):
+    """Record an uploaded blob, or refresh last_seen_at if it is already stored"""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO resume_blobs (content_hash, path, size, filename)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (content_hash) DO UPDATE SET last_seen_at = CURRENT_TIMESTAMP
+    ''', (content_hash, path, size, filename))
+    conn.commit()
+    conn.close()
+
+def get_resume_blob_by_path(path):
+    """Get blob metadata for a stored resume path, or None for non-blob files"""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        SELECT content_hash, path, size, filename, ref_count
+        FROM resume_blobs
+        WHERE path = ?
+    ''', (path,))
+    row = c.fetchone()
+    conn.close()
+    
+    if not row:
+        return None
+    
+    return {
+        'content_hash': row[0],
+        'path': row[1],
+        'size': row[2],
+        'filename': row[3],
+        'ref_count': row[4]
+    }
+
+def delete_unreferenced_blobs(grace_seconds):
+    """Delete blob rows no application references, returning their paths.
+    
+    Blobs seen within the last grace_seconds are kept so a fresh upload isn't
+    collected before its application row is written.
+    """
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        DELETE FROM resume_blobs
+        WHERE ref_count <= 0 AND last_seen_at <= datetime('now', ?)
+        RETURNING path
+    ''', (f'-{int(grace_seconds)} seconds',))
+    paths = [row[0] for row in c.fetchall()]
+    conn.commit()
+    conn.close()
+    return paths
+
+def get_legacy_resume_paths():
+    """Get uploaded resume paths that predate the blob store"""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        SELECT DISTINCT ja.resume_path
+        FROM job_applications ja
+        LEFT JOIN resume_blobs rb ON ja.resume_path = rb.path
+        WHERE ja.resume_path IS NOT NULL AND rb.content_hash IS NULL
+    ''')
+    paths = [row[0] for row in c.fetchall()]
+    conn.close()
+    return paths
+
+def replace_resume_path(old_path, new_path):
+    """Point every application using old_path at new_path, keeping the old
+    file's name as the one it was uploaded under"""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        UPDATE job_applications
+        SET resume_path = ?, resume_filename = COALESCE(resume_filename, ?)
+        WHERE resume_path = ?
+    ''', (new_path, os.path.basename(old_path), old_path))
+    conn.commit()
+    conn.close()
+
 # ============================================
 # Journal Functions
 # ============================================
 
+# Tag name -> id cache. Tag names are unique and ids never change once
+# created, so entries only need to be dropped if tags are deleted.
+_tag_id_cache = {}
+
+def invalidate_tag_cache(name=None):
+    """Drop one tag (or every tag) from the name -> id cache"""
+    if name is None:
+        _tag_id_cache.clear()
+    else:
+        _tag_id_cache.pop(name, None)
+
+def _upsert_tags(c, tag_names):
+    """Resolve tag names to ids, creating any missing tags in one batch.
+    
+    Returns a {name: id} dict. The caller is responsible for committing and
+    then publishing the result to the cache via _tag_id_cache.update().
+    """
+    names = list(dict.fromkeys(tag_names))
+    tag_ids = {name: _tag_id_cache[name] for name in names if name in _tag_id_cache}
+    missing = [name for name in names if name not in tag_ids]
+    
+    if missing:
+        c.executemany('INSERT OR IGNORE INTO journal_tags (name) VALUES (?)',
+                      [(name,) for name in missing])
+        placeholders = ','.join('?' * len(missing))
+        c.execute(f'SELECT name, id FROM journal_tags WHERE name IN ({placeholders})', missing)
+        tag_ids.update(c.fetchall())
+    
+    return tag_ids
+
+def _link_entry_tags(c, entry_id, tag_names):
+    """Attach tags to an entry, returning the resolved {name: id} mapping"""
+    tag_ids = _upsert_tags(c, tag_names)
+    c.executemany('INSERT OR IGNORE INTO journal_entry_tags (entry_id, tag_id) VALUES (?, ?)',
+                  [(entry_id, tag_id) for tag_id in tag_ids.values()])
+    return tag_ids
+
 def create_journal_entry(job_id, entry_date, content, title=None, hours_worked=None, 
                          category='task', mood='neutral', is_highlight=False, tags=None):
     """Create a new journal entry"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     c.execute('''
@@ -776,28 +1411,19 @@ def create_journal_entry(job_id, entry_date, content, title=None, hours_worked=N
     entry_id = c.lastrowid
     
     # Add tags if provided
+    tag_ids = {}
     if tags:
-        for tag_name in tags:
-            # Get or create tag
-            c.execute('SELECT id FROM journal_tags WHERE name = ?', (tag_name,))
-            tag_row = c.fetchone()
-            if tag_row:
-                tag_id = tag_row[0]
-            else:
-                c.execute('INSERT INTO journal_tags (name) VALUES (?)', (tag_name,))
-                tag_id = c.lastrowid
-            
-            # Link tag to entry
-            c.execute('INSERT OR IGNORE INTO journal_entry_tags (entry_id, tag_id) VALUES (?, ?)',
-                     (entry_id, tag_id))
+        tag_ids = _link_entry_tags(c, entry_id, tags)
     
     conn.commit()
     conn.close()
+    _tag_id_cache.update(tag_ids)
     return entry_id
 
 def get_journal_entries(job_id=None, start_date=None, end_date=None, limit=50, offset=0):
     """Get journal entries with optional filters"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
+    conn.row_factory = JournalEntry.from_row
     c = conn.cursor()
     
     query = '''
@@ -833,31 +1459,15 @@ def get_journal_entries(job_id=None, start_date=None, end_date=None, limit=50, o
     query += f' LIMIT {limit} OFFSET {offset}'
     
     c.execute(query, params)
-    
-    entries = []
-    for row in c.fetchall():
-        entries.append({
-            'id': row[0],
-            'job_id': row[1],
-            'entry_date': row[2],
-            'title': row[3],
-            'content': row[4],
-            'hours_worked': row[5],
-            'category': row[6],
-            'mood': row[7],
-            'is_highlight': bool(row[8]),
-            'created_at': row[9],
-            'job_title': row[10],
-            'company': row[11],
-            'tags': row[12].split(',') if row[12] else []
-        })
+    entries = c.fetchall()
     
     conn.close()
     return entries
 
 def get_journal_entry(entry_id):
     """Get a single journal entry"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
+    conn.row_factory = JournalEntry.from_row
     c = conn.cursor()
     
     c.execute('''
@@ -873,31 +1483,13 @@ def get_journal_entry(entry_id):
         GROUP BY je.id
     ''', (entry_id,))
     
-    row = c.fetchone()
+    entry = c.fetchone()
     conn.close()
-    
-    if not row:
-        return None
-    
-    return {
-        'id': row[0],
-        'job_id': row[1],
-        'entry_date': row[2],
-        'title': row[3],
-        'content': row[4],
-        'hours_worked': row[5],
-        'category': row[6],
-        'mood': row[7],
-        'is_highlight': bool(row[8]),
-        'created_at': row[9],
-        'job_title': row[10],
-        'company': row[11],
-        'tags': row[12].split(',') if row[12] else []
-    }
+    return entry
 
 def update_journal_entry(entry_id, **kwargs):
     """Update a journal entry"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     allowed_fields = ['job_id', 'entry_date', 'title', 'content', 'hours_worked', 
@@ -913,6 +1505,9 @@ def update_journal_entry(entry_id, **kwargs):
     
     if updates:
         updates.append('updated_at = CURRENT_TIMESTAMP')
+        # Edited highlights need to go back through the highlight miner
+        if any(field in kwargs for field in ('title', 'content', 'category', 'is_highlight')):
+            updates.append('mined_at = NULL')
         values.append(entry_id)
         c.execute(f'''
             UPDATE journal_entries 
@@ -921,29 +1516,22 @@ def update_journal_entry(entry_id, **kwargs):
         ''', values)
     
     # Update tags if provided
+    tag_ids = {}
     if 'tags' in kwargs:
         # Clear existing tags
         c.execute('DELETE FROM journal_entry_tags WHERE entry_id = ?', (entry_id,))
         
         # Add new tags
-        for tag_name in kwargs['tags']:
-            c.execute('SELECT id FROM journal_tags WHERE name = ?', (tag_name,))
-            tag_row = c.fetchone()
-            if tag_row:
-                tag_id = tag_row[0]
-            else:
-                c.execute('INSERT INTO journal_tags (name) VALUES (?)', (tag_name,))
-                tag_id = c.lastrowid
-            
-            c.execute('INSERT OR IGNORE INTO journal_entry_tags (entry_id, tag_id) VALUES (?, ?)',
-                     (entry_id, tag_id))
+        if kwargs['tags']:
+            tag_ids = _link_entry_tags(c, entry_id, kwargs['tags'])
     
     conn.commit()
     conn.close()
+    _tag_id_cache.update(tag_ids)
 
 def delete_journal_entry(entry_id):
     """Delete a journal entry"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     c.execute('DELETE FROM journal_entry_tags WHERE entry_id = ?', (entry_id,))
@@ -954,7 +1542,7 @@ def delete_journal_entry(entry_id):
 
 def get_journal_stats(job_id=None):
     """Get journal statistics"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     base_query = 'FROM journal_entries je'
@@ -1012,13 +1600,12 @@ def get_journal_stats(job_id=None):
 
 def get_entries_by_date_range(start_date, end_date, job_id=None):
     """Get entries grouped by date for calendar view"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     query = '''
-        SELECT entry_date, COUNT(*) as count, 
-               SUM(CASE WHEN is_highlight = 1 THEN 1 ELSE 0 END) as highlights
-        FROM journal_entries
+        SELECT entry_date, SUM(entry_count) as count, SUM(highlights) as highlights
+        FROM journal_daily_stats
     '''
     
     conditions = ['entry_date >= ?', 'entry_date <= ?']
@@ -1040,16 +1627,86 @@ def get_entries_by_date_range(start_date, end_date, job_id=None):
     conn.close()
     return result
 
+def get_journal_heatmap(start_date, end_date, job_id=None):
+    """Get per-day counts/hours/highlights as dense arrays for a heatmap.
+    
+    Index i of each array is the day start_date + i, through end_date inclusive.
+    """
+    start = datetime.strptime(start_date, '%Y-%m-%d').date()
+    end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    days = (end - start).days + 1
+    
+    counts = [0] * days
+    hours = [0] * days
+    highlights = [0] * days
+    
+    conn = _connect()
+    c = conn.cursor()
+    
+    query = '''
+        SELECT entry_date, SUM(entry_count), TOTAL(hours), SUM(highlights)
+        FROM journal_daily_stats
+        WHERE entry_date >= ? AND entry_date <= ?
+    '''
+    params = [start_date, end_date]
+    
+    if job_id:
+        query += ' AND job_id = ?'
+        params.append(job_id)
+    
+    query += ' GROUP BY entry_date'
+    c.execute(query, params)
+    
+    for row in c.fetchall():
+        i = (datetime.strptime(row[0], '%Y-%m-%d').date() - start).days
+        if 0 <= i < days:
+            counts[i] = row[1]
+            hours[i] = round(row[2], 1)
+            highlights[i] = row[3]
+    
+    conn.close()
+    
+    return {
+        'start': start.isoformat(),
+        'days': days,
+        'counts': counts,
+        'hours': hours,
+        'highlights': highlights,
+        'max_count': max(counts) if counts else 0
+    }
+
+def get_data_version(name):
+    """Get the current write counter for a data set (0 if never written)"""
+    return get_data_versions([name])[0]
+
+def check_database():
+    """Raise if the database can't be opened or init_db hasn't run"""
+    conn = _connect(timeout=2)
+    try:
+        conn.execute("SELECT version FROM data_versions WHERE name = 'epoch'").fetchone()
+    finally:
+        conn.close()
+
+def get_data_versions(names):
+    """Get write counters for several data sets in one query, in the order given"""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute(f'''
+        SELECT name, version FROM data_versions
+        WHERE name IN ({','.join('?' * len(names))})
+    ''', list(names))
+    versions = dict(c.fetchall())
+    conn.close()
+    return [versions.get(name, 0) for name in names]
+
 def get_all_tags():
     """Get all journal tags"""
-    conn = sqlite3.connect('resume.db')
+    conn = _connect()
     c = conn.cursor()
     
     c.execute('''
-        SELECT jt.id, jt.name, jt.color, COUNT(jet.entry_id) as usage_count
-        FROM journal_tags jt
-        LEFT JOIN journal_entry_tags jet ON jt.id = jet.tag_id
-        GROUP BY jt.id
+        SELECT id, name, color, usage_count
+        FROM journal_tags
         ORDER BY usage_count DESC
     ''')
     
@@ -1059,11 +1716,349 @@ def get_all_tags():
     conn.close()
     return tags
 
+# ============================================
+# Highlight Miner Functions
+# ============================================
+
+def get_unmined_highlights(job_id=None):
+    """Get highlight/accomplishment entries the miner hasn't processed, grouped by job"""
+    conn = _connect()
+    c = conn.cursor()
+    
+    query = '''
+        SELECT je.id, je.job_id, je.entry_date, je.title, je.content, je.hours_worked,
+               j.title as job_title, j.company, je.updated_at
+        FROM journal_entries je
+        JOIN jobs j ON je.job_id = j.id
+        WHERE je.mined_at IS NULL
+          AND (je.is_highlight = 1 OR je.category = 'accomplishment')
+    '''
+    params = []
+    
+    if job_id:
+        query += ' AND je.job_id = ?'
+        params.append(job_id)
+    
+    query += ' ORDER BY je.job_id, je.entry_date, je.id'
+    c.execute(query, params)
+    
+    highlights = {}
+    for row in c.fetchall():
+        highlights.setdefault(row[1], []).append({
+            'id': row[0],
+            'job_id': row[1],
+            'entry_date': row[2],
+            'title': row[3],
+            'content': row[4],
+            'hours_worked': row[5],
+            'job_title': row[6],
+            'company': row[7],
+            'updated_at': row[8]
+        })
+    
+    conn.close()
+    return highlights
+
+def get_job_point_texts(job_id):
+    """Get existing bullet texts and previously mined candidates for a job (for deduplication)"""
+    conn = _connect()
+    c = conn.cursor()
+    
+    c.execute('''
+        SELECT point FROM job_points WHERE job_id = ?
+        UNION ALL
+        SELECT text FROM point_candidates WHERE job_id = ?
+    ''', (job_id, job_id))
+    texts = [row[0] for row in c.fetchall()]
+    
+    conn.close()
+    return texts
+
+def store_point_candidates(job_id, candidates, mined_entries, source='local'):
+    """Queue candidate bullets and mark their source entries as mined in one transaction.
+    
+    mined_entries are the entry dicts as read by get_unmined_highlights; an
+    entry edited since then stays unmined so the next pass sees the new text.
+    Bullets already queued for the job are skipped.
+    """
+    conn = _connect()
+    c = conn.cursor()
+    
+    c.executemany('''
+        INSERT OR IGNORE INTO point_candidates (job_id, text, source_entry_ids, source)
+        VALUES (?, ?, ?, ?)
+    ''', [(job_id, candidate['text'],
+           ','.join(str(entry_id) for entry_id in candidate.get('entry_ids', [])),
+           source)
+          for candidate in candidates])
+    
+    # updated_at only has second resolution, so the text is compared too
+    c.executemany('''
+        UPDATE journal_entries SET mined_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND updated_at IS ? AND content = ? AND title IS ?
+    ''', [(entry['id'], entry['updated_at'], entry['content'], entry['title']) for entry in mined_entries])
+    
+    conn.commit()
+    conn.close()
+
+def get_point_candidates(job_id=None, status='pending'):
+    """Get mined bullet candidates awaiting review"""
+    conn = _connect()
+    c = conn.cursor()
+    
+    query = '''
+        SELECT pc.id, pc.job_id, pc.text, pc.source_entry_ids, pc.source, pc.status,
+               pc.created_at, j.title as job_title, j.company
+        FROM point_candidates pc
+        JOIN jobs j ON pc.job_id = j.id
+        WHERE pc.status = ?
+    '''
+    params = [status]
+    
+    if job_id:
+        query += ' AND pc.job_id = ?'
+        params.append(job_id)
+    
+    query += ' ORDER BY pc.created_at DESC, pc.id DESC'
+    c.execute(query, params)
+    
+    candidates = [{
+        'id': row[0],
+        'job_id': row[1],
+        'text': row[2],
+        'entry_ids': [int(eid) for eid in row[3].split(',')] if row[3] else [],
+        'source': row[4],
+        'status': row[5],
+        'created_at': row[6],
+        'job_title': row[7],
+        'company': row[8]
+    } for row in c.fetchall()]
+    
+    conn.close()
+    return candidates
+
+def accept_point_candidate(candidate_id):
+    """Turn a pending candidate into a job point. Returns the new point id, or None"""
+    conn = _connect()
+    c = conn.cursor()
+    
+    c.execute('''
+        SELECT job_id, text FROM point_candidates
+        WHERE id = ? AND status = 'pending'
+    ''', (candidate_id,))
+    row = c.fetchone()
+    if not row:
+        conn.close()
+        return None
+    
+    job_id, text = row
+    c.execute('SELECT COALESCE(MAX(order_num), 0) + 1 FROM job_points WHERE job_id = ?', (job_id,))
+    order_num = c.fetchone()[0]
+    
+    c.execute('''
+        INSERT INTO job_points (job_id, point, order_num)
+        VALUES (?, ?, ?)
+    ''', (job_id, text, order_num))
+    point_id = c.lastrowid
+    
+    c.execute('''
+        UPDATE point_candidates SET status = 'accepted', point_id = ?
+        WHERE id = ?
+    ''', (point_id, candidate_id))
+    
+    conn.commit()
+    conn.close()
+    return point_id
+
+def dismiss_point_candidate(candidate_id):
+    """Dismiss a pending candidate (kept so the miner doesn't suggest it again)"""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        UPDATE point_candidates SET status = 'dismissed'
+        WHERE id = ? AND status = 'pending'
+    ''', (candidate_id,))
+    conn.commit()
+    conn.close()
+
+# ============================================
+# Task Queue Functions
+# ============================================
+
+TASK_COLUMNS = '''id, kind, payload, status, result, error, attempts, max_attempts,
+                  cancel_requested, created_at, started_at, finished_at'''
+
+def _task_from_row(row):
+    return {
+        'id': row[0],
+        'kind': row[1],
+        'payload': json.loads(row[2]),
+        'status': row[3],
+        'result': json.loads(row[4]) if row[4] else None,
+        'error': row[5],
+        'attempts': row[6],
+        'max_attempts': row[7],
+        'cancel_requested': bool(row[8]),
+        'created_at': row[9],
+        'started_at': row[10],
+        'finished_at': row[11]
+    }
+
+def enqueue_task(kind, payload=None, max_attempts=3, unique=False):
+    """Queue a task for the background workers and return its id.
+    
+    With unique, nothing is queued (and None returned) while a task of the
+    same kind is queued or running, in any process.
+    """
+    params = [kind, json.dumps(payload or {}), max_attempts]
+    guard = ''
+    if unique:
+        guard = "WHERE NOT EXISTS (SELECT 1 FROM tasks WHERE kind = ? AND status IN ('queued', 'running'))"
+        params.append(kind)
+    
+    conn = _connect()
+    c = conn.cursor()
+    c.execute(f'''
+        INSERT INTO tasks (kind, payload, max_attempts)
+        SELECT ?, ?, ?
+        {guard}
+    ''', params)
+    task_id = c.lastrowid if c.rowcount else None
+    conn.commit()
+    conn.close()
+    return task_id
+
+def get_task(task_id):
+    conn = _connect()
+    c = conn.cursor()
+    c.execute(f'SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?', (task_id,))
+    row = c.fetchone()
+    conn.close()
+    return _task_from_row(row) if row else None
+
+def claim_next_task(lease_seconds):
+    """Atomically take the oldest runnable task, or return None.
+    
+    Runnable means queued and due, or running under an expired lease (its
+    worker died mid-task). Expired tasks that have used up their attempts
+    are failed instead of being picked up again.
+    """
+    conn = _connect(timeout=30)
+    c = conn.cursor()
+    c.execute('''
+        UPDATE tasks
+        SET status = 'failed', error = COALESCE(error, 'Worker stopped while running task'),
+            locked_until = NULL, finished_at = CURRENT_TIMESTAMP
+        WHERE status = 'running' AND locked_until < CURRENT_TIMESTAMP
+              AND (attempts >= max_attempts OR cancel_requested)
+    ''')
+    c.execute(f'''
+        UPDATE tasks
+        SET status = 'running', attempts = attempts + 1,
+            started_at = CURRENT_TIMESTAMP, locked_until = datetime('now', ?)
+        WHERE id = (
+            SELECT id FROM tasks
+            WHERE (status = 'queued' AND run_after <= CURRENT_TIMESTAMP)
+               OR (status = 'running' AND locked_until < CURRENT_TIMESTAMP)
+            ORDER BY id
+            LIMIT 1
+        )
+        RETURNING {TASK_COLUMNS}
+    ''', (f'+{int(lease_seconds)} seconds',))
+    row = c.fetchone()
+    conn.commit()
+    conn.close()
+    return _task_from_row(row) if row else None
+
+def complete_task(task_id, result):
+    """Store a task's result. A task cancelled while running ends as cancelled"""
+    conn = _connect(timeout=30)
+    c = conn.cursor()
+    c.execute('''
+        UPDATE tasks
+        SET status = CASE WHEN cancel_requested THEN 'cancelled' ELSE 'succeeded' END,
+            result = CASE WHEN cancel_requested THEN NULL ELSE ? END,
+            error = NULL, locked_until = NULL, finished_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND status = 'running'
+    ''', (json.dumps(result), task_id))
+    conn.commit()
+    conn.close()
+
+def fail_task(task_id, error, retry_delay_seconds, retry=True):
+    """Record a failed attempt, re-queueing after a delay while attempts remain"""
+    conn = _connect(timeout=30)
+    c = conn.cursor()
+    c.execute('''
+        UPDATE tasks
+        SET status = CASE
+                WHEN cancel_requested THEN 'cancelled'
+                WHEN ? AND attempts < max_attempts THEN 'queued'
+                ELSE 'failed'
+            END,
+            error = ?,
+            run_after = datetime('now', ?),
+            locked_until = NULL,
+            finished_at = CASE
+                WHEN ? AND attempts < max_attempts AND NOT cancel_requested THEN NULL
+                ELSE CURRENT_TIMESTAMP
+            END
+        WHERE id = ? AND status = 'running'
+    ''', (retry, error, f'+{int(retry_delay_seconds)} seconds', retry, task_id))
+    conn.commit()
+    conn.close()
+
+def cancel_task(task_id):
+    """Cancel a task. Queued tasks stop immediately; running ones are flagged
+    and end as cancelled when their handler returns. Returns the new status,
+    or None if the task doesn't exist."""
+    conn = _connect(timeout=30)
+    c = conn.cursor()
+    c.execute('''
+        UPDATE tasks
+        SET cancel_requested = 1,
+            status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END,
+            finished_at = CASE WHEN status = 'queued' THEN CURRENT_TIMESTAMP ELSE finished_at END
+        WHERE id = ?
+        RETURNING status
+    ''', (task_id,))
+    row = c.fetchone()
+    conn.commit()
+    conn.close()
+    return row[0] if row else None
+
+def is_task_cancelled(task_id):
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('SELECT cancel_requested FROM tasks WHERE id = ?', (task_id,))
+    row = c.fetchone()
+    conn.close()
+    return bool(row and row[0])
+
+def delete_finished_tasks(older_than_seconds):
+    """Delete finished tasks older than the cutoff, returning their results"""
+    conn = _connect(timeout=30)
+    c = conn.cursor()
+    c.execute('''
+        DELETE FROM tasks
+        WHERE status IN ('succeeded', 'failed', 'cancelled')
+              AND finished_at <= datetime('now', ?)
+        RETURNING result
+    ''', (f'-{int(older_than_seconds)} seconds',))
+    results = [json.loads(row[0]) for row in c.fetchall() if row[0]]
+    conn.commit()
+    conn.close()
+    return results
+
 # Add this function to help with initialization
 def initialize_database():
     """Initialize all database tables"""
     init_db()
     print("Database initialized successfully!")
 
+# Time every public function and its queries (see instrumentation.py)
+for _name, _function in list(globals().items()):
+    if inspect.isfunction(_function) and _function.__module__ == __name__ and not _name.startswith('_'):
+        globals()[_name] = traced('db')(_function)
+
 if __name__ == "__main__":
     initialize_database()
\ No newline at end of file
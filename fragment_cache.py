@@ -0,0 +1,35 @@
+import threading
+from collections import OrderedDict
+
+# Upper bound on cached fragments (keys include request parameters)
+MAX_FRAGMENTS = 64
+
+_fragments = OrderedDict()
+_lock = threading.Lock()
+
+def get_or_render(key, version, render):
+    """Return the HTML cached under key if it was rendered at this data version.
+    
+    Otherwise call render(), cache the result and return it. A newer version
+    replaces the stale entry, so invalidation is just bumping the version.
+    """
+    with _lock:
+        cached = _fragments.get(key)
+        if cached and cached[0] == version:
+            _fragments.move_to_end(key)
+            return cached[1]
+    
+    html = render()
+    
+    with _lock:
+        _fragments[key] = (version, html)
+        _fragments.move_to_end(key)
+        while len(_fragments) > MAX_FRAGMENTS:
+            _fragments.popitem(last=False)
+    
+    return html
+
+def clear():
+    """Drop every cached fragment"""
+    with _lock:
+        _fragments.clear()
@@ -0,0 +1,25 @@
+import multiprocessing
+import os
+
+# gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Every setting can be overridden from the environment, e.g.
+#   WEB_CONCURRENCY=4 WEB_THREADS=8 gunicorn -c gunicorn.conf.py wsgi:app
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+
+# Processes sidestep the GIL for template rendering and JSON; threads cover
+# requests that wait on SQLite, the AI APIs or pdflatex
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('WEB_THREADS', 4))
+
+# Import the app (and run init_db) once in the master, then fork
+preload_app = True
+
+# Synchronous PDF downloads can run pdflatex inside the request
+timeout = int(os.environ.get('WEB_TIMEOUT', 120))
+
+# On SIGTERM, let in-flight requests finish before workers exit
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+
+accesslog = os.environ.get('ACCESS_LOG', '-') or None
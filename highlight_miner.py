@@ -0,0 +1,101 @@
+import re
+import task_runner
+from ai_service import AIService, AIModel
+from database import get_unmined_highlights, get_job_point_texts, store_point_candidates
+from structured_logging import get_logger
+
+logger = get_logger('highlights')
+
+# Entries sent to the summarizer per call
+BATCH_SIZE = 20
+
+# Token overlap (Jaccard) above which a candidate counts as a duplicate bullet
+SIMILARITY_THRESHOLD = 0.8
+
+MAX_BULLET_LENGTH = 200
+
+def normalize_point(text):
+    """Lowercase and strip punctuation so near-identical bullets compare equal"""
+    return ' '.join(re.sub(r'[^a-z0-9%$]+', ' ', text.lower()).split())
+
+def is_duplicate(text, existing_token_sets):
+    tokens = set(normalize_point(text).split())
+    if not tokens:
+        return True
+    for existing in existing_token_sets:
+        if tokens == existing:
+            return True
+        if len(tokens & existing) / len(tokens | existing) >= SIMILARITY_THRESHOLD:
+            return True
+    return False
+
+def summarize_locally(entries):
+    """Deterministic offline summarizer: one bullet per entry from its first sentence"""
+    bullets = []
+    for entry in entries:
+        sentence = re.split(r'(?<=[.!?])\s+', entry['content'].strip(), maxsplit=1)[0]
+        text = ' '.join(sentence.split()).rstrip('.!? ')
+        if len(text) < 15 and entry['title']:
+            text = f"{entry['title'].strip().rstrip('.')}: {text}" if text else entry['title'].strip()
+        if len(text) > MAX_BULLET_LENGTH:
+            text = text[:MAX_BULLET_LENGTH].rsplit(' ', 1)[0]
+        if text:
+            bullets.append({'text': text[0].upper() + text[1:], 'entry_ids': [entry['id']]})
+    return bullets
+
+def summarize_with_ai(job, entries, model_type):
+    ai_service = AIService(AIModel.DEEPSEEK if model_type == 'deepseek' else AIModel.OPENAI, priority='batch')
+    return ai_service.summarize_highlights(job, entries)
+
+def mine_highlights(model_type=None, job_id=None):
+    """Run one incremental mining pass over unprocessed highlight entries.
+    
+    model_type selects the AI provider ('openai' or 'deepseek'); None uses the
+    local summarizer. Entries are only marked as mined once their batch has
+    been summarized, so a failed AI call is retried on the next run.
+    Returns {'entries': n, 'candidates': n}.
+    """
+    mined_entries = 0
+    queued = 0
+    source = model_type or 'local'
+    
+    for highlight_job_id, entries in get_unmined_highlights(job_id).items():
+        job = {'title': entries[0]['job_title'], 'company': entries[0]['company']}
+        existing = [set(normalize_point(text).split()) for text in get_job_point_texts(highlight_job_id)]
+        
+        for start in range(0, len(entries), BATCH_SIZE):
+            batch = entries[start:start + BATCH_SIZE]
+            
+            if model_type:
+                success, bullets = summarize_with_ai(job, batch, model_type)
+                if not success:
+                    logger.warning("Highlight mining failed",
+                                   extra={'job_id': highlight_job_id, 'error': bullets})
+                    break
+            else:
+                bullets = summarize_locally(batch)
+            
+            fresh = []
+            for bullet in bullets:
+                if is_duplicate(bullet['text'], existing):
+                    continue
+                existing.append(set(normalize_point(bullet['text']).split()))
+                fresh.append(bullet)
+            
+            store_point_candidates(highlight_job_id, fresh, batch, source)
+            mined_entries += len(batch)
+            queued += len(fresh)
+    
+    return {'entries': mined_entries, 'candidates': queued}
+
+@task_runner.register('mine_highlights')
+def mine_highlights_task(task):
+    payload = task['payload']
+    return mine_highlights(payload.get('model_type'), payload.get('job_id'))
+
+def start_mining(model_type=None, job_id=None):
+    """Queue a mining pass as a background task. Returns its id, or None if
+    a pass is already queued or running (in any worker process)"""
+    # Failed batches are left unmined for the next pass, so no retries
+    return task_runner.submit('mine_highlights', {'model_type': model_type, 'job_id': job_id},
+                              max_attempts=1, unique=True)
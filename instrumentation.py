@@ -0,0 +1,312 @@
+import cProfile
+import functools
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+# Histogram bucket upper bounds in seconds (Prometheus style, +Inf implied)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Longest SQL text kept per query in request spans
+MAX_SQL_LENGTH = 500
+
+_lock = threading.Lock()
+_counters = defaultdict(float)        # (metric, labels) -> value
+_histograms = {}                      # (metric, labels) -> [bucket counts..., sum, count]
+_gauges = {}                          # (metric, labels) -> value
+_help = {}
+
+# Per-thread state: the current request's spans (None outside requests)
+# and the stack of open spans that queries attach to
+_local = threading.local()
+
+# ============================================
+# Metrics
+# ============================================
+
+def describe(metric, text):
+    _help[metric] = text
+
+def inc(metric, amount=1, **labels):
+    key = (metric, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] += amount
+
+def set_gauge(metric, value, **labels):
+    key = (metric, tuple(sorted(labels.items())))
+    with _lock:
+        _gauges[key] = value
+
+def observe(metric, seconds, **labels):
+    key = (metric, tuple(sorted(labels.items())))
+    with _lock:
+        values = _histograms.get(key)
+        if values is None:
+            values = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                values[i] += 1
+        values[-2] += seconds
+        values[-1] += 1
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def render_metrics():
+    """Current metrics in the Prometheus text exposition format"""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, list(values)) for key, values in _histograms.items())
+        gauges = sorted(_gauges.items())
+
+    lines = []
+    seen = set()
+    for (metric, labels), value in counters:
+        if metric not in seen:
+            seen.add(metric)
+            if metric in _help:
+                lines.append(f'# HELP {metric} {_help[metric]}')
+            lines.append(f'# TYPE {metric} counter')
+        lines.append(f'{metric}{_format_labels(labels)} {value:g}')
+
+    for (metric, labels), value in gauges:
+        if metric not in seen:
+            seen.add(metric)
+            if metric in _help:
+                lines.append(f'# HELP {metric} {_help[metric]}')
+            lines.append(f'# TYPE {metric} gauge')
+        lines.append(f'{metric}{_format_labels(labels)} {value:g}')
+
+    for (metric, labels), values in histograms:
+        if metric not in seen:
+            seen.add(metric)
+            if metric in _help:
+                lines.append(f'# HELP {metric} {_help[metric]}')
+            lines.append(f'# TYPE {metric} histogram')
+        for bound, count in zip(BUCKETS, values):
+            lines.append(f'{metric}_bucket{_format_labels(labels, [("le", f"{bound:g}")])} {count}')
+        lines.append(f'{metric}_bucket{_format_labels(labels, [("le", "+Inf")])} {values[-1]}')
+        lines.append(f'{metric}_sum{_format_labels(labels)} {values[-2]:.6f}')
+        lines.append(f'{metric}_count{_format_labels(labels)} {values[-1]}')
+    return '\n'.join(lines) + '\n'
+
+describe('resume_http_request_seconds', 'Time spent handling HTTP requests')
+describe('resume_db_call_seconds', 'Time spent in database.py functions, including row fetching')
+describe('resume_db_queries_total', 'SQL statements executed by database.py functions')
+describe('resume_db_rows_total', 'Rows fetched or changed by database.py functions')
+describe('resume_pdflatex_seconds', 'pdflatex compile time')
+describe('resume_ai_request_seconds', 'AI completion latency')
+describe('resume_ai_tokens_total', 'Tokens used by AI completions')
+describe('resume_ai_parse_total', 'AI replies parsed, by outcome: ok, repaired or failed')
+
+# ============================================
+# Request spans
+# ============================================
+
+def start_request():
+    """Begin collecting spans for the request handled by this thread"""
+    _local.spans = []
+    _local.stack = []
+
+def finish_request():
+    """Stop collecting and return this request's spans"""
+    spans = getattr(_local, 'spans', None) or []
+    _local.spans = None
+    _local.stack = []
+    return spans
+
+def _open_span(kind, name):
+    span = {'kind': kind, 'name': name, 'seconds': 0.0, 'queries': []}
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(span)
+    return span
+
+def _close_span(span, seconds):
+    span['seconds'] = seconds
+    _local.stack.pop()
+    if _local.stack:
+        _local.stack[-1].setdefault('children', []).append(span)
+    elif getattr(_local, 'spans', None) is not None:
+        _local.spans.append(span)
+
+def traced(kind, metric=None):
+    """Decorator timing each call as a span and a histogram observation.
+
+    kind 'db' also counts the queries and rows of the call (see
+    TracedConnection); other kinds observe metric (default
+    resume_<kind>_seconds) labelled with the function name.
+    """
+    def decorator(fn):
+        name = fn.__name__
+        histogram = metric or f'resume_{kind}_seconds'
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            span = _open_span(kind, name)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                _close_span(span, elapsed)
+                if kind == 'db':
+                    observe('resume_db_call_seconds', elapsed, function=name)
+                    if span['queries']:
+                        inc('resume_db_queries_total', len(span['queries']), function=name)
+                        inc('resume_db_rows_total', sum(q['rows'] for q in span['queries']), function=name)
+                else:
+                    observe(histogram, elapsed, function=name)
+        return wrapper
+    return decorator
+
+def record_span(kind, name, seconds, **detail):
+    """Attach an already-timed operation (e.g. an AI call) to the current request"""
+    stack = getattr(_local, 'stack', None)
+    span = {'kind': kind, 'name': name, 'seconds': seconds, **detail}
+    if stack:
+        stack[-1].setdefault('children', []).append(span)
+    elif getattr(_local, 'spans', None) is not None:
+        _local.spans.append(span)
+
+def server_timing(spans):
+    """Server-Timing header value summing span time per kind"""
+    totals = defaultdict(float)
+    for span in spans:
+        totals[span['kind']] += span['seconds']
+    return ', '.join(f'{kind};dur={seconds * 1000:.1f}' for kind, seconds in totals.items())
+
+# ============================================
+# SQLite query tracing
+# ============================================
+
+def _compact_sql(sql):
+    sql = re.sub(r'\s+', ' ', sql).strip()
+    return sql if len(sql) <= MAX_SQL_LENGTH else sql[:MAX_SQL_LENGTH] + '...'
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor recording each statement's text, time and row count on the open span.
+
+    Time covers both execution and fetching, since SQLite produces rows
+    lazily as they are fetched.
+    """
+
+    def _record(self, sql, start, rows):
+        self._query = None
+        stack = getattr(_local, 'stack', None)
+        if stack:
+            self._query = {'sql': _compact_sql(sql), 'seconds': time.perf_counter() - start, 'rows': rows}
+            stack[-1]['queries'].append(self._query)
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._record(sql, start, max(self.rowcount, 0))
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._record(sql, start, max(self.rowcount, 0))
+        return self
+
+    def _fetched(self, start, rows):
+        query = getattr(self, '_query', None)
+        if query is not None:
+            query['seconds'] += time.perf_counter() - start
+            query['rows'] += rows
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+class TracedConnection(sqlite3.Connection):
+    """sqlite3.connect factory whose cursors are TracedCursors"""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+# ============================================
+# Per-request cProfile
+# ============================================
+
+class RequestProfiler:
+    """WSGI middleware profiling requests sent with an X-Profile: 1 header.
+
+    The cProfile stats are written to profile_dir as
+    <method>.<path>.<ms>ms.<time>.prof (open with snakeviz or pstats), next
+    to a .spans.json with the request's database, pdflatex and AI spans
+    (including query text and row counts). The file name is returned in an
+    X-Profile-File response header. The response is buffered while profiling.
+    """
+
+    def __init__(self, app, profile_dir):
+        self.app = app
+        self.profile_dir = profile_dir
+
+    def __call__(self, environ, start_response):
+        if environ.get('HTTP_X_PROFILE') != '1':
+            return self.app(environ, start_response)
+
+        captured = []
+        body = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            return body.append
+
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            app_iter = self.app(environ, capture)
+            try:
+                body.extend(app_iter)
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+        finally:
+            profile.disable()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path_part = environ.get('PATH_INFO', '/').strip('/').replace('/', '.') or 'root'
+        filename = f"{environ['REQUEST_METHOD']}.{path_part}.{elapsed_ms:.0f}ms.{time.time():.0f}.prof"
+        profile.dump_stats(os.path.join(self.profile_dir, filename))
+        with open(os.path.join(self.profile_dir, filename[:-len('.prof')] + '.spans.json'), 'w') as f:
+            json.dump(environ.get('resume.spans', []), f, indent=2)
+
+        status, headers, exc_info = captured
+        start_response(status, [*headers, ('X-Profile-File', filename)], exc_info)
+        return body
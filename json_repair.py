@@ -0,0 +1,128 @@
+import ast
+import json
+import re
+
+# Models asked for JSON still wrap it in prose or ```json fences, copy the
+# // comments from the example in the prompt, leave trailing commas, and
+# stop mid-object when they hit max_tokens. loads_lenient() takes the fast
+# path (json.loads) when the reply is clean and otherwise repairs it in a
+# single pass over the text.
+
+_FENCE = re.compile(r'```(?:json)?\s*(.*?)(?:```|$)', re.DOTALL)
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+class JSONRepairError(ValueError):
+    pass
+
+def loads_lenient(text, expect=dict):
+    """Parse the first JSON object (or array, with expect=list) in text.
+
+    expect may also be a tuple of the two. Returns (value, repaired),
+    repaired being True when the text needed more than json.loads. Raises
+    JSONRepairError if nothing usable is found.
+    """
+    kinds = expect if isinstance(expect, tuple) else (expect,)
+    expected = ' or '.join('object' if kind is dict else 'array' for kind in kinds)
+    if not isinstance(text, str):
+        raise JSONRepairError('Response is not text')
+
+    stripped = text.strip()
+    fence = _FENCE.search(stripped)
+    if fence:
+        stripped = fence.group(1).strip()
+
+    try:
+        value = json.loads(stripped)
+        if isinstance(value, expect):
+            return value, False
+    except ValueError:
+        pass
+
+    starts = [stripped.find('{' if kind is dict else '[') for kind in kinds]
+    starts = [start for start in starts if start != -1]
+    if not starts:
+        raise JSONRepairError(f'No JSON {expected} in response')
+    start = min(starts)
+
+    candidate = _repair(stripped, start)
+    try:
+        value = json.loads(candidate)
+    except ValueError:
+        # Single quotes, True/None: the model echoed the Python repr of the prompt data
+        try:
+            value = ast.literal_eval(candidate)
+        except (ValueError, SyntaxError) as e:
+            raise JSONRepairError(f'Unparseable JSON in response: {e}') from None
+    if not isinstance(value, expect):
+        raise JSONRepairError(f'Expected a JSON {expected}, got {type(value).__name__}')
+    return value, True
+
+def _strip_trailing_comma(out):
+    while out and out[-1] in ' \t\r\n':
+        out.pop()
+    if out and out[-1] == ',':
+        out.pop()
+
+def _repair(text, start):
+    """The balanced value starting at text[start], with comments and trailing
+    commas removed and, if the text ends early, cut back to the last complete
+    member and closed"""
+    out = []
+    stack = []
+    # Output length and open containers after the last complete member
+    safe = (0, [])
+    quote = None
+    i, n = start, len(text)
+    while i < n:
+        ch = text[i]
+        if quote:
+            out.append(ch)
+            if ch == '\\' and i + 1 < n:
+                out.append(text[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+            continue
+
+        if ch == '/' and text.startswith('//', i):
+            end = text.find('\n', i)
+            i = n if end == -1 else end
+            continue
+        if ch == '/' and text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+
+        if ch in '"\'':
+            quote = ch
+            out.append(ch)
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+            out.append(ch)
+            safe = (len(out), list(stack))
+        elif ch in '}]':
+            if not stack or stack[-1] != ch:
+                break  # Stray closer: keep what balanced so far
+            _strip_trailing_comma(out)
+            out.append(stack.pop())
+            if not stack:
+                return ''.join(out)
+            safe = (len(out), list(stack))
+        elif ch == ',':
+            safe = (len(out), list(stack))
+            out.append(ch)
+        else:
+            out.append(ch)
+        i += 1
+
+    # Ran out of text (or hit a stray closer) with containers still open
+    length, open_stack = safe
+    out = out[:length]
+    _strip_trailing_comma(out)
+    if out and out[-1] == ':':
+        out.pop()
+    out.extend(reversed(open_stack))
+    return ''.join(out)
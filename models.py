@@ -0,0 +1,204 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+
+# Row models for the queries that return whole tables (get_all_jobs,
+# get_ai_ordered_jobs, get_journal_entries, get_application_summaries):
+# one slotted object per row, built straight from the cursor tuple, with
+# derived fields computed on first use. Single-application lookups
+# (get_application, get_jobs_for_application) still return plain dicts;
+# they read a few rows, nest application-specific points under each job
+# and feed pdf_service.build_experience, which takes dicts.
+
+# Number of bullets per job used on the generated resume
+RESUME_POINTS_PER_JOB = 3
+
+# Resumes reuse a small set of month ranges, so strptime only runs once per range
+@lru_cache(maxsize=1024)
+def format_dates(start_date, end_date, current):
+    start = datetime.strptime(start_date, '%Y-%m').strftime('%b %Y')
+    if current:
+        return f'{start} – Present'
+    elif end_date:
+        end = datetime.strptime(end_date, '%Y-%m').strftime('%b %Y')
+        return f'{start} – {end}'
+    return start
+
+# Job rows GROUP_CONCAT their points as id, text, id, text, ... joined by the
+# ASCII unit separator, which can't occur in typed text, so parsing is one split
+POINT_SEPARATOR = '\x1f'
+
+def _parse_points(concatenated):
+    """Split the GROUP_CONCAT'd points into parallel (ids, texts) tuples, dropping repeats"""
+    if not concatenated:
+        return (), ()
+    
+    fields = concatenated.split(POINT_SEPARATOR)
+    point_ids, texts = tuple(fields[0::2]), tuple(fields[1::2])
+    if len(set(point_ids)) < len(point_ids):
+        # Only joins against per-point tables repeat points; keep the first of each
+        first = {}
+        for point_id, text in zip(point_ids, texts):
+            first.setdefault(point_id, text)
+        point_ids, texts = tuple(first), tuple(first.values())
+    return point_ids, texts
+
+@dataclass(slots=True)
+class Job:
+    id: int
+    title: str
+    company: str
+    location: str
+    start_date: str
+    end_date: str
+    current: bool
+    display_order: int
+    display_dates: str  # stored at write time; None until backfilled
+    points_concat: str  # GROUP_CONCAT'd points (see POINT_SEPARATOR), parsed on first access
+    _parsed: tuple = field(default=None, init=False, repr=False, compare=False)
+    
+    @classmethod
+    def from_row(cls, cursor, row):
+        """sqlite3 row_factory for (job columns..., GROUP_CONCAT'd points) rows"""
+        return cls(*row)
+    
+    # Derived fields are computed on access rather than stored per row
+    @property
+    def dates(self):
+        return self.display_dates or format_dates(self.start_date, self.end_date, self.current)
+    
+    def _point_lists(self):
+        # Parsed once per object. Tuples rather than lists: the garbage
+        # collector stops tracking tuples of strings, so holding thousands
+        # of parsed jobs doesn't make every collection walk them
+        if self._parsed is None:
+            self._parsed = _parse_points(self.points_concat)
+        return self._parsed
+    
+    @property
+    def point_items(self):
+        """[(point_id, text), ...] in display order"""
+        return list(zip(*self._point_lists()))
+    
+    @property
+    def points(self):
+        return self._point_lists()[1]
+    
+    @property
+    def point_ids(self):
+        return self._point_lists()[0]
+    
+    @property
+    def resume_points(self):
+        return self.points[:RESUME_POINTS_PER_JOB]
+    
+    def to_dict(self):
+        point_ids, points = self._point_lists()
+        return {
+            'id': self.id,
+            'title': self.title,
+            'company': self.company,
+            'location': self.location,
+            'dates': self.dates,
+            'points': points,
+            'point_ids': point_ids,
+            'display_order': self.display_order,
+            'resume_points': points[:RESUME_POINTS_PER_JOB]
+        }
+
+@dataclass(frozen=True, slots=True)
+class ResumeJob:
+    """One Experience entry as printed on a resume PDF (hashable, so its
+    rendered LaTeX can be cached)"""
+    title: str
+    company: str
+    location: str
+    dates: str
+    points: tuple
+    
+    def to_dict(self):
+        return {
+            'title': self.title,
+            'company': self.company,
+            'location': self.location,
+            'dates': self.dates,
+            'points': list(self.points)
+        }
+
+@dataclass(frozen=True, slots=True)
+class ResumeEntry:
+    """An entry of a resume section other than Experience (see
+    resume_sections): heading in bold, then detail, aside in the right
+    column, and its bullets. All values are LaTeX."""
+    name: str
+    detail: str
+    aside: str
+    points: tuple
+
+@dataclass(slots=True)
+class JournalEntry:
+    id: int
+    job_id: int
+    entry_date: str
+    title: str
+    content: str
+    hours_worked: float
+    category: str
+    mood: str
+    highlight_flag: int
+    created_at: str
+    job_title: str
+    company: str
+    tags_csv: str
+    
+    @classmethod
+    def from_row(cls, cursor, row):
+        return cls(*row)
+    
+    @property
+    def is_highlight(self):
+        return bool(self.highlight_flag)
+    
+    @property
+    def tags(self):
+        return self.tags_csv.split(',') if self.tags_csv else []
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_id': self.job_id,
+            'entry_date': self.entry_date,
+            'title': self.title,
+            'content': self.content,
+            'hours_worked': self.hours_worked,
+            'category': self.category,
+            'mood': self.mood,
+            'is_highlight': bool(self.highlight_flag),
+            'created_at': self.created_at,
+            'job_title': self.job_title,
+            'company': self.company,
+            'tags': self.tags_csv.split(',') if self.tags_csv else []
+        }
+
+@dataclass(slots=True)
+class ApplicationSummary:
+    id: int
+    company: str
+    title: str
+    date: str
+    status: str
+    job_count: int
+    
+    @classmethod
+    def from_row(cls, cursor, row):
+        return cls(*row)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'company': self.company,
+            'title': self.title,
+            'date': self.date,
+            'status': self.status,
+            'job_count': self.job_count
+        }
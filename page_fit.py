@@ -0,0 +1,211 @@
+import re
+from ai_service import rank_score
+from resume_sections import EDUCATION, PROJECTS, TECHNOLOGIES
+
+# Chooses which bullets go on the resume so it fills one page, without
+# running pdflatex to find out. Each bullet's height is predicted by word
+# wrapping it with Charter's character widths at the template's column
+# width, and a knapsack over those heights picks the bullets with the most
+# relevance that fit in the space the rest of the template leaves.
+#
+# All lengths are in TeX points; the numbers mirror resume_template.tex
+# (10pt article, letterpaper, 2 cm margins, \usepackage{charter}).
+
+# Advance widths of Bitstream Charter Roman in 1/1000 em (from its AFM,
+# rounded); characters not listed use DEFAULT_WIDTH
+CHARTER_WIDTHS = {
+    ' ': 278, '!': 338, '"': 331, '#': 745, '$': 556, '%': 852, '&': 704, "'": 278,
+    '(': 389, ')': 389, '*': 500, '+': 606, ',': 278, '-': 389, '.': 278, '/': 278,
+    ':': 278, ';': 278, '<': 606, '=': 606, '>': 606, '?': 481, '@': 947,
+    '[': 389, '\\': 278, ']': 389, '^': 606, '_': 500, '`': 278, '{': 389, '|': 278,
+    '}': 389, '~': 606, '–': 500, '—': 1000, '’': 278, '‘': 278, '“': 463, '”': 463,
+    'A': 662, 'B': 625, 'C': 648, 'D': 720, 'E': 593, 'F': 552, 'G': 711, 'H': 758,
+    'I': 343, 'J': 343, 'K': 657, 'L': 556, 'M': 873, 'N': 737, 'O': 752, 'P': 605,
+    'Q': 752, 'R': 648, 'S': 556, 'T': 590, 'U': 718, 'V': 640, 'W': 936, 'X': 644,
+    'Y': 597, 'Z': 579,
+    'a': 500, 'b': 554, 'c': 457, 'd': 568, 'e': 477, 'f': 323, 'g': 510, 'h': 583,
+    'i': 298, 'j': 286, 'k': 540, 'l': 290, 'm': 880, 'n': 590, 'o': 537, 'p': 566,
+    'q': 550, 'r': 411, 's': 413, 't': 346, 'u': 586, 'v': 500, 'w': 760, 'x': 509,
+    'y': 496, 'z': 455,
+    **dict.fromkeys('0123456789', 556),
+}
+DEFAULT_WIDTH = 556
+
+# Charter Bold runs about this much wider than the Roman
+BOLD_FACTOR = 1.07
+
+FONT_SIZE = 10
+BASELINE = 12                       # \baselineskip at 10pt
+CM = 28.4528
+
+TEXT_WIDTH = 8.5 * 72.27 - 4 * CM   # letterpaper minus 2 cm margins
+TEXT_HEIGHT = 11 * 72.27 - 4 * CM
+BULLET_WIDTH = TEXT_WIDTH - 20      # highlights: leftmargin=20pt
+HEADING_WIDTH = TEXT_WIDTH - 4.5 * CM - 0.15 * CM   # twocolentry: dates column and columnsep
+
+LIST_SKIP = 0.10 * CM               # highlights topsep (above and below) and parsep
+ENTRY_SKIP = 0.10 * CM              # \vspace between an entry's heading and its bullets
+JOB_SKIP = 0.2 * CM                 # \vspace between jobs
+
+# Everything outside Experience besides the entries of resume_sections:
+# header and the four section titles (titlespacing 0.3 cm + 0.2 cm around
+# a \large line)
+SECTION_HEIGHT = 0.3 * CM + 14 + 1 + 0.4 + 0.2 * CM
+HEADER_HEIGHT = 19 + 5 + 18 + 5 - 0.3 * CM
+
+# Predictions are greedy word wrap without hyphenation or glue shrink,
+# which only ever overestimates; keep one more line free for what the
+# model leaves out (e.g. paracol's own spacing)
+SAFETY_MARGIN = BASELINE
+
+# Heights are rounded up to this many points for the knapsack
+UNIT = 1.0
+
+_COMMAND = re.compile(r'\\[a-zA-Z]+\*?|[{}]')
+
+def text_width(text, bold=False):
+    """Width in points of text set in Charter at FONT_SIZE"""
+    width = sum(CHARTER_WIDTHS.get(ch, DEFAULT_WIDTH) for ch in text) * FONT_SIZE / 1000
+    return width * BOLD_FACTOR if bold else width
+
+def line_count(text, width, bold_prefix=''):
+    """Lines text takes when wrapped at width (raggedright, so no
+    hyphenation); the first len(bold_prefix) characters are set in bold"""
+    text = _COMMAND.sub('', text)
+    space = text_width(' ')
+    lines, used, position = 1, 0.0, 0
+    for word in text.split():
+        start = text.index(word, position)
+        position = start + len(word)
+        bold = word[:max(0, len(bold_prefix) - start)]
+        word_width = text_width(bold, bold=True) + text_width(word[len(bold):])
+        if used and used + space + word_width > width:
+            lines += 1
+            used = word_width
+        else:
+            used += (space if used else 0) + word_width
+    return lines
+
+def bullet_height(text):
+    return line_count(text, BULLET_WIDTH) * BASELINE
+
+def heading_height(title, company, location):
+    return line_count(f'{title}, {company} -- {location}', HEADING_WIDTH, bold_prefix=title) * BASELINE
+
+def entry_height(heading_height, bullet_heights):
+    """An entry: heading, then its bullets as a highlights list"""
+    if not bullet_heights:
+        return heading_height
+    return (heading_height + ENTRY_SKIP + 2 * LIST_SKIP
+            + sum(bullet_heights) + (len(bullet_heights) - 1) * LIST_SKIP)
+
+def static_height():
+    """Height of the template outside the Experience entries (the sections
+    in resume_sections)"""
+    sections = (EDUCATION, PROJECTS)
+    entries = sum(entry_height(line_count(entry.name + entry.detail, HEADING_WIDTH, entry.name) * BASELINE,
+                               [bullet_height(point) for point in entry.points])
+                  for section in sections for entry in section)
+    gaps = sum(len(section) - 1 for section in sections) + len(TECHNOLOGIES) - 1
+    technologies = sum(line_count(f'{label} {text}', TEXT_WIDTH, bold_prefix=label)
+                       for label, text in TECHNOLOGIES) * BASELINE
+    return HEADER_HEIGHT + 4 * SECTION_HEIGHT + entries + gaps * JOB_SKIP + technologies
+
+def experience_budget():
+    """Points left for the Experience entries on one page"""
+    return TEXT_HEIGHT - static_height() - SAFETY_MARGIN
+
+def _units(height):
+    return int(-(-height // UNIT))
+
+def fit_page(jobs, budget=None, max_jobs=None, max_points=None):
+    """Choose bullets for one page.
+
+    jobs is [(title, company, location, [(text, score), ...])] in resume
+    order. Returns, per job, the indexes of the chosen bullets in their
+    original order (empty for jobs left off). Maximizes the total score of
+    the chosen bullets from at most max_jobs jobs (the first ones) and the
+    first max_points bullets of each. A job whose bullets have no scores
+    keeps its own order: it gets a prefix of them, each counted by rank; a
+    None among scored bullets counts by rank too. Jobs that don't earn
+    their heading's space are left off rather than overflowing the page.
+    """
+    budget = experience_budget() if budget is None else budget
+    capacity = max(0, int(budget // UNIT))
+    candidates = jobs if max_jobs is None else jobs[:max_jobs]
+
+    # best[c]: most score in at most c units from the jobs so far. A job
+    # costs its heading (with the space around its list, and the gap after
+    # the previous job) once and then its bullets; some[c] is the best with
+    # at least one of its bullets.
+    NONE = float('-inf')
+    best = [0.0] * (capacity + 1)
+    decisions = []
+    for index, (title, company, location, points) in enumerate(candidates):
+        points = points if max_points is None else points[:max_points]
+        opening = _units(heading_height(title, company, location) + ENTRY_SKIP + LIST_SKIP
+                         + (JOB_SKIP if index else 0))
+        opened = [best[c - opening] if c >= opening else NONE for c in range(capacity + 1)]
+        some = [NONE] * (capacity + 1)
+        # The first bullet of a job carries the list's closing skip, the others a parsep
+        weights = [_units(bullet_height(text) + LIST_SKIP) for text, _ in points]
+        if all(score is None for _, score in points):
+            # One choice per prefix length, so a bullet is never dropped
+            # in favour of shorter ones ranked below it
+            lengths = bytearray(capacity + 1) if len(points) < 256 else [0] * (capacity + 1)
+            weight = value = 0
+            for n in range(len(points)):
+                weight += weights[n]
+                value += rank_score(n + 1, len(points))
+                for c in range(weight, capacity + 1):
+                    if opened[c - weight] + value > some[c]:
+                        some[c] = opened[c - weight] + value
+                        lengths[c] = n + 1
+            walk = (weights, lengths)
+        else:
+            # Each bullet is a 0/1 item; took[c]: 1 added to earlier
+            # bullets, 2 the job's first bullet
+            taken = []
+            for n, (text, score) in enumerate(points):
+                value = rank_score(n + 1, len(points)) if score is None else score
+                weight = weights[n]
+                took = bytearray(capacity + 1)
+                for c in range(capacity, weight - 1, -1):
+                    if some[c - weight] >= opened[c - weight]:
+                        candidate, source = some[c - weight] + value, 1
+                    else:
+                        candidate, source = opened[c - weight] + value, 2
+                    if candidate > some[c]:
+                        some[c] = candidate
+                        took[c] = source
+                taken.append((weight, took))
+            walk = (taken, None)
+        use = bytearray(capacity + 1)
+        for c in range(capacity + 1):
+            if some[c] > best[c]:
+                best[c] = some[c]
+                use[c] = 1
+        decisions.append((opening, walk, use))
+
+    # Walk the decisions back from the full budget
+    chosen = [[] for _ in jobs]
+    c = capacity
+    for index in range(len(decisions) - 1, -1, -1):
+        opening, (steps, lengths), use = decisions[index]
+        if not use[c]:
+            continue
+        if lengths is not None:
+            length = lengths[c]
+            chosen[index] = list(range(length))
+            c -= sum(steps[:length])
+        else:
+            for n in range(len(steps) - 1, -1, -1):
+                weight, took = steps[n]
+                if took[c]:
+                    chosen[index].append(n)
+                    c -= weight
+                    if took[c + weight] == 2:
+                        break
+            chosen[index].reverse()
+        c -= opening
+    return chosen
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from functools import lru_cache
+from jinja2 import Environment, FileSystemLoader
+from instrumentation import traced
+from models import ResumeJob
+from page_fit import fit_page
+from resume_sections import EDUCATION, PROJECTS, TECHNOLOGIES
+from structured_logging import get_logger, truncate
+from database import (
+    get_jobs_for_application, get_settings, get_resume_snapshot,
+    save_resume_snapshot, set_application_snapshot, set_snapshot_pdf_path,
+    get_application_snapshot, delete_unreferenced_snapshots
+)
+
+logger = get_logger('pdf')
+
+PDFLATEX_PATH = os.environ.get('PDFLATEX_PATH', '/Library/TeX/texbin/pdflatex')  # Defaults to the MacTeX path
+
+# Compiled PDFs for application snapshots, named by content hash
+SNAPSHOT_FOLDER = 'static/snapshots'
+
+# Unreferenced snapshots saved more recently than this are not collected, so
+# one isn't removed between being saved and its application pointing at it
+SNAPSHOT_GC_GRACE_SECONDS = 3600
+
+# Jinja environment using LaTeX-friendly delimiters (created once, templates are cached)
+latex_env = Environment(
+    loader=FileSystemLoader('templates'),
+    block_start_string=r'\BLOCK{',
+    block_end_string='}',
+    variable_start_string=r'\VAR{',
+    variable_end_string='}',
+    comment_start_string=r'\#{',
+    comment_end_string='}',
+    line_statement_prefix='%%',
+    line_comment_prefix='%#',
+    trim_blocks=True,
+    autoescape=False,
+)
+
+@lru_cache(maxsize=256)
+def render_job_section(job):
+    """LaTeX for one Experience entry (a ResumeJob). Unchanged jobs are reused
+    across renders; restart to pick up edits to resume_job.tex."""
+    return latex_env.get_template('resume_job.tex').render(job=job)
+
+def render_resume_tex(jobs):
+    """Render the LaTeX resume template with a list of ResumeJobs"""
+    template = latex_env.get_template('resume_template.tex')
+    return template.render(jobs=jobs, render_job=render_job_section, education=EDUCATION,
+                           projects=PROJECTS, technologies=TECHNOLOGIES)
+
+@traced('pdflatex')
+def compile_pdf(rendered_tex, output_dir='static', jobname='temp_resume'):
+    """Compile rendered LaTeX with pdflatex and return the PDF path"""
+    os.makedirs(output_dir, exist_ok=True)
+    tex_path = os.path.join(output_dir, f'{jobname}.tex')
+    
+    with open(tex_path, 'w') as f:
+        f.write(rendered_tex)
+    
+    result = subprocess.run([
+        PDFLATEX_PATH,
+        '-output-directory', output_dir,
+        tex_path
+    ], capture_output=True, text=True)
+    
+    if result.returncode != 0:
+        # pdflatex reports errors at the end of its stdout
+        logger.error("LaTeX error", extra={'returncode': result.returncode,
+                                           'output': truncate(result.stdout[-4000:] + result.stderr, 4000)})
+        raise Exception("PDF generation failed")
+    
+    pdf_path = os.path.join(output_dir, f'{jobname}.pdf')
+    if not os.path.exists(pdf_path):
+        raise Exception(f"PDF not generated at {pdf_path}")
+    
+    return pdf_path
+
+def build_experience(jobs, jobs_on_resume=None, points_per_job=None):
+    """The resume's ResumeJobs, with the bullets that best fill one page
+    (see page_fit).
+    
+    Considers the first jobs_on_resume jobs that have bullets and picks
+    among the first points_per_job bullets of each; a job's optional
+    'scores' rank its bullets, otherwise it keeps a prefix of them in their
+    order. Jobs that get no bullets (because nothing of theirs fits) are
+    left out.
+    """
+    jobs = [job for job in jobs if job['points']][:jobs_on_resume]
+    chosen = fit_page([
+        (job['title'], job['company'], job['location'],
+         list(zip(job['points'], job.get('scores') or [None] * len(job['points']))))
+        for job in jobs
+    ], max_points=points_per_job)
+    return [
+        ResumeJob(job['title'], job['company'], job['location'], job['dates'],
+                  tuple(job['points'][n] for n in indexes))
+        for job, indexes in zip(jobs, chosen) if indexes
+    ]
+
+def compile_pdf_to(rendered_tex, pdf_path):
+    """Compile rendered LaTeX into pdf_path, safe against concurrent builds.
+    
+    pdflatex runs in a private directory next to the destination and the
+    finished PDF is moved into place atomically, so other requests or worker
+    processes never see (or clobber) a half-written file.
+    """
+    output_dir = os.path.dirname(pdf_path) or '.'
+    os.makedirs(output_dir, exist_ok=True)
+    build_dir = tempfile.mkdtemp(dir=output_dir)
+    try:
+        built_path = compile_pdf(rendered_tex, build_dir, 'resume')
+        os.replace(built_path, pdf_path)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+    return pdf_path
+
+def compile_snapshot(content_hash, rendered_tex):
+    """Compile a snapshot's LaTeX into SNAPSHOT_FOLDER/<hash>.pdf and record it"""
+    pdf_path = compile_pdf_to(rendered_tex, os.path.join(SNAPSHOT_FOLDER, f'{content_hash}.pdf'))
+    set_snapshot_pdf_path(content_hash, pdf_path)
+    return pdf_path
+
+def snapshot_application(app_id, compile=True):
+    """Freeze an application's current resume content.
+    
+    The rendered LaTeX is hashed, so applications with identical content share
+    one snapshot and one compiled PDF. Returns the content hash, or None if the
+    application has no linked jobs.
+    """
+    jobs = get_jobs_for_application(app_id)
+    if not jobs:
+        return None
+    
+    settings = get_settings()
+    resume_jobs = build_experience(jobs, settings['jobs_on_resume'], settings['points_per_job'])
+    rendered_tex = render_resume_tex(resume_jobs)
+    content_hash = hashlib.sha256(rendered_tex.encode('utf-8')).hexdigest()
+    
+    # Saved even when the content is already stored: that refreshes its
+    # last_seen_at, so collect_snapshot_garbage can't remove an unreferenced
+    # snapshot before this application points at it
+    save_resume_snapshot(content_hash, json.dumps({'jobs': [job.to_dict() for job in resume_jobs]}),
+                         rendered_tex)
+    set_application_snapshot(app_id, content_hash)
+    
+    if compile:
+        _snapshot_pdf_path(get_resume_snapshot(content_hash))
+    
+    return content_hash
+
+def _snapshot_pdf_path(snapshot):
+    if snapshot['pdf_path'] and os.path.exists(snapshot['pdf_path']):
+        return snapshot['pdf_path']
+    return compile_snapshot(snapshot['content_hash'], snapshot['rendered_tex'])
+
+def get_application_pdf(app_id):
+    """Get the stored PDF for an application, compiling it only if it was never built.
+    
+    Applications created before snapshots existed are frozen on first request.
+    Returns (pdf_path, content_hash), or (None, None) if the application has
+    no linked jobs.
+    """
+    snapshot = get_application_snapshot(app_id)
+    if not snapshot:
+        if not snapshot_application(app_id, compile=False):
+            return None, None
+        snapshot = get_application_snapshot(app_id)
+    
+    return _snapshot_pdf_path(snapshot), snapshot['content_hash']
+
+def collect_snapshot_garbage(grace_seconds=SNAPSHOT_GC_GRACE_SECONDS):
+    """Delete snapshots no application references, with their PDFs. Returns
+    the number of files removed"""
+    removed = 0
+    for path in delete_unreferenced_snapshots(grace_seconds):
+        if os.path.exists(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
+def get_snapshot_pdf(content_hash):
+    """Get the PDF for a snapshot by content hash, or None if no such snapshot exists"""
+    snapshot = get_resume_snapshot(content_hash)
+    if not snapshot:
+        return None
+    return _snapshot_pdf_path(snapshot)
@@ -0,0 +1,82 @@
+import hashlib
+from ai_service import AIModel, optimization_service, rank_score
+from database import get_all_jobs, get_ai_scores, save_ai_scores
+
+# AI optimization is incremental: each bullet's relevance score is cached per
+# (bullet text, job description + story, model), and so is each job's rank.
+# A re-run only sends the model bullets it hasn't scored for this job
+# description (new or edited ones), then orders everything from the merged
+# scores. If nothing changed, no AI call is made at all.
+
+def _hash(*parts):
+    return hashlib.sha256('\0'.join(parts).encode()).hexdigest()
+
+def context_hash(job_description, story):
+    return _hash('context', job_description.strip(), story.strip())
+
+def point_hash(text):
+    return _hash('point', ' '.join(text.split()))
+
+def job_hash(job):
+    return _hash('job', job.title.strip(), job.company.strip())
+
+def optimize_resume(model_type, job_description='', story='', strategy=None):
+    """Order every job and bullet for a job description, calling the AI only
+    for what isn't cached. strategy is one of ai_service.STRATEGIES.
+
+    Returns (True, {"job_order", "point_orders", "strategy", "scored_points",
+    "cached_points"}) with the same job_order/point_orders shapes as
+    AIService.optimize_resume, or (False, error).
+    """
+    jobs = get_all_jobs()
+    try:
+        ai_service = optimization_service(AIModel.DEEPSEEK if model_type == 'deepseek' else AIModel.OPENAI, strategy)
+    except Exception as e:
+        # e.g. no API key configured for the provider; retrying won't help
+        return False, str(e)
+    # Hedged answers come from either provider and ensemble ones from both
+    cache_key = model_type if ai_service.strategy == 'single' else f'{model_type}:{ai_service.strategy}'
+    context = context_hash(job_description, story)
+    scores = get_ai_scores(cache_key, context)
+
+    job_keys = {job.id: job_hash(job) for job in jobs}
+    point_keys = {point_id: point_hash(text) for job in jobs for point_id, text in job.point_items}
+    stale_points = {point_id for point_id, key in point_keys.items() if key not in scores}
+    stale_jobs = [job_id for job_id, key in job_keys.items() if key not in scores]
+
+    if stale_points or stale_jobs:
+        success, result = ai_service.optimize_resume(jobs, job_description, story, point_ids=stale_points)
+        if not success:
+            return False, result
+
+        # Jobs are re-ranked on every call, so their scores are all replaced
+        fresh = {job_keys[job_id]: rank_score(order, len(result['job_order']))
+                 for job_id, order in result['job_order'].items()}
+        for points in result['point_orders'].values():
+            for point_id, order_data in points.items():
+                score = order_data['score']
+                fresh[point_keys[point_id]] = rank_score(order_data['order'], len(points)) if score is None else score
+        save_ai_scores(cache_key, context, fresh)
+        scores.update(fresh)
+
+    # Highest score first; anything still unscored keeps its current place after the scored ones
+    def ranked(items):
+        def key(item):
+            score = scores.get(item[1])
+            return (score is None, -(score or 0), item[0])
+        return [item_id for _, _, item_id in sorted(items, key=key)]
+
+    job_order = ranked((job.display_order or 0, job_keys[job.id], job.id) for job in jobs)
+    point_orders = {}
+    for job in jobs:
+        point_ids = ranked((n, point_keys[point_id], point_id) for n, (point_id, _) in enumerate(job.point_items))
+        point_orders[job.id] = {point_id: {'order': n, 'score': scores.get(point_keys[point_id])}
+                                for n, point_id in enumerate(point_ids, 1)}
+
+    return True, {
+        'job_order': {job_id: n for n, job_id in enumerate(job_order, 1)},
+        'point_orders': point_orders,
+        'strategy': ai_service.strategy,
+        'scored_points': len(stale_points),
+        'cached_points': len(point_keys) - len(stale_points),
+    }
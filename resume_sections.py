@@ -0,0 +1,55 @@
+from models import ResumeEntry
+
+# The resume's sections besides Experience. resume_template.tex renders
+# them and page_fit measures them, so this is the one place to edit them.
+# Values are LaTeX.
+
+EDUCATION = (
+    ResumeEntry(
+        name='North Dakota State University',
+        detail=', BS in Computer Science',
+        aside='Aug 2021 – May 2025',
+        points=(
+            r'\textbf{Coursework:} Computer Architecture, Data Structures and Algorithms, '
+            r'Networking and Parallel Computation',
+        ),
+    ),
+)
+
+PROJECTS = (
+    ResumeEntry(
+        name='Crave - Social Media Recipe Video App',
+        detail='',
+        aside=r'\href{https://github.com/yvetter438/Crave}{github.com/yvetter438/Crave}',
+        points=(
+            'Built and launched a mobile app for sharing and discovering recipes via short-form videos.',
+            'Tools Used: React Native, Typescript, Supabase, Expo',
+        ),
+    ),
+    ResumeEntry(
+        name='Automated Resume Tailoring Tool',
+        detail='',
+        aside=r'\href{https://github.com/yvetter438/AutomatedResume}{github.com/yvetter438/AutomatedResume}',
+        points=(
+            'Developed a full-stack resume management application using Python/Flask and SQLite, '
+            'featuring drag-and-drop reordering, AI-powered resume optimization, and PDF generation. '
+            'Feautures a job application tracking system.',
+            "Tools Used: Python, Flask, SQLite, LaTeX, Jinja, LLM's",
+        ),
+    ),
+    ResumeEntry(
+        name='NDSU Skydiving Club Website',
+        detail='',
+        aside='ndsuskydivingclub.com',
+        points=(
+            'Designed and developed website using HTML/CSS and deployed through Github Pages the '
+            'official NDSU Skydiving Club website.',
+        ),
+    ),
+)
+
+# (bold label, text), one line each
+TECHNOLOGIES = (
+    ('Languages:', 'React, React Native,TypeSript, Python, Java, HTML, CSS, SQL, JavaScript, LaTeX'),
+    ('Technologies:', 'Expo, Supabase, SQLite, XCode, GitHub, Git'),
+)
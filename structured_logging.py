@@ -0,0 +1,200 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import traceback
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+import instrumentation
+
+# Log records are handed to a background thread through a bounded queue, so
+# logging on a request thread costs a queue put (microseconds) rather than a
+# write to stderr. Loggers are per category ('ai', 'app', 'tasks', ...):
+#
+#   LOG_LEVEL=INFO                      default level for every category
+#   LOG_LEVELS=ai=DEBUG,tasks=WARNING   per-category overrides
+#   LOG_FORMAT=json                     or 'text' for development
+#   LOG_PAYLOAD_CHARS=2000              longest payload logged
+#   LOG_PAYLOAD_SAMPLE=1.0              share of DEBUG payloads logged
+
+LOGGER_PREFIX = 'resume'
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.environ.get('LOG_LEVELS', '')
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+PAYLOAD_CHARS = int(os.environ.get('LOG_PAYLOAD_CHARS', 2000))
+PAYLOAD_SAMPLE = float(os.environ.get('LOG_PAYLOAD_SAMPLE', 1.0))
+
+# Records waiting for the writer thread; beyond this they are dropped (and
+# counted) rather than blocking the caller
+QUEUE_SIZE = 10000
+
+# Attributes every LogRecord has; anything else came from extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'request_id'}
+
+_local = threading.local()
+_handler = None
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+instrumentation.describe('resume_log_dropped_total', 'Log records dropped because the log queue was full')
+
+def get_logger(category):
+    return logging.getLogger(f'{LOGGER_PREFIX}.{category}')
+
+# ============================================
+# Request ids
+# ============================================
+
+def start_request(request_id=None):
+    """Tag this thread's log records with request_id (a new one if not given)"""
+    _local.request_id = request_id or uuid.uuid4().hex[:16]
+    return _local.request_id
+
+def finish_request():
+    _local.request_id = None
+
+def current_request_id():
+    return getattr(_local, 'request_id', None)
+
+# ============================================
+# Payloads
+# ============================================
+
+def truncate(value, limit=None):
+    """str(value), cut to limit characters with a note of how much was dropped"""
+    limit = PAYLOAD_CHARS if limit is None else limit
+    text = value if isinstance(value, str) else str(value)
+    if len(text) <= limit:
+        return text
+    return f'{text[:limit]}... ({len(text) - limit} more chars)'
+
+class _Payload:
+    """Defers str() and truncation of a logged value to the writer thread"""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return truncate(self.value)
+
+def log_payload(logger, message, payload, **fields):
+    """Log a large value (prompt, AI response) at DEBUG, sampled and truncated.
+
+    The value is only converted to a string on the writer thread, and only
+    if the record is written, so don't mutate it after logging.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if PAYLOAD_SAMPLE < 1 and random.random() >= PAYLOAD_SAMPLE:
+        return
+    logger.debug(message, extra={'payload': _Payload(payload), **fields})
+
+# ============================================
+# Handlers and formatters
+# ============================================
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queues records for the writer thread; never blocks or writes itself"""
+
+    def prepare(self, record):
+        # Runs on the logging thread: capture what can't be recovered later
+        # (the request id, traceback frames) but leave formatting to the writer
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = ''.join(traceback.format_exception(*record.exc_info))
+            record.exc_info = None
+        record.request_id = current_request_id()
+        return record
+
+    def enqueue(self, record):
+        _ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            instrumentation.inc('resume_log_dropped_total')
+
+def _fields(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.message,
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        entry.update(_fields(record))
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for development"""
+
+    def format(self, record):
+        line = f"{time.strftime('%H:%M:%S', time.localtime(record.created))} {record.levelname:<7} {record.name}"
+        if getattr(record, 'request_id', None):
+            line += f' [{record.request_id}]'
+        line += f' {record.message}'
+        for key, value in _fields(record).items():
+            line += f' {key}={value}'
+        if record.exc_text:
+            line += '\n' + record.exc_text.rstrip()
+        return line
+
+def _ensure_listener():
+    """Start the writer thread in this process (again after a fork)"""
+    global _listener, _listener_pid
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        # A queue inherited from the parent may have been locked mid-fork
+        _handler.queue = queue.Queue(QUEUE_SIZE)
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(TextFormatter() if LOG_FORMAT == 'text' else JsonFormatter())
+        _listener = QueueListener(_handler.queue, output)
+        _listener.start()
+        _listener_pid = os.getpid()
+
+def flush():
+    """Wait until queued records are written, and keep logging afterwards"""
+    if _listener_pid == os.getpid():
+        _listener.stop()
+        _listener.start()
+
+@atexit.register
+def _shutdown():
+    # Write what's queued; no new writer thread can start at interpreter shutdown
+    if _listener_pid == os.getpid():
+        _listener.stop()
+
+def configure():
+    """Route the resume.* loggers through the queue. Safe to call repeatedly."""
+    global _handler
+    if _handler is not None:
+        return
+    _handler = NonBlockingQueueHandler(None)
+
+    root = logging.getLogger(LOGGER_PREFIX)
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(_handler)
+    root.propagate = False
+    for setting in filter(None, LOG_LEVELS.split(',')):
+        category, _, level = setting.partition('=')
+        get_logger(category.strip()).setLevel(level.strip().upper())
@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+import structured_logging
+from database import (
+    enqueue_task, claim_next_task, complete_task, fail_task,
+    is_task_cancelled, delete_finished_tasks
+)
+
+logger = structured_logging.get_logger('tasks')
+
+# Worker threads per process. AI calls and pdflatex spend their time waiting
+# on the network or a subprocess, so threads are enough.
+WORKER_COUNT = int(os.environ.get('TASK_WORKERS', 2))
+
+# Idle workers check for new tasks at least this often (seconds)
+POLL_INTERVAL = 1.0
+
+# How long a worker may hold a task before it is assumed dead and the
+# task is handed to another worker
+LEASE_SECONDS = 15 * 60
+
+# Delay before the first retry; doubles with every further attempt
+RETRY_DELAY_SECONDS = 30
+
+# Finished tasks (and the files they produced) are kept for a week
+TASK_RETENTION_SECONDS = 7 * 24 * 3600
+
+_handlers = {}
+_pruned_folders = []
+_wake = threading.Event()
+_start_lock = threading.Lock()
+_workers = []
+_started = False
+
+class TaskCancelled(Exception):
+    """Raised by handlers (via check_cancelled) to stop a cancelled task early"""
+
+class PermanentTaskError(Exception):
+    """Raised by handlers for failures a retry can't fix (bad input or
+    configuration); the task fails at once instead of using up its attempts"""
+
+def register(kind):
+    """Decorator registering handler(task) for a task kind.
+
+    The handler receives the task dict (id, payload, attempts, ...) and
+    returns a JSON-serializable result. Raising retries the task with
+    backoff until it runs out of attempts, except PermanentTaskError.
+    """
+    def decorator(handler):
+        _handlers[kind] = handler
+        return handler
+    return decorator
+
+def prune_folder(folder, max_age_seconds=TASK_RETENTION_SECONDS):
+    """Have prune_finished_tasks also delete PDFs in folder that haven't been
+    modified for max_age_seconds (touch a file to keep it)"""
+    _pruned_folders.append((folder, max_age_seconds))
+
+def check_cancelled(task):
+    """Call between expensive steps so cancelled tasks stop early"""
+    if is_task_cancelled(task['id']):
+        raise TaskCancelled()
+
+def submit(kind, payload=None, max_attempts=3, unique=False):
+    """Queue a task and wake a worker. Returns the task id, or None if
+    unique and a task of this kind is already queued or running"""
+    task_id = enqueue_task(kind, payload, max_attempts, unique)
+    if task_id is None:
+        return None
+    start_workers()
+    _wake.set()
+    return task_id
+
+def run_next_task():
+    """Claim and run one task. Returns False if nothing was runnable"""
+    task = claim_next_task(LEASE_SECONDS)
+    if task is None:
+        return False
+
+    handler = _handlers.get(task['kind'])
+    if handler is None:
+        fail_task(task['id'], f"No handler for task kind '{task['kind']}'", 0, retry=False)
+        return True
+
+    # Log records from the handler carry the task as their request id
+    structured_logging.start_request(f"task-{task['id']}")
+    try:
+        result = handler(task)
+    except TaskCancelled:
+        fail_task(task['id'], 'Cancelled', 0, retry=False)
+    except PermanentTaskError as e:
+        logger.warning("Task failed permanently", extra={'task_id': task['id'], 'kind': task['kind'],
+                                                         'attempt': task['attempts'], 'error': str(e)})
+        fail_task(task['id'], str(e), 0, retry=False)
+    except Exception as e:
+        logger.exception("Task failed", extra={'task_id': task['id'], 'kind': task['kind'],
+                                               'attempt': task['attempts']})
+        delay = RETRY_DELAY_SECONDS * 2 ** (task['attempts'] - 1)
+        fail_task(task['id'], str(e), delay)
+    else:
+        complete_task(task['id'], result)
+    finally:
+        structured_logging.finish_request()
+    return True
+
+def _worker_loop():
+    while True:
+        try:
+            if run_next_task():
+                continue
+        except Exception as e:
+            # Usually a locked database; back off and try again
+            logger.warning("Task worker error", extra={'error': str(e)})
+
+        _wake.wait(POLL_INTERVAL)
+        _wake.clear()
+
+def prune_finished_tasks():
+    """Delete old finished tasks along with any files they produced, and
+    stale PDFs in the folders registered with prune_folder"""
+    for result in delete_finished_tasks(TASK_RETENTION_SECONDS):
+        pdf_path = result.get('pdf_path') if isinstance(result, dict) else None
+        if pdf_path and os.path.exists(pdf_path):
+            os.remove(pdf_path)
+    
+    now = time.time()
+    for folder, max_age_seconds in _pruned_folders:
+        if not os.path.isdir(folder):
+            continue
+        for entry in os.scandir(folder):
+            try:
+                if entry.name.endswith('.pdf') and now - entry.stat().st_mtime > max_age_seconds:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                # Another worker process pruned it first
+                pass
+
+def start_workers(count=WORKER_COUNT):
+    """Start this process's worker threads (once). Safe to call repeatedly.
+
+    Tasks live in SQLite, so anything queued or interrupted before a
+    restart is picked up again once workers are running.
+    """
+    global _started
+    if _started:
+        return
+
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+
+        try:
+            prune_finished_tasks()
+        except Exception as e:
+            logger.exception("Error pruning tasks")
+
+        for i in range(count):
+            thread = threading.Thread(target=_worker_loop, name=f'task-worker-{i}', daemon=True)
+            thread.start()
+            _workers.append(thread)
@@ -0,0 +1,12 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_app_import_within_budget():
+    """benchmarks/import_budget.py passes: app imports within budget and
+    leaves the openai SDK and config for first use"""
+    result = subprocess.run([sys.executable, os.path.join(ROOT, 'benchmarks', 'import_budget.py')],
+                            cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,13 @@
+"""Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The database is initialized once here, before the server forks its
+workers (gunicorn.conf.py preloads this module). Any WSGI server can
+serve wsgi:app the same way.
+"""
+from database import init_db
+
+init_db()
+
+from app import app